@@ -0,0 +1,211 @@
+import time
+
+from core.routers import PROCESS_LOCAL_CACHES
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+REVOCATION_KEY = 'jwt-revoked:{}'
+# Время выдачи с долями секунды: iat целый, и токен, выданный в ту же
+# секунду, что и отзыв, нельзя было бы отличить от отозванного.
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+def get_revocation_cache():
+    """Возвращает кэш отозванных токенов.
+
+    Returns:
+        BaseCache: кэш из настройки JWT_REVOCATION_CACHE.
+    """
+
+    return caches[getattr(settings, 'JWT_REVOCATION_CACHE', 'default')]
+
+
+def check_revocation_cache():
+    """Проверяет, что отзыв токенов увидят все процессы.
+
+    Токены доступа с ролью в утверждениях живут ACCESS_TOKEN_LIFETIME, и
+    после понижения роли их отменяет только запись в кэше отзыва. Кэш в
+    памяти процесса не видят другие процессы gunicorn, он теряется при
+    перезапуске и вытесняет записи, поэтому такой токен снова начал бы
+    действовать.
+
+    Raises:
+        ImproperlyConfigured: кэш отзыва локальный для процесса.
+    """
+
+    if isinstance(get_revocation_cache(), PROCESS_LOCAL_CACHES):
+        raise ImproperlyConfigured(
+            'Для JWT_REVOCATION_CACHE нужен отдельный постоянный и общий для '
+            'процессов кэш, например FileBasedCache или DatabaseCache: с '
+            'кэшем в памяти процесса отозванный токен снова начнет действовать'
+        )
+
+
+def revoke_tokens(user_id):
+    """Отзывает все выданные пользователю до текущего момента токены.
+
+    Запись живет не дольше самого долгоживущего токена доступа.
+
+    Args:
+        user_id (int): id пользователя.
+    """
+
+    get_revocation_cache().set(
+        REVOCATION_KEY.format(user_id),
+        time.time(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def is_revoked(token):
+    """Проверяет, не выдан ли токен до отзыва токенов пользователя.
+
+    Время выдачи берется из ISSUED_AT_CLAIM. У токенов без него сравнивается
+    целый iat с целой секундой отзыва, и токен, выданный в ту же секунду,
+    считается действительным.
+
+    Args:
+        token (Token): проверенный токен.
+
+    Returns:
+        bool: True если токен отозван.
+    """
+
+    revoked = get_revocation_cache().get(
+        REVOCATION_KEY.format(token.get(api_settings.USER_ID_CLAIM)))
+    if revoked is None:
+        return False
+    if ISSUED_AT_CLAIM in token:
+        return token[ISSUED_AT_CLAIM] < revoked
+    return token.get('iat', 0) < int(revoked)
+
+
+class ClaimsAccessToken(AccessToken):
+    """Токен доступа с ролью и правами пользователя в утверждениях."""
+
+    @classmethod
+    def for_user(cls, user):
+        """Создает токен доступа для пользователя.
+
+        Args:
+            user (User): пользователь.
+
+        Returns:
+            ClaimsAccessToken: токен с утверждениями username, role,
+            is_staff и временем выдачи ISSUED_AT_CLAIM.
+        """
+
+        token = super().for_user(user)
+        token[ISSUED_AT_CLAIM] = token.current_time.timestamp()
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_staff'] = user.is_staff
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь, восстановленный из утверждений токена без запроса к БД.
+
+    Предоставляет те же атрибуты, что проверяют разрешения API. Сохранить
+    такого пользователя нельзя, для работы с профилем нужен объект User.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+    @property
+    def is_admin(self):
+        """Проверяет является ли пользователь администратором.
+
+        Returns:
+            bool: True если пользователь администратор иначе False.
+        """
+
+        return self.role == User.ADMIN or self.is_staff
+
+
+def as_user_instance(user):
+    """Возвращает объект User для подстановки во внешние ключи.
+
+    Для пользователя из токена создается объект User в памяти с данными из
+    утверждений, без запроса к базе данных. Сохранять его нельзя.
+
+    Args:
+        user (User | ClaimsUser): пользователь запроса.
+
+    Returns:
+        User: пользователь.
+    """
+
+    if isinstance(user, ClaimsUser):
+        return User(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            is_staff=user.is_staff
+        )
+    return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT без чтения пользователя из базы данных.
+
+    Пользователь строится из утверждений токена. Токены, выданные до
+    появления утверждений о роли, проверяются по базе данных, как в
+    JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        """Возвращает пользователя по проверенному токену.
+
+        Args:
+            validated_token (Token): проверенный токен.
+
+        Raises:
+            AuthenticationFailed: токен отозван.
+
+        Returns:
+            ClaimsUser: пользователь из утверждений токена либо User для
+            токенов без утверждения role.
+        """
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked')
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        return ClaimsUser(validated_token)
+
+
+class DatabaseJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT с загрузкой пользователя из базы данных.
+
+    Нужна представлениям, которые работают с полным профилем пользователя.
+    """
+
+    def get_user(self, validated_token):
+        """Возвращает пользователя из базы данных по проверенному токену.
+
+        Args:
+            validated_token (Token): проверенный токен.
+
+        Raises:
+            AuthenticationFailed: токен отозван.
+
+        Returns:
+            User: пользователь.
+        """
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked')
+        return super().get_user(validated_token)
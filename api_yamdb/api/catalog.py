@@ -0,0 +1,103 @@
+import threading
+import time
+
+from core.cache import GLOBAL_GROUP, get_versions
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from reviews.models import Category, Genre
+
+
+class Catalog:
+    """Справочник категорий или жанров в памяти процесса.
+
+    Таблицы маленькие и меняются редко, поэтому справочник загружается
+    целиком одним запросом и перезагружается, когда сигналы api.signals
+    увеличивают версию его группы кэша, либо не реже раза в
+    CATALOG_TIMEOUT секунд, если кэш версий у процессов не общий.
+    """
+
+    def __init__(self, model, group):
+        """Создает пустой справочник.
+
+        Args:
+            model (Model): Category или Genre.
+            group (str): группа кэша, версия которой меняется вместе с
+                таблицей.
+        """
+
+        self.model = model
+        self.group = group
+        self.lock = threading.Lock()
+        # Версия, время загрузки, записи для списка и словарь slug -> id.
+        self.data = (None, 0, [], {})
+
+    def is_fresh(self, versions):
+        """Проверяет, загружен ли справочник при этих версиях и не истек
+        ли CATALOG_TIMEOUT.
+
+        Args:
+            versions (list): текущие версии групп кэша.
+
+        Returns:
+            bool: справочник можно использовать.
+        """
+
+        version, loaded = self.data[:2]
+        timeout = getattr(settings, 'CATALOG_TIMEOUT', 60)
+        return version == versions and time.monotonic() - loaded < timeout
+
+    def refresh(self):
+        """Перезагружает справочник, если он устарел.
+
+        Returns:
+            tuple: записи для списка и словарь slug -> id.
+        """
+
+        versions = get_versions((GLOBAL_GROUP, self.group))
+        if not self.is_fresh(versions):
+            with self.lock:
+                if not self.is_fresh(versions):
+                    # Справочник живет долго, поэтому читается из основной
+                    # базы, а не с реплики, которая может отставать.
+                    rows = list(self.model.objects.using(
+                        DEFAULT_DB_ALIAS
+                    ).order_by('pk').values_list('pk', 'name', 'slug'))
+                    self.data = (
+                        versions,
+                        time.monotonic(),
+                        [{'name': name, 'slug': slug}
+                         for _, name, slug in rows],
+                        {slug: pk for pk, _, slug in rows},
+                    )
+        return self.data[2:]
+
+    def all(self):
+        """Возвращает все записи справочника.
+
+        Returns:
+            list: словари с name и slug в порядке id.
+        """
+
+        return self.refresh()[0]
+
+    def get_id(self, slug):
+        """Возвращает id записи по slug.
+
+        Свежему справочнику можно верить, поэтому неизвестный slug не
+        ищется в базе данных. Запись, добавленная в этом процессе или при
+        общем кэше версий, видна после перезагрузки справочника по новой
+        версии, а добавленная в другом процессе без общего кэша - не
+        позже чем через CATALOG_TIMEOUT секунд.
+
+        Args:
+            slug (str): slug категории или жанра.
+
+        Returns:
+            int: id записи или None, если ее нет.
+        """
+
+        return self.refresh()[1].get(slug)
+
+
+categories = Catalog(Category, 'categories')
+genres = Catalog(Genre, 'genres')
@@ -0,0 +1,141 @@
+from collections import defaultdict
+from operator import itemgetter
+
+from core.mixins import TimedSerializerMixin
+from rest_framework import serializers
+from reviews.models import TitlesGenres
+
+# Поле DRF используется только ради формата даты, как в ModelSerializer.
+DATETIME = serializers.DateTimeField()
+
+
+def to_int(value):
+    """Приводит число к int как serializers.IntegerField."""
+
+    return None if value is None else int(value)
+
+
+def get_datetime(key):
+    """Возвращает функцию, которая берет из строки дату в формате DRF.
+
+    Args:
+        key (str): ключ строки values().
+
+    Returns:
+        callable: функция строки.
+    """
+
+    return lambda row: DATETIME.to_representation(row[key])
+
+
+class ValuesSerializer:
+    """Сериализатор только для чтения, который работает со словарями
+    values(), а не с объектами моделей.
+
+    values - ключи, которые запрашиваются у выборки, fields - пары из имени
+    поля ответа и функции, которая получает значение из строки. Вывод
+    совпадает с выводом соответствующего ModelSerializer, но без создания
+    объектов моделей и полей DRF для каждой записи.
+    """
+
+    values = ()
+    fields = ()
+
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        """Готовит выборку для сериализатора.
+
+        Args:
+            queryset (QuerySet): выборка объектов модели.
+
+        Returns:
+            QuerySet: выборка словарей с ключами values.
+        """
+
+        return queryset.prefetch_related(None).values(*cls.values)
+
+    def add_related(self, rows):
+        """Добавляет в строки связанные данные, которые нельзя получить
+        через values() той же выборки.
+
+        Args:
+            rows (list): строки страницы.
+        """
+
+    def to_representation(self, instance):
+        rows = list(instance) if self.many else [instance]
+        self.add_related(rows)
+        fields = self.fields
+        data = [{name: get(row) for name, get in fields} for row in rows]
+        return data if self.many else data[0]
+
+    @property
+    def data(self):
+        return self.to_representation(self.instance)
+
+
+def get_category(row):
+    if row['category_id'] is None:
+        return None
+    return {'name': row['category__name'], 'slug': row['category__slug']}
+
+
+class FastReadTitleSerializer(TimedSerializerMixin, ValuesSerializer):
+    """Вывод ReadTitleSerializer по строкам values()."""
+
+    values = ('id', 'name', 'year', 'rating', 'description', 'category_id',
+              'category__name', 'category__slug')
+    fields = (
+        ('id', itemgetter('id')),
+        ('name', itemgetter('name')),
+        ('year', itemgetter('year')),
+        ('rating', lambda row: to_int(row['rating'])),
+        ('description', itemgetter('description')),
+        ('genre', itemgetter('genre')),
+        ('category', get_category),
+    )
+
+    def add_related(self, rows):
+        """Загружает жанры всех произведений страницы одним запросом в том
+        же порядке, что и ReadTitleSerializer.setup_eager_loading().
+        """
+
+        genres = defaultdict(list)
+        links = TitlesGenres.objects.filter(
+            title_id__in=[row['id'] for row in rows]
+        ).order_by('genre_id').values_list(
+            'title_id', 'genre__name', 'genre__slug')
+        for title_id, name, slug in links:
+            genres[title_id].append({'name': name, 'slug': slug})
+        for row in rows:
+            row['genre'] = genres[row['id']]
+
+
+class FastReviewsSerializer(TimedSerializerMixin, ValuesSerializer):
+    """Вывод ReviewsSerializer по строкам values()."""
+
+    values = ('id', 'text', 'author__username', 'score', 'pub_date')
+    fields = (
+        ('id', itemgetter('id')),
+        ('text', itemgetter('text')),
+        ('author', itemgetter('author__username')),
+        ('score', lambda row: to_int(row['score'])),
+        ('pub_date', get_datetime('pub_date')),
+    )
+
+
+class FastCommentsSerializer(TimedSerializerMixin, ValuesSerializer):
+    """Вывод CommentsSerializer по строкам values()."""
+
+    values = ('id', 'text', 'author__username', 'pub_date')
+    fields = (
+        ('id', itemgetter('id')),
+        ('text', itemgetter('text')),
+        ('author', itemgetter('author__username')),
+        ('pub_date', get_datetime('pub_date')),
+    )
@@ -1,12 +1,34 @@
+import re
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, FloatField, Value, When
 from django_filters import FilterSet, rest_framework
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
 from reviews.models import Title
 
+from .catalog import categories, genres
+
+# Порог похожести, как pg_trgm.similarity_threshold по умолчанию.
+SIMILARITY_THRESHOLD = 0.3
+WORD_RE = re.compile(r'[^\W_]+')
+
+_trigram_available = {}
+
 
 class TitleFilter(FilterSet):
-    """Фильтрует выдачу произведений."""
+    """Фильтрует выдачу произведений.
+
+    Фильтр name (icontains) в PostgreSQL обслуживается GIN индексом pg_trgm
+    по UPPER(name::text), см. миграцию reviews.0006_trigram_indexes.
+    Slug жанра и категории проверяются по справочникам api.catalog:
+    неизвестный slug сразу дает пустую выдачу, а категория отбирается по
+    id без соединения с таблицей категорий.
+    """
 
-    genre = rest_framework.CharFilter(field_name='genre__slug')
-    category = rest_framework.CharFilter(field_name='category__slug')
+    genre = rest_framework.CharFilter(method='filter_genre')
+    category = rest_framework.CharFilter(method='filter_category')
     name = rest_framework.CharFilter(
         field_name='name',
         lookup_expr='icontains'
@@ -15,3 +37,153 @@ class TitleFilter(FilterSet):
     class Meta:
         model = Title
         fields = ('genre', 'category', 'name', 'year')
+
+    def filter_genre(self, queryset, name, value):
+        if genres.get_id(value) is None:
+            return queryset.none()
+        # Соединение по slug оставлено: с ним планировщик оценивает число
+        # строк точнее и выбирает проход по индексам, а с константным
+        # genre_id - полный просмотр произведений для count.
+        return queryset.filter(genre__slug=value)
+
+    def filter_category(self, queryset, name, value):
+        pk = categories.get_id(value)
+        if pk is None:
+            return queryset.none()
+        return queryset.filter(category_id=pk)
+
+
+def trigrams(text):
+    """Возвращает множество триграмм строки так же, как pg_trgm.
+
+    Каждое слово в нижнем регистре дополняется двумя пробелами в начале и
+    одним в конце.
+
+    Args:
+        text (str): строка.
+
+    Returns:
+        set: триграммы строки.
+    """
+
+    result = set()
+    for word in WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def similarity(first, second):
+    """Считает похожесть строк как функция similarity() из pg_trgm.
+
+    Args:
+        first (str): первая строка.
+        second (str): вторая строка.
+
+    Returns:
+        float: доля общих триграмм от 0 до 1.
+    """
+
+    first, second = trigrams(first), trigrams(second)
+    union = first | second
+    return len(first & second) / len(union) if union else 0.0
+
+
+def has_trigram_extension(connection):
+    """Проверяет, установлено ли расширение pg_trgm.
+
+    Результат запоминается для каждого подключения.
+
+    Args:
+        connection (DatabaseWrapper): подключение к базе данных.
+
+    Returns:
+        bool: True если можно использовать pg_trgm.
+    """
+
+    if connection.vendor != 'postgresql':
+        return False
+    if connection.alias not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[connection.alias] = (
+                cursor.fetchone() is not None)
+    return _trigram_available[connection.alias]
+
+
+class TrigramSimilarityFilter(BaseFilterBackend):
+    """Нечеткий поиск по названию с учетом опечаток.
+
+    Параметр ?<поле>__similar= (по умолчанию name__similar) отбирает
+    записи, похожие на строку не меньше чем на SIMILARITY_THRESHOLD, и
+    сортирует их по убыванию похожести. В PostgreSQL с pg_trgm отбор
+    выполняет оператор % по GIN индексу. В PostgreSQL без расширения
+    параметр отклоняется с ошибкой 400: расчет в Python читает всю
+    таблицу на каждый запрос. Он остается только для баз других типов,
+    например тестовых.
+    """
+
+    def get_field(self, view):
+        """Возвращает поле, по которому ищутся похожие значения.
+
+        Args:
+            view (APIView): представление.
+
+        Returns:
+            str: имя поля.
+        """
+
+        return getattr(view, 'similarity_field', 'name')
+
+    def allows_python_fallback(self, connection):
+        """Проверяет, можно ли считать похожесть в Python.
+
+        Args:
+            connection (DatabaseWrapper): подключение к базе данных.
+
+        Returns:
+            bool: True для баз, отличных от PostgreSQL.
+        """
+
+        return connection.vendor != 'postgresql'
+
+    def filter_queryset(self, request, queryset, view):
+        field = self.get_field(view)
+        param = f'{field}__similar'
+        value = request.query_params.get(param, '').strip()
+        if not value:
+            return queryset
+        connection = connections[queryset.db]
+        if has_trigram_extension(connection):
+            queryset = queryset.filter(**{f'{field}__trigram_similar': value})
+            return queryset.annotate(
+                similarity=TrigramSimilarity(field, value)
+            ).order_by('-similarity', 'pk')
+        if not self.allows_python_fallback(connection):
+            raise ValidationError({param: [
+                'Поиск похожих значений недоступен: в базе данных не '
+                'установлено расширение pg_trgm'
+            ]})
+        ranks = {}
+        for pk, text in queryset.order_by().values_list('pk', field):
+            rank = similarity(value, text or '')
+            if rank >= SIMILARITY_THRESHOLD:
+                ranks[pk] = rank
+        return queryset.filter(pk__in=ranks).annotate(
+            similarity=Case(
+                *(When(pk=pk, then=Value(rank))
+                  for pk, rank in ranks.items()),
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+        ).order_by('-similarity', 'pk')
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': f'{self.get_field(view)}__similar',
+            'required': False,
+            'in': 'query',
+            'description': 'Поиск похожих значений с учетом опечаток',
+            'schema': {'type': 'string'},
+        }]
@@ -0,0 +1,100 @@
+import time
+
+from api.fast_serializers import (FastCommentsSerializer,
+                                  FastReadTitleSerializer,
+                                  FastReviewsSerializer)
+from api.serializers import (CommentsSerializer, ReadTitleSerializer,
+                             ReviewsSerializer)
+from core.renderers import FastJSONRenderer
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comments, Review, Title
+
+# Выборки в том же порядке, что и страницы API.
+CASES = {
+    'titles': (
+        lambda: ReadTitleSerializer.setup_eager_loading(
+            Title.objects.defer('search_vector').order_by('name', 'id')),
+        ReadTitleSerializer,
+        FastReadTitleSerializer,
+    ),
+    'reviews': (
+        lambda: Review.objects.defer('search_vector').order_by(
+            '-pub_date', 'id'),
+        ReviewsSerializer,
+        FastReviewsSerializer,
+    ),
+    'comments': (
+        lambda: Comments.objects.defer('search_vector').order_by(
+            '-pub_date', 'id'),
+        CommentsSerializer,
+        FastCommentsSerializer,
+    ),
+}
+
+
+def measure(func, repeat):
+    """Возвращает лучшее время выполнения функции в миллисекундах."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время вывода страниц через ModelSerializer и '
+            'JSONRenderer с values() сериализаторами и FastJSONRenderer')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='5,20,100',
+            help='Размеры страниц через запятую'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов, берется лучшее время'
+        )
+        parser.add_argument(
+            '--case',
+            choices=CASES,
+            action='append',
+            help='Проверяемые списки, по умолчанию все'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--sizes: ожидаются числа через запятую')
+        self.stdout.write(
+            f'{"список":<10}{"размер":>8}{"DRF, мс":>12}'
+            f'{"values(), мс":>14}{"ускорение":>11}'
+        )
+        for name in options['case'] or CASES:
+            get_queryset, serializer_class, fast_class = CASES[name]
+            for size in sizes:
+                def render():
+                    page = list(get_queryset()[:size])
+                    return JSONRenderer().render(
+                        serializer_class(page, many=True).data)
+
+                def render_fast():
+                    page = list(
+                        fast_class.setup_queryset(get_queryset())[:size])
+                    return FastJSONRenderer().render(
+                        fast_class(page, many=True).data)
+
+                if render() != render_fast():
+                    raise CommandError(f'{name}: вывод отличается')
+                slow = measure(render, options['repeat'])
+                fast = measure(render_fast, options['repeat'])
+                self.stdout.write(
+                    f'{name:<10}{size:>8}{slow:>12.2f}{fast:>14.2f}'
+                    f'{slow / fast:>10.1f}x'
+                )
@@ -0,0 +1,418 @@
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from core.cache import GLOBAL_GROUP, get_response_cache, get_versions
+from core.prometheus import observe_cache
+from core.routers import primary_reads
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR = 'cursor'
+COUNT_KEY = 'count:{}'
+FALSE_VALUES = ('false', '0', 'no')
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по курсору (keyset).
+
+    Порядок задается атрибутом представления cursor_ordering, последним
+    полем в нем должен быть уникальный id. Курсор хранит значения этих
+    полей у крайней записи страницы, поэтому следующая страница выбирается
+    условием WHERE по индексу без OFFSET и без COUNT, а записи, добавленные
+    во время просмотра, не сдвигают уже выданные страницы.
+    """
+
+    cursor_query_param = CURSOR
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'limit'
+    max_page_size = None
+    invalid_cursor_message = 'Неверный курсор'
+
+    def get_ordering(self, view):
+        """Возвращает порядок записей представления.
+
+        Args:
+            view (APIView): представление.
+
+        Returns:
+            list: пары из имени поля и признака обратной сортировки.
+        """
+
+        return [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in view.cursor_ordering
+        ]
+
+    def get_page_size(self, request):
+        """Возвращает размер страницы из параметра limit или настроек.
+
+        Args:
+            request (Request): обьект запроса.
+
+        Returns:
+            int: размер страницы.
+        """
+
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        if self.max_page_size:
+            return min(size, self.max_page_size)
+        return size
+
+    def encode_cursor(self, values, reverse):
+        """Строит ссылку на страницу по позиции курсора.
+
+        Args:
+            values (list): значения полей порядка у крайней записи.
+            reverse (bool): листать назад от позиции.
+
+        Returns:
+            str: абсолютная ссылка на страницу.
+        """
+
+        # isoformat, а не DjangoJSONEncoder: тот обрезает микросекунды, и
+        # курсор перестал бы совпадать с pub_date записи.
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]
+        raw = json.dumps([values, reverse])
+        token = urlsafe_b64encode(raw.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """Разбирает курсор из строки запроса.
+
+        Args:
+            request (Request): обьект запроса.
+
+        Raises:
+            NotFound: курсор поврежден.
+
+        Returns:
+            tuple: значения полей порядка и направление или None, если
+            запрошена первая страница.
+        """
+
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw, reverse = json.loads(urlsafe_b64decode(token.encode()))
+            if len(raw) != len(self.ordering):
+                raise ValueError(token)
+            values = [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, descending), value in zip(self.ordering, raw)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(reverse)
+
+    def get_position(self, instance):
+        """Возвращает значения полей порядка записи.
+
+        Args:
+            instance (Model): запись или словарь values().
+
+        Returns:
+            list: значения полей порядка.
+        """
+
+        if isinstance(instance, dict):
+            return [instance[name] for name, descending in self.ordering]
+        return [getattr(instance, name) for name, descending in self.ordering]
+
+    def get_position_filter(self, values, reverse):
+        """Строит условие выборки записей после позиции курсора.
+
+        Args:
+            values (list): значения полей порядка у позиции.
+            reverse (bool): выбирать записи перед позицией.
+
+        Returns:
+            Q: условие фильтрации.
+        """
+
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.ordering = self.get_ordering(view)
+        cursor = self.decode_cursor(request)
+        values, reverse = cursor if cursor else (None, False)
+        order_by = [
+            f'-{name}' if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+        queryset = queryset.order_by(*order_by)
+        if values is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(values, reverse))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        page = results[:self.page_size]
+        if reverse:
+            page.reverse()
+        self.next = self.previous = None
+        if page:
+            if reverse:
+                self.previous = (
+                    self.get_position(page[0]) if has_more else None)
+                self.next = self.get_position(page[-1])
+            else:
+                self.previous = (
+                    self.get_position(page[0]) if cursor else None)
+                self.next = self.get_position(page[-1]) if has_more else None
+        elif reverse:
+            self.next = values
+        elif cursor:
+            self.previous = values
+        return page
+
+    def get_next_link(self):
+        if self.next is None:
+            return None
+        return self.encode_cursor(self.next, False)
+
+    def get_previous_link(self):
+        if self.previous is None:
+            return None
+        return self.encode_cursor(self.previous, True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class ApproximateCountPagination(LimitOffsetPagination):
+    """Постраничный вывод limit/offset с дешевым подсчетом count.
+
+    Для списка без фильтров в PostgreSQL count берется из оценки
+    pg_class.reltuples, если таблица больше APPROXIMATE_COUNT_THRESHOLD
+    строк. Количества кэшируются на COUNT_CACHE_TIMEOUT секунд по тексту
+    запроса и версиям групп кэша представления, поэтому изменения данных
+    сбрасывают их сразу. С ?count=false количество не считается
+    вовсе и в ответе равно null. Наличие следующей страницы всегда
+    определяется выборкой limit + 1 записей, а не по count.
+    """
+
+    count_query_param = 'count'
+
+    def is_count_requested(self, request):
+        """Проверяет, нужно ли считать количество записей.
+
+        Args:
+            request (Request): обьект запроса.
+
+        Returns:
+            bool: False если передан ?count=false.
+        """
+
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() not in FALSE_VALUES
+
+    def get_estimated_count(self, queryset, threshold):
+        """Считает записи выборки без фильтров по статистике PostgreSQL.
+
+        Если по оценке pg_class.reltuples в таблице не меньше threshold
+        строк, возвращается оценка, иначе тем же запросом выполняется
+        точный COUNT: подзапрос в ветке ELSE вычисляется, только когда она
+        выбрана.
+
+        Args:
+            queryset (QuerySet): выборка без фильтров.
+            threshold (int): размер таблицы, начиная с которого
+                используется оценка.
+
+        Returns:
+            int: количество записей или None, если база данных не
+            PostgreSQL или таблица не найдена.
+        """
+
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT CASE WHEN reltuples >= %s THEN reltuples::bigint '
+                f'ELSE (SELECT COUNT(*) FROM ({sql}) AS page) END '
+                'FROM pg_class WHERE oid = to_regclass(%s)',
+                [
+                    threshold,
+                    *params,
+                    connection.ops.quote_name(queryset.model._meta.db_table),
+                ]
+            )
+            row = cursor.fetchone()
+        return None if row is None else row[0]
+
+    def get_count_cache_key(self, queryset):
+        """Строит ключ кэша точного количества записей выборки.
+
+        Args:
+            queryset (QuerySet): выборка.
+
+        Returns:
+            str: ключ кэша.
+        """
+
+        groups = [GLOBAL_GROUP]
+        if hasattr(self.view, 'get_cache_groups'):
+            groups.extend(self.view.get_cache_groups())
+        sql, params = queryset.query.sql_with_params()
+        raw = '|'.join((
+            ','.join(str(version) for version in get_versions(groups)),
+            queryset.db,
+            sql,
+            repr(params),
+        ))
+        return COUNT_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+    def get_count(self, queryset):
+        if queryset.query.is_empty():
+            # Пустую выборку, например queryset.none(), нельзя перевести в
+            # SQL для ключа кэша, и считать в ней нечего.
+            return 0
+        # Количество попадает в общий кэш, поэтому считается по основной
+        # базе, а не по реплике.
+        with primary_reads():
+            cache = get_response_cache()
+            key = self.get_count_cache_key(queryset)
+            count = cache.get(key)
+            observe_cache('count', count is not None)
+            if count is not None:
+                return count
+            if not queryset.query.where and not queryset.query.distinct:
+                count = self.get_estimated_count(
+                    queryset,
+                    getattr(settings, 'APPROXIMATE_COUNT_THRESHOLD', 100000)
+                )
+            if count is None:
+                count = super().get_count(queryset)
+        cache.set(key, count, getattr(settings, 'COUNT_CACHE_TIMEOUT', 60))
+        return count
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.view = view
+        self.count = None
+        if self.is_count_requested(request):
+            self.count = self.get_count(queryset)
+            if self.count > self.limit and self.template is not None:
+                self.display_page_controls = True
+            if self.count == 0:
+                self.has_next = False
+                return []
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        return page[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+
+        offset = self.offset + self.limit
+        return replace_query_param(url, self.offset_query_param, offset)
+
+
+class CursorOrOffsetPagination(BasePagination):
+    """Постраничный вывод, который клиент выбирает сам.
+
+    По умолчанию используется offset_class (limit/offset со счетчиком
+    count), как и раньше. Параметр ?pagination=cursor или переданный
+    курсор включают cursor_class, если у представления задан
+    cursor_ordering. В режиме курсора сортировка ?ordering не действует.
+    """
+
+    offset_class = ApproximateCountPagination
+    cursor_class = KeysetPagination
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.active = self.offset_class()
+
+    def is_cursor_request(self, request, view):
+        """Проверяет, запрошен ли вывод по курсору.
+
+        Args:
+            request (Request): обьект запроса.
+            view (APIView): представление.
+
+        Returns:
+            bool: True если нужно листать по курсору.
+        """
+
+        if getattr(view, 'cursor_ordering', None) is None:
+            return False
+        return (request.query_params.get(self.mode_query_param) == CURSOR
+                or CURSOR in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_request(request, view):
+            self.active = self.cursor_class()
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.active.get_paginated_response_schema(schema)
+
+    @property
+    def display_page_controls(self):
+        return self.active.display_page_controls
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_schema_fields(self, view):
+        return self.active.get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.active.get_schema_operation_parameters(view)
@@ -30,6 +30,6 @@ class IsAuthorOrStaffOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         return (request.method in SAFE_METHODS
                 or not request.user.is_anonymous
-                and (request.user == obj.author
+                and (obj.author_id == request.user.id
                      or request.user.role == User.MODERATOR
                      or request.user.is_admin))
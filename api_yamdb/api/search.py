@@ -0,0 +1,177 @@
+import re
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from rest_framework.filters import BaseFilterBackend
+
+# Конфигурации PostgreSQL, по которым строятся search_vector в миграции
+# reviews.0005_search_vector.
+SEARCH_CONFIGS = ('russian', 'english')
+SEARCH_PARAM = 'search'
+TOKEN_RE = re.compile(r'\w+')
+# Веса полей для ранжирования: первое поле - 'A', остальные - 'B'.
+FIELD_WEIGHTS = (1.0, 0.4)
+
+
+def tokenize(text):
+    """Разбивает текст на слова в нижнем регистре.
+
+    Args:
+        text (str): текст или None.
+
+    Returns:
+        list: слова текста.
+    """
+
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """Обратный индекс по текстовым полям в памяти процесса.
+
+    Используется вместо tsvector на базах данных, отличных от PostgreSQL
+    (SQLite в локальной разработке и тестах). Слово запроса совпадает со
+    словом документа, если является его началом, - так грубо учитываются
+    окончания.
+    """
+
+    def __init__(self, rows, fields):
+        """Строит индекс.
+
+        Args:
+            rows (Iterable): словари значений полей с ключом pk.
+            fields (tuple): индексируемые поля по убыванию веса.
+        """
+
+        self.postings = defaultdict(lambda: defaultdict(float))
+        for row in rows:
+            for index, field in enumerate(fields):
+                weight = FIELD_WEIGHTS[min(index, len(FIELD_WEIGHTS) - 1)]
+                for token in tokenize(row[field]):
+                    self.postings[token][row['pk']] += weight
+
+    def search(self, query):
+        """Ищет документы, содержащие все слова запроса.
+
+        Args:
+            query (str): строка запроса.
+
+        Returns:
+            dict: pk найденных документов и их ранг.
+        """
+
+        ranks = None
+        for term in set(tokenize(query)):
+            matches = defaultdict(float)
+            for token, postings in self.postings.items():
+                if token.startswith(term):
+                    for pk, weight in postings.items():
+                        matches[pk] += weight
+            if ranks is None:
+                ranks = matches
+            else:
+                ranks = {
+                    pk: rank + matches[pk]
+                    for pk, rank in ranks.items() if pk in matches
+                }
+        return dict(ranks or {})
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру ?search=.
+
+    В PostgreSQL ищет по колонке search_vector (GIN индекс, значение
+    обновляет триггер) сразу в русской и английской конфигурациях и
+    сортирует по рангу ts_rank. На других базах данных строит
+    InvertedIndex по полям search_fields представления.
+    """
+
+    search_param = SEARCH_PARAM
+
+    def get_search_terms(self, request):
+        """Возвращает строку поиска из запроса.
+
+        Args:
+            request (Request): обьект запроса.
+
+        Returns:
+            str: строка поиска без крайних пробелов.
+        """
+
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if connections[queryset.db].vendor == 'postgresql':
+            return self.filter_postgresql(queryset, terms)
+        return self.filter_fallback(
+            queryset, terms, getattr(view, 'search_fields', ()))
+
+    def get_ordering(self, queryset):
+        """Возвращает порядок выборки для записей с равным рангом.
+
+        Args:
+            queryset (QuerySet): исходная выборка.
+
+        Returns:
+            tuple: поля сортировки.
+        """
+
+        return queryset.query.order_by or queryset.model._meta.ordering
+
+    def filter_postgresql(self, queryset, terms):
+        """Ищет по search_vector средствами PostgreSQL.
+
+        Args:
+            queryset (QuerySet): исходная выборка.
+            terms (str): строка поиска.
+
+        Returns:
+            QuerySet: найденные записи по убыванию ранга.
+        """
+
+        query = reduce(or_, (
+            SearchQuery(terms, config=config) for config in SEARCH_CONFIGS
+        ))
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        ).order_by('-search_rank', *self.get_ordering(queryset))
+
+    def filter_fallback(self, queryset, terms, fields):
+        """Ищет по обратному индексу в памяти.
+
+        Args:
+            queryset (QuerySet): исходная выборка.
+            terms (str): строка поиска.
+            fields (tuple): индексируемые поля.
+
+        Returns:
+            QuerySet: найденные записи по убыванию ранга.
+        """
+
+        index = InvertedIndex(queryset.order_by().values('pk', *fields),
+                              fields)
+        ranks = index.search(terms)
+        return queryset.filter(pk__in=ranks).annotate(
+            search_rank=Case(
+                *(When(pk=pk, then=Value(rank))
+                  for pk, rank in ranks.items()),
+                default=Value(0.0),
+                output_field=FloatField()
+            )
+        ).order_by('-search_rank', *self.get_ordering(queryset))
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Полнотекстовый поиск',
+            'schema': {'type': 'string'},
+        }]
@@ -1,9 +1,12 @@
-from core.mixins import ValidateMixin
-from rest_framework import generics, serializers
+from core.mixins import TimedSerializerMixin, ValidateMixin
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS
 from reviews.models import Category, Comments, Genre, Review, Title, User
 
 
-class UserSerializer(ValidateMixin, serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, ValidateMixin,
+                     serializers.ModelSerializer):
     """Сериализатор для работы с пользователями."""
 
     class Meta:
@@ -33,7 +36,7 @@ class TokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True, )
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для работы с жанрами."""
 
     class Meta:
@@ -41,7 +44,7 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для работы с категориями."""
 
     class Meta:
@@ -49,7 +52,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class ReadTitleSerializer(serializers.ModelSerializer):
+class ReadTitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для получения списка произведений."""
 
     category = CategorySerializer()
@@ -62,15 +65,72 @@ class ReadTitleSerializer(serializers.ModelSerializer):
                   'description', 'genre', 'category')
         read_only_fields = ('__all__',)
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Подгружает вложенные категории и жанры заранее.
 
-class WriteTitleSerializer(serializers.ModelSerializer):
+        Категория присоединяется в том же запросе, жанры всех произведений
+        страницы загружаются одним запросом через TitlesGenres в порядке id
+        жанра, как в FastReadTitleSerializer.
+
+        Args:
+            queryset (QuerySet): произведения.
+
+        Returns:
+            QuerySet: произведения с подгрузкой категорий и жанров.
+        """
+
+        return queryset.select_related('category').prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by('pk')))
+
+
+class SlugListRelatedField(serializers.ManyRelatedField):
+    """Список объектов по slug, который загружается одним запросом, а не
+    запросом на каждый slug, как в ManyRelatedField.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        if not all(isinstance(slug, str) for slug in data):
+            child.fail('invalid')
+        found = {
+            getattr(obj, child.slug_field): obj
+            for obj in child.get_queryset().filter(
+                **{f'{child.slug_field}__in': data})
+        }
+        for slug in data:
+            if slug not in found:
+                child.fail(
+                    'does_not_exist', slug_name=child.slug_field, value=slug)
+        return [found[slug] for slug in data]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который при many=True проверяет все slug одним
+    запросом.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugListRelatedField(**list_kwargs)
+
+
+class WriteTitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для создания произведения."""
 
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=Genre.objects.all(),
         many=True,
         slug_field='slug'
@@ -81,7 +141,35 @@ class WriteTitleSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year', 'description', 'genre', 'category')
 
 
-class ReviewsSerializer(serializers.ModelSerializer):
+class AuthorEagerLoadingMixin:
+    """Подгрузка автора для сериализаторов отзывов и комментариев."""
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Присоединяет автора в том же запросе и загружает только нужные
+        колонки.
+
+        От автора берется только username. У записи не загружается
+        поисковый вектор, остальные поля нужны при изменении: дата
+        изменения, связь с родителем и оценка для пересчета рейтинга.
+
+        Args:
+            queryset (QuerySet): отзывы или комментарии.
+
+        Returns:
+            QuerySet: записи с присоединенным автором.
+        """
+
+        fields = [
+            field.name for field in cls.Meta.model._meta.concrete_fields
+            if field.name != 'search_vector'
+        ]
+        return queryset.select_related('author').only(
+            *fields, 'author__username')
+
+
+class ReviewsSerializer(AuthorEagerLoadingMixin, TimedSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериализатор для работы с отзывами."""
 
     author = serializers.SlugRelatedField(
@@ -107,14 +195,9 @@ class ReviewsSerializer(serializers.ModelSerializer):
 
         if self.context['request'].method != 'POST':
             return data
-        title = generics.get_object_or_404(
-            Title,
-            id=self.context['request'].parser_context['kwargs'].get(
-                'title_id')
-        )
         if Review.objects.filter(
-            title_id=title.id,
-            author=self.context['request'].user
+            title_id=self.context['title'].id,
+            author_id=self.context['request'].user.id
         ).exists():
             raise serializers.ValidationError(
                 detail=('На произведение можно оставить '
@@ -128,7 +211,8 @@ class ReviewsSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(AuthorEagerLoadingMixin, TimedSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор для работы с комментариями."""
 
     author = serializers.SlugRelatedField(
@@ -143,8 +227,13 @@ class CommentsSerializer(serializers.ModelSerializer):
         Args:
             data (dict): словарь с данными для валидации.
 
+        Комментировать может только пользователь, оставивший отзыв на это
+        произведение. Произведение берется из отзыва в контексте, который
+        представление уже загрузило.
+
         Raises:
-            serializers.ValidationError: ошибка при отсутсвии отзыва.
+            serializers.ValidationError: ошибка при отсутсвии отзыва
+            пользователя на произведение.
 
         Returns:
             dict: словарь с проверенными данными.
@@ -152,14 +241,9 @@ class CommentsSerializer(serializers.ModelSerializer):
 
         if self.context['request'].method != 'POST':
             return data
-        title = generics.get_object_or_404(
-            Title,
-            id=self.context['request'].parser_context['kwargs'].get(
-                'title_id')
-        )
         if not Review.objects.filter(
-            title_id=title.id,
-            author=self.context['request'].user
+            title_id=self.context['review'].title_id,
+            author_id=self.context['request'].user.id
         ).exists():
             raise serializers.ValidationError(
                 detail=('Отзыв не найден'),
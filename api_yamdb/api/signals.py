@@ -0,0 +1,97 @@
+from core.cache import bump_versions
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitlesGenres, User)
+
+from .authentication import revoke_tokens
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_claims_change(sender, instance, created, raw=False,
+                                   **kwargs):
+    """Отзывает токены пользователя, если изменились данные в их
+    утверждениях или пользователь стал неактивным.
+
+    Смена имени пользователя делает устаревшими закэшированные отзывы и
+    комментарии, в которых оно выводится. Состояние запоминается и у
+    только что созданного пользователя, иначе повторное сохранение при
+    регистрации выглядело бы как изменение утверждений.
+    """
+
+    if raw:
+        return
+    state = instance.get_token_state()
+    old_state = getattr(instance, '_token_state', None)
+    if not created and old_state != state:
+        revoke_tokens(instance.pk)
+        if old_state is None or old_state[0] != state[0]:
+            bump_versions('users')
+    instance._token_state = state
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    """Отзывает токены удаленного пользователя."""
+
+    revoke_tokens(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_titles(sender, instance, **kwargs):
+    """Сбрасывает кэш произведений и отзывов на произведение."""
+
+    bump_versions('titles', f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, instance, **kwargs):
+    """Сбрасывает кэш категорий и произведений, в которые они вложены."""
+
+    bump_versions('categories', 'titles')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, instance, **kwargs):
+    """Сбрасывает кэш жанров и произведений, в которые они вложены."""
+
+    bump_versions('genres', 'titles')
+
+
+@receiver(post_save, sender=TitlesGenres)
+@receiver(post_delete, sender=TitlesGenres)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, **kwargs):
+    """Сбрасывает кэш произведений при изменении их жанров."""
+
+    bump_versions('titles')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    """Сбрасывает кэш отзывов, их комментариев и рейтинга произведения."""
+
+    bump_versions(
+        'titles', f'reviews:{instance.title_id}', f'comments:{instance.pk}')
+
+
+@receiver(pre_save, sender=Review)
+def invalidate_moved_review(sender, instance, raw=False, **kwargs):
+    """Сбрасывает кэш отзывов прежнего произведения при переносе отзыва."""
+
+    old_state = getattr(instance, '_rating_state', None)
+    if not raw and old_state is not None and old_state[0] != instance.title_id:
+        bump_versions(f'reviews:{old_state[0]}')
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_delete, sender=Comments)
+def invalidate_comments(sender, instance, **kwargs):
+    """Сбрасывает кэш комментариев к отзыву."""
+
+    bump_versions(f'comments:{instance.review_id}')
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (CategoriesViewSet, CommentsViewSet, GenresViewSet,
                     ReviewsViewSet, TitlesViewSet, UserViewSet, get_token,
-                    registration)
+                    registration, request_timings)
 
 router_v1 = DefaultRouter()
 router_v1.register(r'users', UserViewSet, basename='users')
@@ -28,5 +28,6 @@ auth_urls = [
 
 urlpatterns = [
     path('v1/auth/', include(auth_urls)),
+    path('v1/timings/', request_timings, name='request_timings'),
     path('v1/', include(router_v1.urls)),
 ]
@@ -1,9 +1,11 @@
 import random
 
-from core.views import CreateListDestroyModelMixinSet
-from django.core.mail import send_mail
+from core.cache import CachedListMixin, CachedListRetrieveMixin
+from core.conditional import ConditionalGetMixin, stamp_annotations
+from core.mail import queue_mail
+from core.metrics import histogram
+from core.views import CreateListDestroyModelMixinSet, ValuesListMixin
 from django.db import IntegrityError
-from django.db.models import Avg
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from rest_framework import filters, generics, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
@@ -12,13 +14,19 @@ from rest_framework.permissions import (SAFE_METHODS, AllowAny,
                                         IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from reviews.models import Category, Genre, Review, Title, User
 
 from api_yamdb import settings
 
-from .filters import TitleFilter
+from .authentication import (ClaimsAccessToken, DatabaseJWTAuthentication,
+                             as_user_instance)
+from .catalog import categories, genres
+from .fast_serializers import (FastCommentsSerializer, FastReadTitleSerializer,
+                               FastReviewsSerializer)
+from .filters import TitleFilter, TrigramSimilarityFilter
+from .pagination import CursorOrOffsetPagination
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrStaffOrReadOnly
+from .search import FullTextSearchFilter
 from .serializers import (CategorySerializer, CommentsSerializer,
                           EditProfileSerializer, GenreSerializer,
                           ReadTitleSerializer, RegistrationSerializer,
@@ -47,10 +55,12 @@ class UserViewSet(viewsets.ModelViewSet):
         detail=False,
         url_path='me',
         permission_classes=[IsAuthenticated],
+        authentication_classes=[DatabaseJWTAuthentication],
         serializer_class=EditProfileSerializer)
     def get_and_edit_self_profile(self, request):
         """Выводит данные о текущем пользователе либо измененные данные о
         текущем пользователе в зависимости от типа запроса.
+        Пользователь загружается из базы данных, а не из токена.
 
         Args:
             request (Request): обьект запроса.
@@ -77,7 +87,8 @@ class UserViewSet(viewsets.ModelViewSet):
 @permission_classes([AllowAny])
 def registration(request):
     """Регистрация пользователя и восстановление секретного кода.
-        Отправляет сообщение с кодом подтверждения на email пользователя.
+        Ставит в очередь сообщение с кодом подтверждения на email
+        пользователя, письмо отправляет команда sendmail.
 
     Args:
         request (Request): обьект запроса.
@@ -101,7 +112,7 @@ def registration(request):
         return Response(BAD_REQUEST_MESSAGE, status=BAD_REQUEST)
     user.confirmation_code = confirmation_code
     user.save()
-    send_mail(
+    queue_mail(
         subject='Confirmation code',
         message=f'Your confirmation code: {confirmation_code}',
         from_email=settings.EMAIL_HOST_USER,
@@ -131,27 +142,62 @@ def get_token(request):
         User, username=serializer.validated_data['username'])
     if (user.confirmation_code
             == serializer.validated_data['confirmation_code']):
-        token = RefreshToken.for_user(user)
-        return Response(
-            {'token': str(token.access_token)}, status=OK)
+        token = ClaimsAccessToken.for_user(user)
+        return Response({'token': str(token)}, status=OK)
     return Response(serializer.errors, status=BAD_REQUEST)
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def request_timings(request):
+    """Показатели запросов этого процесса за последние
+    REQUEST_METRICS_WINDOW секунд по представлениям.
+
+    Args:
+        request (Request): обьект запроса.
+
+    Returns:
+        Response: объект ответа с количеством запросов, средним временем,
+        SQL запросами, временем сериализации и гистограммой времени ответа
+        для каждого представления.
+    """
+
+    return Response(histogram.snapshot(), status=OK)
+
+
+class TitlesViewSet(CachedListRetrieveMixin, ConditionalGetMixin,
+                    ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для работы с произведениями."""
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.all()
+    values_serializer_class = FastReadTitleSerializer
+    cache_groups = ('titles',)
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdminOrReadOnly)
-    paginathion_class = (LimitOffsetPagination,)
+    pagination_class = CursorOrOffsetPagination
+    cursor_ordering = ('name', 'id')
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
+        FullTextSearchFilter,
+        TrigramSimilarityFilter,
         filters.OrderingFilter
     )
     filterset_class = TitleFilter
-    search_fields = ('name',)
+    search_fields = ('name', 'description')
     ordering_fields = ('name',)
 
+    def get_queryset(self):
+        """Получает список произведений.
+
+        Returns:
+            QuerySet: список произведений без поискового вектора, для
+            чтения - с заранее подгруженными категориями и жанрами.
+        """
+
+        queryset = super().get_queryset().defer('search_vector')
+        if self.request.method in SAFE_METHODS:
+            return ReadTitleSerializer.setup_eager_loading(queryset)
+        return queryset
+
     def get_serializer_class(self):
         """Возвращает класс сериализатора.
 
@@ -169,24 +215,48 @@ class TitlesViewSet(viewsets.ModelViewSet):
         return WriteTitleSerializer
 
 
-class CategoriesGenresViewSet(CreateListDestroyModelMixinSet):
+class CategoriesGenresViewSet(CachedListMixin,
+                              CreateListDestroyModelMixinSet):
     """Родительский ViewSet для работы с категориями/жанрами."""
 
     permission_classes = (IsAdminOrReadOnly,)
     paginathion_class = (LimitOffsetPagination,)
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (filters.SearchFilter, TrigramSimilarityFilter)
     search_fields = ('name',)
     lookup_field = 'slug'
+    catalog = None
 
     class Meta:
         abstract = True
 
+    def list(self, request, *args, **kwargs):
+        """Выводит список из справочника в памяти процесса без обращения к
+        базе данных. Поиск по названию выполняется в базе данных.
+
+        Args:
+            request (Request): обьект запроса.
+
+        Returns:
+            Response: объект ответа со списком категорий/жанров.
+        """
+
+        if (request.query_params.get(filters.SearchFilter.search_param)
+                or request.query_params.get('name__similar')):
+            return super().list(request, *args, **kwargs)
+        entries = self.catalog.all()
+        page = self.paginate_queryset(entries)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(entries, status=OK)
+
 
 class CategoriesViewSet(CategoriesGenresViewSet):
     """ViewSet для работы с категориями."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_groups = ('categories',)
+    catalog = categories
 
 
 class GenresViewSet(CategoriesGenresViewSet):
@@ -194,38 +264,86 @@ class GenresViewSet(CategoriesGenresViewSet):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_groups = ('genres',)
+    catalog = genres
 
 
-class ReviewsViewSet(viewsets.ModelViewSet):
+class ReviewsViewSet(CachedListRetrieveMixin, ConditionalGetMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для работы с отзывами."""
 
     serializer_class = ReviewsSerializer
+    values_serializer_class = FastReviewsSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrStaffOrReadOnly)
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    pagination_class = CursorOrOffsetPagination
+    cursor_ordering = ('-pub_date', 'id')
+    filter_backends = (FullTextSearchFilter,)
+    search_fields = ('text',)
 
-    def get_title(self, id=None):
+    def get_title(self):
         """Получает обьект текущего произведения.
 
-        Args:
-            id (int, optional): id рецепта. Defaults to None.
+        Произведение запрашивается один раз за запрос и далее берется из
+        атрибута представления. Для списка отзывов тем же запросом
+        считаются валидаторы условного GET.
 
         Returns:
             Title: обьект текущего произведения.
         """
 
-        return generics.get_object_or_404(
-            Title, id=self.kwargs.get('title_id')
+        if not hasattr(self, '_title'):
+            queryset = Title.objects.defer('search_vector')
+            if self.action == 'list':
+                queryset = queryset.annotate(**stamp_annotations('reviews'))
+            self._title = generics.get_object_or_404(
+                queryset, id=self.kwargs.get('title_id')
+            )
+        return self._title
+
+    def get_list_validators(self):
+        """Возвращает валидаторы списка отзывов произведения.
+
+        Returns:
+            tuple: части ETag и дата изменения.
+        """
+
+        title = self.get_title()
+        return (
+            (title.pk, title.stamp_count, title.stamp_created,
+             title.stamp_modified),
+            title.stamp_modified
         )
 
+    def get_cache_groups(self):
+        """Возвращает группы кэша отзывов текущего произведения.
+
+        Returns:
+            tuple: названия групп.
+        """
+
+        return (f'reviews:{self.kwargs.get("title_id")}', 'users')
+
     def get_queryset(self):
         """Получает список отзывов на текущее произведение.
 
         Returns:
-            QuerySet: список отзывов на текущее произведение.
+            QuerySet: список отзывов на текущее произведение с
+            присоединенным автором.
         """
 
-        return self.get_title().reviews.all()
+        return ReviewsSerializer.setup_eager_loading(
+            self.get_title().reviews.all())
+
+    def get_serializer_context(self):
+        """Добавляет текущее произведение в контекст сериализатора.
+
+        Returns:
+            dict: контекст сериализатора.
+        """
+
+        context = super().get_serializer_context()
+        context['title'] = self.get_title()
+        return context
 
     def perform_create(self, serializer):
         """При добавлении отзыва привязывает к нему пользователя который его
@@ -237,42 +355,89 @@ class ReviewsViewSet(viewsets.ModelViewSet):
         """
 
         serializer.save(
-            author=self.request.user,
+            author=as_user_instance(self.request.user),
             title=self.get_title()
         )
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(CachedListRetrieveMixin, ConditionalGetMixin,
+                      ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для работы с коментариями."""
 
     serializer_class = CommentsSerializer
+    values_serializer_class = FastCommentsSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrStaffOrReadOnly)
-    filter_backends = (filters.SearchFilter,)
+    pagination_class = CursorOrOffsetPagination
+    cursor_ordering = ('-pub_date', 'id')
+    filter_backends = (FullTextSearchFilter,)
     search_fields = ('text',)
 
     def get_review(self):
         """Получает объект текущего отзыва.
 
+        Отзыв и его принадлежность текущему произведению проверяются одним
+        запросом, результат сохраняется в атрибуте представления. Для списка
+        комментариев тем же запросом считаются валидаторы условного GET.
+
         Returns:
             Review: объект текущего отзыва.
         """
 
-        return generics.get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title=ReviewsViewSet.get_title(
-                self, id=self.kwargs.get('title_id')
+        if not hasattr(self, '_review'):
+            queryset = Review.objects.defer('search_vector')
+            if self.action == 'list':
+                queryset = queryset.annotate(**stamp_annotations('comments'))
+            self._review = generics.get_object_or_404(
+                queryset,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
             )
+        return self._review
+
+    def get_list_validators(self):
+        """Возвращает валидаторы списка комментариев отзыва.
+
+        Returns:
+            tuple: части ETag и дата изменения.
+        """
+
+        review = self.get_review()
+        return (
+            (review.pk, review.stamp_count, review.stamp_created,
+             review.stamp_modified),
+            review.stamp_modified
         )
 
+    def get_cache_groups(self):
+        """Возвращает группы кэша комментариев текущего отзыва.
+
+        Returns:
+            tuple: названия групп.
+        """
+
+        return (f'comments:{self.kwargs.get("review_id")}', 'users')
+
     def get_queryset(self):
         """Получает список комментариев на текущий отзыв.
 
         Returns:
-            QuerySet: список комментариев на текущий отзыв.
+            QuerySet: список комментариев на текущий отзыв с
+            присоединенным автором.
+        """
+
+        return CommentsSerializer.setup_eager_loading(
+            self.get_review().comments.all())
+
+    def get_serializer_context(self):
+        """Добавляет текущий отзыв в контекст сериализатора.
+
+        Returns:
+            dict: контекст сериализатора.
         """
 
-        return self.get_review().comments.all()
+        context = super().get_serializer_context()
+        context['review'] = self.get_review()
+        return context
 
     def perform_create(self, serializer):
         """При добавлении комментария к отзыву привязывает к нему пользователя
@@ -284,6 +449,6 @@ class CommentsViewSet(viewsets.ModelViewSet):
         """
 
         serializer.save(
-            author=self.request.user,
+            author=as_user_instance(self.request.user),
             review=self.get_review()
         )
@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_filters',
@@ -35,6 +36,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,10 +78,49 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', '1234qwer'),
         'HOST': os.getenv('DB_HOST', 'db'),
-        'PORT': os.getenv('DB_PORT', 5432)
+        'PORT': os.getenv('DB_PORT', 5432),
+        # Соединение переживает запрос и закрывается через столько секунд;
+        # 0 - закрывать после каждого запроса, как по умолчанию в Django.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Перед запросом проверять, что сохраненное соединение живо, если
+        # оно не использовалось дольше CONN_HEALTH_CHECK_IDLE секунд.
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1'),
+        'CONN_HEALTH_CHECK_IDLE': float(
+            os.getenv('DB_CONN_HEALTH_CHECK_IDLE', 10)),
+        # Используется только с DB_ENGINE=core.db.backends.postgresql_pool,
+        # этот бэкенд всегда работает с CONN_MAX_AGE = 0.
+        'POOL': {
+            'MIN_SIZE': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        },
     }
 }
 
+# Реплики для чтения: DB_REPLICAS=host1:5432,host2. Остальные параметры
+# соединения берутся из default; в тестах реплики смотрят на тестовую базу.
+REPLICA_DATABASES = []
+for index, address in enumerate(filter(None, os.getenv(
+        'DB_REPLICAS', '').split(','))):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Сколько секунд после записи чтения пользователя идут в основную базу.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+# Кэш этих отметок; с DB_REPLICAS он должен быть общим для процессов
+# gunicorn (CACHE_BACKEND), иначе приложение не запустится.
+REPLICA_PIN_CACHE = 'default'
+
 
 # Password validation
 
@@ -117,6 +159,62 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR + '/api/static/']
 STATIC_ROOT = BASE_DIR + '/static/'
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+    # Отзыв токенов хранится отдельно: общий кэш вытесняет записи.
+    'jwt_revocation': {
+        'BACKEND': os.getenv(
+            'JWT_REVOCATION_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv(
+            'JWT_REVOCATION_CACHE_LOCATION', BASE_DIR + '/jwt_revocation/'),
+        'OPTIONS': {'MAX_ENTRIES': 1000000},
+    },
+}
+
+# Кэш отзыва токенов должен быть постоянным и общим для процессов gunicorn,
+# иначе приложение не запустится.
+JWT_REVOCATION_CACHE = 'jwt_revocation'
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300))
+
+# Pagination counts
+
+APPROXIMATE_COUNT_THRESHOLD = int(
+    os.getenv('APPROXIMATE_COUNT_THRESHOLD', 100000))
+COUNT_CACHE_TIMEOUT = int(os.getenv('COUNT_CACHE_TIMEOUT', 60))
+
+# Categories and genres catalogue
+
+CATALOG_TIMEOUT = int(os.getenv('CATALOG_TIMEOUT', 60))
+
+# Request metrics
+
+REQUEST_METRICS_WINDOW = int(os.getenv('REQUEST_METRICS_WINDOW', 300))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yamdb.requests': {
+            'handlers': ['console'],
+            'level': os.getenv('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
@@ -124,14 +222,19 @@ AUTH_USER_MODEL = 'reviews.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.getenv('EMAIL_HOST')
-EMAIL_PORT = 587
-EMAIL_USE_TLS = True
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() in ('true', '1')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.StatelessJWTAuthentication",
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
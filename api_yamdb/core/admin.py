@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import OutgoingMail
+
+
+@admin.register(OutgoingMail)
+class OutgoingMailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'created', 'sent',
+                    'attempts')
+    list_filter = ('sent',)
+    search_fields = ('recipient',)
+    empty_value_display = '-пусто-'
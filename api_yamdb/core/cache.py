@@ -0,0 +1,185 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from .conditional import not_modified
+from .prometheus import observe_cache
+from .routers import primary_reads
+
+VERSION_KEY = 'response-version:{}'
+RESPONSE_KEY = 'response:{}'
+# Группа, версия которой входит в ключ любого ответа. Ее увеличивают
+# массовые операции, которые обходят сигналы моделей.
+GLOBAL_GROUP = 'all'
+# Заголовки, которые сохраняются вместе с данными ответа.
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_response_cache():
+    """Возвращает кэш ответов API.
+
+    Returns:
+        BaseCache: кэш из настройки RESPONSE_CACHE_ALIAS.
+    """
+
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def get_versions(groups):
+    """Возвращает текущие версии групп кэша.
+
+    Отсутствующая версия создается со значением от текущего времени в
+    наносекундах, поэтому версия, вытесненная из кэша, не совпадет ни с
+    одной из прежних.
+
+    Args:
+        groups (Iterable): названия групп.
+
+    Returns:
+        list: версии групп в том же порядке.
+    """
+
+    cache = get_response_cache()
+    keys = [VERSION_KEY.format(group) for group in groups]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(*groups, using=None):
+    """Увеличивает версии групп, делая закэшированные ответы устаревшими.
+
+    Внутри транзакции версии меняются только после ее фиксации. Иначе
+    параллельный запрос мог бы прочитать еще не измененные строки и
+    сохранить их в кэше под новой версией. Вне транзакции версии меняются
+    сразу.
+
+    Args:
+        *groups (str): названия групп.
+        using (str): база данных, транзакции которой ожидать.
+    """
+
+    transaction.on_commit(lambda: _bump_versions(groups), using=using)
+
+
+def _bump_versions(groups):
+    """Увеличивает версии групп сразу.
+
+    Args:
+        groups (tuple): названия групп.
+    """
+
+    cache = get_response_cache()
+    for group in groups:
+        key = VERSION_KEY.format(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
+
+
+class CachedListMixin:
+    """Кэширует ответы list для анонимных безопасных запросов.
+
+    Ключ ответа строится из версий групп get_cache_groups(), адреса запроса,
+    упорядоченных параметров строки запроса и формата ответа. Сигналы
+    моделей увеличивают версии групп, поэтому устаревший ответ никогда не
+    отдается. Вместе с данными сохраняются ETag и Last-Modified, так что
+    условный запрос получает 304 прямо из кэша. Ответ, который попадет в
+    кэш, собирается по основной базе, а не по реплике.
+    """
+
+    cache_groups = ()
+
+    def get_cache_groups(self):
+        """Возвращает группы кэша, от которых зависит ответ представления.
+
+        Returns:
+            tuple: названия групп.
+        """
+
+        return self.cache_groups
+
+    def get_cache_key(self, request):
+        """Строит ключ кэша для запроса.
+
+        Args:
+            request (Request): обьект запроса.
+
+        Returns:
+            str: ключ ответа в кэше.
+        """
+
+        groups = (GLOBAL_GROUP, *self.get_cache_groups())
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        raw = '|'.join((
+            ','.join(str(version) for version in get_versions(groups)),
+            request.build_absolute_uri(request.path),
+            query,
+            getattr(request.accepted_renderer, 'format', '')
+        ))
+        return RESPONSE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Отдает ответ из кэша либо вызывает обработчик и кэширует ответ.
+
+        Args:
+            handler (callable): действие представления.
+            request (Request): обьект запроса.
+
+        Returns:
+            Response: объект ответа.
+        """
+
+        if (request.method not in SAFE_METHODS
+                or not request.user.is_anonymous):
+            return handler(request, *args, **kwargs)
+        cache = get_response_cache()
+        key = self.get_cache_key(request)
+        cached = cache.get(key)
+        observe_cache('response', cached is not None)
+        if cached is not None:
+            data, headers = cached
+            if 'ETag' in headers:
+                response = not_modified(
+                    request,
+                    headers['ETag'],
+                    parse_http_date_safe(headers.get('Last-Modified'))
+                )
+                if response is not None:
+                    return response
+            return Response(data, headers=headers)
+        with primary_reads():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {
+                header: response[header] for header in CACHED_HEADERS
+                if response.has_header(header)
+            }
+            cache.set(
+                key,
+                (response.data, headers),
+                getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+            )
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedListRetrieveMixin(CachedListMixin):
+    """Кэширует ответы list и retrieve для анонимных безопасных запросов."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,175 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+OK = 200
+
+
+def get_etag(request, *parts):
+    """Строит сильный ETag из частей версии ресурса и представления запроса.
+
+    Args:
+        request (Request): обьект запроса.
+        *parts: значения, от которых зависит содержимое ответа.
+
+    Returns:
+        str: ETag в кавычках.
+    """
+
+    raw = '|'.join((
+        *(str(part) for part in parts),
+        request.get_full_path(),
+        getattr(request.accepted_renderer, 'format', ''),
+    ))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def to_timestamp(value):
+    """Переводит дату в секунды от начала эпохи для Last-Modified.
+
+    Args:
+        value (datetime): дата или None.
+
+    Returns:
+        int: метка времени или None.
+    """
+
+    return None if value is None else timegm(value.utctimetuple())
+
+
+def set_validators(response, etag, last_modified):
+    """Добавляет к ответу заголовки ETag и Last-Modified.
+
+    Args:
+        response (HttpResponse): объект ответа.
+        etag (str): ETag.
+        last_modified (int): метка времени изменения или None.
+
+    Returns:
+        HttpResponse: тот же объект ответа.
+    """
+
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """Проверяет If-None-Match и If-Modified-Since запроса.
+
+    Args:
+        request (Request): обьект запроса.
+        etag (str): текущий ETag ресурса.
+        last_modified (int): метка времени изменения или None.
+
+    Returns:
+        HttpResponse: ответ 304 с заголовками валидаторов или None, если
+        ресурс нужно отдать целиком.
+    """
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified)
+
+
+def stamp_annotations(relation):
+    """Строит аннотации родителя, по которым проверяется список дочерних
+    объектов: количество, дата последнего создания и изменения.
+
+    Максимум дат изменения дочерних объектов уменьшается, когда удаляется
+    самый новый из них, поэтому дата изменения списка не меньше даты
+    изменения родителя. Ее при удалении дочернего объекта обновляют сигналы
+    reviews.signals.
+
+    Args:
+        relation (str): имя обратной связи с дочерними объектами.
+
+    Returns:
+        dict: аннотации stamp_count, stamp_created и stamp_modified.
+    """
+
+    return {
+        'stamp_count': Count(relation),
+        'stamp_created': Max(f'{relation}__pub_date'),
+        'stamp_modified': Greatest(
+            'modified', Max(f'{relation}__modified')),
+    }
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified на условные GET/HEAD запросы list и
+    retrieve, не выполняя сериализацию.
+
+    Версию объекта дает get_object_validators(), версию списка -
+    get_list_validators(); если они возвращают None, запрос обрабатывается
+    как обычно.
+    """
+
+    def get_object_validators(self, instance):
+        """Возвращает части ETag и дату изменения объекта.
+
+        Args:
+            instance (Model): объект.
+
+        Returns:
+            tuple: части ETag и дата изменения.
+        """
+
+        return (instance.pk, instance.modified), instance.modified
+
+    def get_list_validators(self):
+        """Возвращает части ETag и дату изменения списка.
+
+        Returns:
+            tuple: части ETag и дата изменения или None, если список не
+            поддерживает условные запросы.
+        """
+
+    def conditional_response(self, request, validators, handler):
+        """Отдает 304 по валидаторам либо ответ обработчика с ними.
+
+        Args:
+            request (Request): обьект запроса.
+            validators (tuple): части ETag и дата изменения или None.
+            handler (callable): функция, строящая полный ответ.
+
+        Returns:
+            HttpResponse: объект ответа.
+        """
+
+        if validators is None:
+            return handler()
+        parts, modified = validators
+        etag = get_etag(request, *parts)
+        last_modified = to_timestamp(modified)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        response = handler()
+        if response.status_code == OK:
+            set_validators(response, etag, last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            self.get_list_validators(),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        return self.conditional_response(
+            request,
+            self.get_object_validators(instance),
+            lambda: Response(self.get_serializer(instance).data)
+        )
@@ -0,0 +1,193 @@
+import threading
+import time
+
+from django.db.backends.postgresql import base as postgresql
+from prometheus_client import Gauge, Histogram
+from psycopg2.pool import ThreadedConnectionPool
+
+POOL_DEFAULTS = {'MIN_SIZE': 2, 'MAX_SIZE': 10, 'TIMEOUT': 10}
+
+POOL_CONNECTIONS = Gauge(
+    'yamdb_db_pool_connections',
+    'Соединения пула: used - выданы потокам, max - размер пула',
+    ('alias', 'state'),
+    multiprocess_mode='livesum'
+)
+POOL_WAIT = Histogram(
+    'yamdb_db_pool_wait_seconds',
+    'Время ожидания свободного соединения пула',
+    ('alias',),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def is_usable(connection):
+    """Проверяет соединение psycopg2 запросом SELECT 1.
+
+    Args:
+        connection: соединение psycopg2.
+
+    Returns:
+        bool: соединение открыто и отвечает.
+    """
+
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        if not connection.autocommit:
+            connection.rollback()
+    except postgresql.Database.Error:
+        return False
+    return True
+
+
+class ConnectionPool:
+    """Пул соединений одного процесса поверх ThreadedConnectionPool.
+
+    ThreadedConnectionPool сразу отказывает, если свободных соединений
+    нет; здесь поток ждет освобождения до timeout секунд. В пуле остаются
+    открытыми не больше min_size свободных соединений, остальные
+    закрываются при возврате.
+    """
+
+    def __init__(self, alias, min_size, max_size, timeout,
+                 health_checks=False, **conn_params):
+        """Открывает min_size соединений.
+
+        Args:
+            alias (str): псевдоним базы данных для метрик.
+            min_size (int): сколько свободных соединений держать открытыми.
+            max_size (int): сколько соединений можно выдать одновременно.
+            timeout (float): сколько секунд ждать свободного соединения.
+            health_checks (bool): проверять соединение перед выдачей.
+            **conn_params: параметры psycopg2.connect().
+        """
+
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_checks = health_checks
+        self.pool = ThreadedConnectionPool(min_size, max_size, **conn_params)
+        self.slots = threading.BoundedSemaphore(max_size)
+        POOL_CONNECTIONS.labels(alias, 'max').inc(max_size)
+
+    def acquire(self):
+        """Выдает соединение, при необходимости дожидаясь свободного.
+
+        С health_checks неработающие свободные соединения выбрасываются,
+        пока не найдется живое: после перезапуска PostgreSQL мертвы все
+        свободные соединения. Их не больше max_size, поэтому не позже чем
+        через max_size попыток пул открывает новое соединение.
+
+        Returns:
+            соединение psycopg2.
+
+        Raises:
+            OperationalError: за timeout секунд соединение не освободилось.
+        """
+
+        start = time.perf_counter()
+        if not self.slots.acquire(timeout=self.timeout):
+            raise postgresql.Database.OperationalError(
+                f'Нет свободных соединений в пуле {self.alias} '
+                f'за {self.timeout} с'
+            )
+        POOL_WAIT.labels(self.alias).observe(time.perf_counter() - start)
+        try:
+            connection = self.pool.getconn()
+            for _ in range(self.max_size if self.health_checks else 0):
+                if is_usable(connection):
+                    break
+                self.pool.putconn(connection, close=True)
+                connection = self.pool.getconn()
+        except Exception:
+            self.slots.release()
+            raise
+        POOL_CONNECTIONS.labels(self.alias, 'used').inc()
+        return connection
+
+    def release(self, connection):
+        """Возвращает соединение в пул.
+
+        Незавершенная транзакция откатывается, закрытое соединение
+        выбрасывается.
+
+        Args:
+            connection: соединение, полученное от acquire().
+        """
+
+        try:
+            self.pool.putconn(connection)
+        finally:
+            POOL_CONNECTIONS.labels(self.alias, 'used').dec()
+            self.slots.release()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """Возвращает пул процесса для параметров соединения, создавая его при
+    первом обращении.
+
+    Args:
+        alias (str): псевдоним базы данных.
+        settings_dict (dict): настройки базы данных из DATABASES.
+        conn_params (dict): параметры psycopg2.connect().
+
+    Returns:
+        ConnectionPool: пул соединений.
+    """
+
+    key = (alias, repr(sorted(conn_params.items())))
+    with _pools_lock:
+        if key not in _pools:
+            options = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+            _pools[key] = ConnectionPool(
+                alias, options['MIN_SIZE'], options['MAX_SIZE'],
+                options['TIMEOUT'],
+                settings_dict.get('CONN_HEALTH_CHECKS', False),
+                **conn_params
+            )
+        return _pools[key]
+
+
+def close_pools():
+    """Закрывает все соединения пулов процесса."""
+
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.pool.closeall()
+        _pools.clear()
+
+
+class DatabaseWrapper(postgresql.DatabaseWrapper):
+    """Бэкенд PostgreSQL, который берет соединения из пула процесса и
+    возвращает их туда вместо закрытия.
+
+    Рассчитан на gunicorn с потоками (--threads): потоки одного процесса
+    делят соединения пула. CONN_MAX_AGE всегда 0: соединение возвращается
+    в пул в конце запроса, иначе поток держал бы его между запросами.
+    """
+
+    pool = None
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__({**settings_dict, 'CONN_MAX_AGE': 0}, *args, **kwargs)
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.alias, self.settings_dict, conn_params)
+        connection = self.pool.acquire()
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level)
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
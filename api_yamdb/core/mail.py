@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage
+from django.db import router, transaction
+from django.utils import timezone
+
+from .models import OutgoingMail
+
+RETRY_DELAY = timedelta(seconds=30)
+MAX_ATTEMPTS = 5
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь на отправку вместо отправки по SMTP.
+
+    Принимает те же аргументы, что и django.core.mail.send_mail. Для каждого
+    получателя создается отдельная запись, письма отправляет команда
+    sendmail.
+
+    Args:
+        subject (str): тема.
+        message (str): текст письма.
+        from_email (str): адрес отправителя.
+        recipient_list (list): адреса получателей.
+
+    Returns:
+        int: количество поставленных в очередь писем.
+    """
+
+    return len(OutgoingMail.objects.bulk_create(
+        OutgoingMail(
+            subject=subject,
+            message=message,
+            from_email=from_email,
+            recipient=recipient
+        )
+        for recipient in recipient_list
+    ))
+
+
+def send_pending(connection, batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Отправляет пачку писем из очереди через одно SMTP подключение.
+
+    Письма блокируются на время отправки (SELECT ... FOR UPDATE SKIP LOCKED
+    там, где это поддерживается), поэтому несколько обработчиков не отправят
+    одно письмо дважды. Неудачная отправка откладывается с экспоненциально
+    растущей задержкой.
+
+    Args:
+        connection (BaseEmailBackend): открытое подключение к почтовому
+            серверу.
+        batch_size (int): максимальное количество писем за раз.
+        max_attempts (int): после стольких ошибок письмо больше не
+            отправляется.
+
+    Returns:
+        tuple: количество отправленных писем и количество ошибок.
+    """
+
+    database = router.db_for_write(OutgoingMail)
+    with transaction.atomic(using=database):
+        queryset = OutgoingMail.objects.using(database).filter(
+            sent__isnull=True,
+            attempts__lt=max_attempts,
+            send_after__lte=timezone.now()
+        ).order_by('send_after')
+        features = transaction.get_connection(database).features
+        queryset = queryset.select_for_update(
+            skip_locked=features.has_select_for_update_skip_locked)
+        mails = list(queryset[:batch_size])
+        sent = failed = 0
+        for mail in mails:
+            try:
+                connection.open()
+                connection.send_messages([EmailMessage(
+                    subject=mail.subject,
+                    body=mail.message,
+                    from_email=mail.from_email,
+                    to=[mail.recipient]
+                )])
+            except Exception as error:
+                connection.close()
+                mail.attempts += 1
+                mail.error = str(error)
+                mail.send_after = (
+                    timezone.now() + RETRY_DELAY * 2 ** (mail.attempts - 1))
+                failed += 1
+            else:
+                mail.sent = timezone.now()
+                sent += 1
+        OutgoingMail.objects.using(database).bulk_update(
+            mails, ('sent', 'attempts', 'error', 'send_after'))
+    return sent, failed
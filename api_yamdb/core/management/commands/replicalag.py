@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_SQL = (
+    'SELECT pg_is_in_recovery(), pg_last_wal_replay_lsn(), '
+    'EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())'
+)
+
+
+class Command(BaseCommand):
+    help = 'Показывает отставание реплик от основной базы данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-lag',
+            type=float,
+            help='Завершиться с ошибкой, если реплика отстает больше '
+                 'стольких секунд'
+        )
+
+    def get_lag(self, alias, primary_lsn):
+        """Измеряет отставание реплики.
+
+        Время считается от последней примененной транзакции, поэтому
+        при полностью догнавшей реплике оно равно нулю, даже если в
+        основную базу давно не писали.
+
+        Args:
+            alias (str): псевдоним реплики.
+            primary_lsn (str): текущая позиция журнала основной базы.
+
+        Returns:
+            tuple: отставание в байтах и секундах или None, если база не
+            является репликой.
+        """
+
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICA_SQL)
+            in_recovery, replay_lsn, seconds = cursor.fetchone()
+        if not in_recovery:
+            return None
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_wal_lsn_diff(%s, %s)', [primary_lsn, replay_lsn])
+            lag = int(cursor.fetchone()[0])
+        if lag == 0:
+            return lag, 0.0
+        return lag, float(seconds or 0)
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASES:
+            self.stdout.write('Реплики не настроены')
+            return
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('SELECT pg_current_wal_lsn()')
+            primary_lsn = cursor.fetchone()[0]
+        lagging = []
+        for alias in settings.REPLICA_DATABASES:
+            lag = self.get_lag(alias, primary_lsn)
+            if lag is None:
+                self.stdout.write(f'{alias}: не является репликой')
+                continue
+            size, seconds = lag
+            self.stdout.write(
+                f'{alias}: отставание {size} байт, {seconds:.2f} с')
+            if options['max_lag'] is not None and seconds > options['max_lag']:
+                lagging.append(alias)
+        if lagging:
+            raise CommandError(
+                f'Реплики отстают больше {options["max_lag"]} с: '
+                f'{", ".join(lagging)}'
+            )
@@ -0,0 +1,59 @@
+import time
+
+from core.mail import MAX_ATTEMPTS, send_pending
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+INTERVAL = 1
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящей почты'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Количество писем, отправляемых за один проход'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Количество попыток отправки одного письма'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=INTERVAL,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить то, что есть в очереди, и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                sent, failed = send_pending(
+                    connection,
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts']
+                )
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено писем: {sent}, ошибок: {failed}')
+                if sent + failed == options['batch_size']:
+                    continue
+                if options['once']:
+                    break
+                connection.close()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+# Верхние границы корзин гистограммы времени ответа в миллисекундах.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+SLOTS = 10
+PERCENTILES = (50, 95, 99)
+
+_current = threading.local()
+
+
+class RequestMetrics:
+    """Показатели одного запроса.
+
+    Объект передается в connection.execute_wrapper() и считает количество
+    и время SQL запросов; время сериализации добавляет
+    TimedSerializerMixin.
+    """
+
+    __slots__ = ('view', 'queries', 'db_time', 'serialize_time', 'depth')
+
+    def __init__(self):
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+
+def get_current_metrics():
+    """Возвращает показатели запроса, который обрабатывает текущий поток.
+
+    Returns:
+        RequestMetrics: показатели или None вне RequestMetricsMiddleware.
+    """
+
+    return getattr(_current, 'metrics', None)
+
+
+def set_current_metrics(metrics):
+    """Привязывает показатели запроса к текущему потоку.
+
+    Args:
+        metrics (RequestMetrics): показатели или None.
+    """
+
+    _current.metrics = metrics
+
+
+class Entry:
+    """Накопленные показатели одного представления за интервал."""
+
+    __slots__ = ('count', 'buckets', 'total', 'queries', 'db', 'serialize')
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.total = self.db = self.serialize = 0.0
+        self.queries = 0
+
+    def add(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.queries += other.queries
+        self.db += other.db
+        self.serialize += other.serialize
+        for index, value in enumerate(other.buckets):
+            self.buckets[index] += value
+
+    def percentile(self, rank):
+        """Оценивает перцентиль по верхней границе корзины.
+
+        Args:
+            rank (int): перцентиль от 0 до 100.
+
+        Returns:
+            float: время в миллисекундах или None, если корзина последняя.
+        """
+
+        threshold = self.count * rank / 100
+        seen = 0
+        for bound, value in zip(BUCKETS, self.buckets):
+            seen += value
+            if seen >= threshold:
+                return None if bound == float('inf') else bound
+        return None
+
+
+class RollingHistogram:
+    """Гистограмма времени ответа по представлениям за последние window
+    секунд в памяти процесса.
+
+    Окно делится на SLOTS интервалов, устаревшие интервалы отбрасываются
+    при записи, поэтому память не растет со временем работы.
+    """
+
+    def __init__(self, window=300):
+        """Создает пустую гистограмму.
+
+        Args:
+            window (int): длина окна в секундах.
+        """
+
+        self.slot_length = window / SLOTS
+        self.slots = {}
+        self.lock = threading.Lock()
+
+    def get_slot(self, now=None):
+        return int((time.time() if now is None else now) // self.slot_length)
+
+    def record(self, view, total, queries, db, serialize, now=None):
+        """Добавляет запрос в гистограмму.
+
+        Args:
+            view (str): представление и действие.
+            total (float): время ответа в миллисекундах.
+            queries (int): количество SQL запросов.
+            db (float): время SQL запросов в миллисекундах.
+            serialize (float): время сериализации в миллисекундах.
+            now (float, optional): время записи, по умолчанию текущее.
+        """
+
+        slot = self.get_slot(now)
+        index = next(
+            index for index, bound in enumerate(BUCKETS) if total <= bound)
+        with self.lock:
+            if slot not in self.slots:
+                for old in [key for key in self.slots if key <= slot - SLOTS]:
+                    del self.slots[old]
+                self.slots[slot] = defaultdict(Entry)
+            entry = self.slots[slot][view]
+            entry.count += 1
+            entry.buckets[index] += 1
+            entry.total += total
+            entry.queries += queries
+            entry.db += db
+            entry.serialize += serialize
+
+    def snapshot(self, now=None):
+        """Сводит показатели всех представлений за окно.
+
+        Args:
+            now (float, optional): момент отсчета окна.
+
+        Returns:
+            dict: показатели по представлениям.
+        """
+
+        current = self.get_slot(now)
+        merged = defaultdict(Entry)
+        with self.lock:
+            for slot, entries in self.slots.items():
+                if slot > current - SLOTS:
+                    for view, entry in entries.items():
+                        merged[view].add(entry)
+        result = {}
+        for view, entry in sorted(merged.items()):
+            result[view] = {
+                'count': entry.count,
+                'avg_ms': round(entry.total / entry.count, 2),
+                'avg_queries': round(entry.queries / entry.count, 2),
+                'avg_db_ms': round(entry.db / entry.count, 2),
+                'avg_serialize_ms': round(entry.serialize / entry.count, 2),
+                **{
+                    f'p{rank}_ms': entry.percentile(rank)
+                    for rank in PERCENTILES
+                },
+                'buckets': dict(zip(
+                    [str(bound) for bound in BUCKETS], entry.buckets)),
+            }
+        return result
+
+
+histogram = RollingHistogram(getattr(settings, 'REQUEST_METRICS_WINDOW', 300))
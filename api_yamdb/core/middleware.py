@@ -0,0 +1,124 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import RequestMetrics, histogram, set_current_metrics
+from .prometheus import observe_request
+from .routers import RequestState, check_pin_cache, set_current_state
+
+logger = logging.getLogger('yamdb.requests')
+
+UNRESOLVED = 'unresolved'
+
+
+def get_view_name(view_func, request):
+    """Возвращает имя представления и действия для отчета.
+
+    Args:
+        view_func (callable): функция представления из URLconf.
+        request (HttpRequest): объект запроса.
+
+    Returns:
+        str: например TitlesViewSet.list или registration.
+    """
+
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None)
+    if actions:
+        method = request.method.lower()
+        return f'{cls.__name__}.{actions.get(method, method)}'
+    return cls.__name__
+
+
+def server_timing(metrics, total):
+    """Строит значение заголовка Server-Timing.
+
+    Args:
+        metrics (RequestMetrics): показатели запроса.
+        total (float): время обработки в миллисекундах.
+
+    Returns:
+        str: значение заголовка.
+    """
+
+    return (
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} '
+        f'queries", serialize;dur={metrics.serialize_time * 1000:.2f}, '
+        f'total;dur={total:.2f}'
+    )
+
+
+class RequestMetricsMiddleware:
+    """Измеряет каждый запрос: количество и время SQL запросов, время
+    сериализации и общее время.
+
+    Показатели отдаются в заголовке Server-Timing, пишутся строкой
+    key=value в логгер yamdb.requests, накапливаются в
+    core.metrics.histogram и в метриках Prometheus. Должен стоять первым
+    в MIDDLEWARE, чтобы общее время включало остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        set_current_metrics(metrics)
+        request.metrics = metrics
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            set_current_metrics(None)
+        total = (time.perf_counter() - start) * 1000
+        view = metrics.view or UNRESOLVED
+        response['Server-Timing'] = server_timing(metrics, total)
+        histogram.record(view, total, metrics.queries,
+                         metrics.db_time * 1000,
+                         metrics.serialize_time * 1000)
+        observe_request(request, response, metrics, total / 1000)
+        logger.info(
+            'view=%s method=%s path=%s status=%s queries=%d db_ms=%.2f '
+            'serialize_ms=%.2f total_ms=%.2f',
+            view, request.method, request.path, response.status_code,
+            metrics.queries, metrics.db_time * 1000,
+            metrics.serialize_time * 1000, total
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics.view = get_view_name(view_func, request)
+
+
+class ReplicaRoutingMiddleware:
+    """Связывает запрос с core.routers.ReplicaRouter.
+
+    Чтения безопасных запросов уходят на реплики; если запрос писал в
+    базу, следующие REPLICA_PIN_SECONDS секунд чтения того же пользователя
+    идут в основную базу, и он сразу видит, например, свой новый отзыв.
+    Отметка хранится в REPLICA_PIN_CACHE, поэтому с репликами этот кэш
+    должен быть общим для всех процессов.
+    """
+
+    def __init__(self, get_response):
+        check_pin_cache()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(request)
+        set_current_state(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            set_current_state(None)
+        if state.written and settings.REPLICA_DATABASES:
+            state.pin()
+        return response
@@ -1,7 +1,10 @@
 import re
+import time
 
 from rest_framework import serializers
 
+from .metrics import get_current_metrics
+
 
 class ValidateMixin(object):
     def validate_username(self, username):
@@ -12,3 +15,24 @@ class ValidateMixin(object):
         if re.match(r'^[\w.@+-]+\Z', username) is None:
             raise serializers.ValidationError(text + username)
         return username
+
+
+class TimedSerializerMixin:
+    """Добавляет время to_representation к показателям текущего запроса.
+
+    Считается только внешний вызов: вложенные сериализаторы с этим же
+    миксином не учитываются дважды. Вне RequestMetricsMiddleware ничего не
+    делает.
+    """
+
+    def to_representation(self, instance):
+        metrics = get_current_metrics()
+        if metrics is None or metrics.depth:
+            return super().to_representation(instance)
+        metrics.depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+            metrics.depth -= 1
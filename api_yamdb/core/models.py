@@ -0,0 +1,48 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingMail(models.Model):
+    """Модель для письма в очереди на отправку.
+
+    Attributes:
+        subject (str): тема.
+        message (str): текст письма.
+        from_email (str): адрес отправителя.
+        recipient (str): адрес получателя.
+        created (datetime): дата постановки в очередь.
+        send_after (datetime): время, раньше которого письмо не отправляется.
+        sent (datetime): дата отправки, пусто пока письмо не отправлено.
+        attempts (int): количество неудачных попыток отправки.
+        error (str): текст последней ошибки отправки.
+    """
+
+    subject = models.CharField('Тема', max_length=255)
+    message = models.TextField('Текст')
+    from_email = models.CharField(
+        'Отправитель',
+        max_length=254,
+        blank=True,
+        null=True
+    )
+    recipient = models.EmailField('Получатель', max_length=254)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    sent = models.DateTimeField('Дата отправки', blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('sent', 'send_after'),
+                name='outgoing_mail_pending_idx'
+            ),
+        )
+
+    def __str__(self):
+        """Возвращает строковое представление модели"""
+
+        return f'{self.recipient}: {self.subject}'
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class PostgreSQLOnlyRunSQL(migrations.RunSQL):
+    """RunSQL, который выполняется только на PostgreSQL.
+
+    Нужен для объектов без аналога в других базах данных (триггеры,
+    GIN индексы, расширения); на остальных базах операция пропускается.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state,
+                          to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(
+                app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state,
+                           to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(
+                app_label, schema_editor, from_state, to_state)
@@ -0,0 +1,141 @@
+import os
+import time
+
+from django.db.models import Count, Q
+from prometheus_client import (REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from .mail import MAX_ATTEMPTS
+from .models import OutgoingMail
+
+# В режиме нескольких процессов (gunicorn) значения метрик пишутся в файлы
+# каталога PROMETHEUS_MULTIPROC_DIR и при сборе суммируются по процессам.
+MULTIPROC_DIR = 'PROMETHEUS_MULTIPROC_DIR'
+UNRESOLVED = 'unresolved'
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total',
+    'Количество HTTP запросов',
+    ('route', 'method', 'status')
+)
+LATENCY = Histogram(
+    'yamdb_http_request_duration_seconds',
+    'Время обработки HTTP запроса',
+    ('route', 'method'),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+DB_QUERIES = Counter(
+    'yamdb_db_queries_total',
+    'Количество SQL запросов',
+    ('route',)
+)
+DB_TIME = Counter(
+    'yamdb_db_query_seconds_total',
+    'Суммарное время SQL запросов',
+    ('route',)
+)
+CACHE = Counter(
+    'yamdb_cache_requests_total',
+    'Обращения к кэшу ответов и количеств по результату',
+    ('cache', 'result')
+)
+WORKER = Gauge(
+    'yamdb_worker_start_time_seconds',
+    'Время запуска рабочего процесса',
+    ('pid',),
+    multiprocess_mode='liveall'
+)
+
+
+def get_route(request):
+    """Возвращает имя маршрута запроса из URLconf.
+
+    Args:
+        request (HttpRequest): объект запроса.
+
+    Returns:
+        str: имя маршрута, например titles-list, или UNRESOLVED.
+    """
+
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNRESOLVED
+    return match.url_name
+
+
+def observe_request(request, response, metrics, total):
+    """Записывает показатели обработанного запроса.
+
+    Args:
+        request (HttpRequest): объект запроса.
+        response (HttpResponse): объект ответа.
+        metrics (RequestMetrics): SQL запросы запроса.
+        total (float): время обработки в секундах.
+    """
+
+    route = get_route(request)
+    REQUESTS.labels(route, request.method, response.status_code).inc()
+    LATENCY.labels(route, request.method).observe(total)
+    if metrics.queries:
+        DB_QUERIES.labels(route).inc(metrics.queries)
+        DB_TIME.labels(route).inc(metrics.db_time)
+
+
+def observe_cache(cache, hit):
+    """Считает попадание или промах кэша.
+
+    Args:
+        cache (str): название кэша, например response или count.
+        hit (bool): значение найдено в кэше.
+    """
+
+    CACHE.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+class OutboxCollector:
+    """Считает письма в очереди исходящей почты в момент сбора метрик.
+
+    Значение берется из базы данных, поэтому одинаково в любом процессе и
+    не хранится в файлах метрик.
+    """
+
+    def collect(self):
+        counts = OutgoingMail.objects.filter(sent__isnull=True).aggregate(
+            pending=Count('pk', filter=Q(attempts__lt=MAX_ATTEMPTS)),
+            failed=Count('pk', filter=Q(attempts__gte=MAX_ATTEMPTS)),
+        )
+        gauge = GaugeMetricFamily(
+            'yamdb_mail_outbox',
+            'Неотправленные письма: pending - ждут отправки, failed - '
+            'исчерпали попытки',
+            labels=('state',)
+        )
+        for state, value in counts.items():
+            gauge.add_metric((state,), value)
+        yield gauge
+
+
+outbox_registry = CollectorRegistry()
+outbox_registry.register(OutboxCollector())
+
+
+def render_metrics():
+    """Собирает метрики в текстовом формате Prometheus.
+
+    Если задан PROMETHEUS_MULTIPROC_DIR, метрики собираются из файлов всех
+    процессов, иначе из реестра текущего процесса.
+
+    Returns:
+        bytes: метрики всех процессов и очереди почты.
+    """
+
+    registry = REGISTRY
+    if os.environ.get(MULTIPROC_DIR):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    return generate_latest(registry) + generate_latest(outbox_registry)
+
+
+WORKER.labels(os.getpid()).set(time.time())
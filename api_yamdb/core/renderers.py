@@ -0,0 +1,46 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Как JSONRenderer, экранируются разделители строк, недопустимые в
+# строках JavaScript.
+LINE_SEPARATORS = (
+    ('\u2028'.encode(), b'\\u2028'),
+    ('\u2029'.encode(), b'\\u2029'),
+)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer, который кодирует данные через orjson.
+
+    Вывод совпадает с JSONRenderer при настройках по умолчанию (UNICODE_JSON,
+    COMPACT_JSON, STRICT_JSON): даты, Decimal и ленивые строки передаются в
+    тот же encoder_class. Отличаются только числа с плавающей точкой в
+    экспоненциальной записи (1e16 вместо 1e+16) - такие в ответах API не
+    встречаются. Без orjson, с отступами (?format=json; indent=4) или
+    другими настройками, а также для данных, которые orjson не кодирует,
+    используется JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii
+                or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except orjson.JSONEncodeError:
+            return super().render(
+                data, accepted_media_type, renderer_context)
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return ret
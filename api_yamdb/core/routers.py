@@ -0,0 +1,201 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_KEY = 'primary-pin:{}'
+# Кэши, которые не видят другие процессы gunicorn.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+_current = threading.local()
+
+
+def get_pin_cache():
+    """Возвращает кэш, в котором хранятся отметки о записи пользователя.
+
+    Returns:
+        BaseCache: кэш из настройки REPLICA_PIN_CACHE.
+    """
+
+    return caches[getattr(settings, 'REPLICA_PIN_CACHE', 'default')]
+
+
+def check_pin_cache():
+    """Проверяет, что отметки о записи увидят все процессы.
+
+    Запрос после записи может попасть в другой процесс gunicorn; с кэшем в
+    памяти процесса он не увидит отметку и прочитает отстающую реплику.
+
+    Raises:
+        ImproperlyConfigured: реплики заданы, а кэш отметок локальный.
+    """
+
+    if settings.REPLICA_DATABASES and isinstance(
+            get_pin_cache(), PROCESS_LOCAL_CACHES):
+        raise ImproperlyConfigured(
+            'Для DB_REPLICAS нужен общий для процессов кэш '
+            'REPLICA_PIN_CACHE, например memcached: с кэшем в памяти '
+            'процесса пользователь может не увидеть свою запись'
+        )
+
+
+def get_pin_key(request):
+    """Возвращает ключ кэша, которым чтения пользователя закрепляются за
+    основной базой.
+
+    Args:
+        request (HttpRequest): объект запроса.
+
+    Returns:
+        str: ключ или None для анонимного пользователя.
+    """
+
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return PIN_KEY.format(user.pk)
+
+
+class RequestState:
+    """Состояние маршрутизации запроса к базам данных.
+
+    Attributes:
+        request (HttpRequest): объект запроса.
+        replica (str): реплика, выбранная для чтений запроса.
+        written (bool): запрос писал в основную базу.
+        primary (bool): чтения идут в основную базу, см. primary_reads().
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.replica = None
+        self.written = False
+        self.primary = False
+        self.pins = {}
+        self.resolving = False
+
+    def is_pinned(self):
+        """Проверяет, писал ли пользователь в базу в последние
+        REPLICA_PIN_SECONDS секунд.
+
+        Пользователь определяется лениво: его может установить DRF уже
+        после начала запроса.
+
+        Returns:
+            bool: чтения нужно направить в основную базу.
+        """
+
+        if self.resolving:
+            return True
+        self.resolving = True
+        try:
+            key = get_pin_key(self.request)
+        finally:
+            self.resolving = False
+        if key is None:
+            return False
+        if key not in self.pins:
+            self.pins[key] = get_pin_cache().get(key, False)
+        return self.pins[key]
+
+    def get_replica(self):
+        """Выбирает реплику для чтения.
+
+        Returns:
+            str: псевдоним реплики или None, если читать нужно из
+            основной базы.
+        """
+
+        if (self.request.method not in SAFE_METHODS or self.written
+                or self.primary or self.is_pinned()):
+            return None
+        if self.replica is None:
+            self.replica = random.choice(settings.REPLICA_DATABASES)
+        return self.replica
+
+    def pin(self):
+        """Закрепляет следующие чтения пользователя за основной базой."""
+
+        key = get_pin_key(self.request)
+        if key is not None:
+            get_pin_cache().set(key, True, settings.REPLICA_PIN_SECONDS)
+
+
+def get_current_state():
+    """Возвращает состояние запроса, который обрабатывает текущий поток.
+
+    Returns:
+        RequestState: состояние или None вне ReplicaRoutingMiddleware.
+    """
+
+    return getattr(_current, 'state', None)
+
+
+def set_current_state(state):
+    """Привязывает состояние запроса к текущему потоку.
+
+    Args:
+        state (RequestState): состояние или None.
+    """
+
+    _current.state = state
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтения текущего запроса внутри блока в основную базу.
+
+    Нужен там, где прочитанное сохраняется в общий кэш под текущей версией
+    групп: данные отстающей реплики иначе жили бы в кэше и после того, как
+    реплика догонит основную базу.
+    """
+
+    state = get_current_state()
+    if state is None:
+        yield
+        return
+    primary, state.primary = state.primary, True
+    try:
+        yield
+    finally:
+        state.primary = primary
+
+
+class ReplicaRouter:
+    """Направляет чтения безопасных HTTP запросов на реплики.
+
+    Все записи, чтения небезопасных запросов, команд управления и чтения
+    пользователя, недавно писавшего в базу, идут в основную базу. Один
+    запрос читает только из одной реплики, чтобы его данные были
+    согласованы.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = get_current_state()
+        if not settings.REPLICA_DATABASES or state is None:
+            return DEFAULT_DB_ALIAS
+        return state.get_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = get_current_state()
+        if state is not None:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
@@ -0,0 +1,43 @@
+import time
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """Закрывает сохраненные между запросами соединения с базой данных,
+    которые перестали работать.
+
+    Проверяются только соединения с CONN_HEALTH_CHECKS, открытые вне
+    транзакции и не использованные дольше CONN_HEALTH_CHECK_IDLE секунд:
+    соединение, которое только что обслужило запрос, почти наверняка живо,
+    и SELECT 1 перед каждым запросом был бы лишним. Закрытое соединение
+    Django откроет заново при первом SQL запросе, и запрос не упадет из-за
+    перезапуска сервера базы данных.
+    """
+
+    now = time.monotonic()
+    for connection in connections.all():
+        if (connection.connection is None
+                or connection.in_atomic_block
+                or not connection.settings_dict.get('CONN_HEALTH_CHECKS')):
+            continue
+        last_used = getattr(connection, 'last_used_at', None)
+        idle = connection.settings_dict.get('CONN_HEALTH_CHECK_IDLE', 0)
+        if last_used is not None and now - last_used < idle:
+            continue
+        if not connection.is_usable():
+            connection.close()
+
+
+@receiver(request_finished)
+def mark_connections_used(sender, **kwargs):
+    """Запоминает время последнего использования соединений, которые
+    остаются открытыми после запроса."""
+
+    now = time.monotonic()
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.last_used_at = now
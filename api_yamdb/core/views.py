@@ -1,4 +1,9 @@
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 from rest_framework import mixins, viewsets
+from rest_framework.response import Response
+
+from .prometheus import render_metrics
 
 
 class CreateListDestroyModelMixinSet(mixins.CreateModelMixin,
@@ -6,3 +11,42 @@ class CreateListDestroyModelMixinSet(mixins.CreateModelMixin,
                                      mixins.DestroyModelMixin,
                                      viewsets.GenericViewSet):
     pass
+
+
+class ValuesListMixin:
+    """Выводит list через values() и values_serializer_class вместо
+    объектов моделей и serializer_class.
+
+    Фильтры и пагинация применяются как обычно, сериализатор получает
+    словари страницы; остальные действия используют serializer_class.
+    """
+
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_serializer_class
+        queryset = serializer_class.setup_queryset(
+            self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer_class(page, many=True, context=context).data)
+        return Response(
+            serializer_class(queryset, many=True, context=context).data)
+
+
+def metrics(request):
+    """Отдает метрики в текстовом формате Prometheus.
+
+    Эндпоинт не требует аутентификации и должен быть закрыт снаружи,
+    см. infra/nginx/default.conf.
+
+    Args:
+        request (HttpRequest): объект запроса.
+
+    Returns:
+        HttpResponse: метрики всех рабочих процессов.
+    """
+
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,22 @@
+import os
+import shutil
+
+# Каталог, через который рабочие процессы делятся метриками Prometheus.
+# Переменная должна быть задана до импорта prometheus_client в процессах.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/prometheus')
+
+
+def on_starting(server):
+    """Очищает метрики прошлого запуска перед стартом рабочих процессов."""
+
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Удаляет gauge метрики завершившегося рабочего процесса."""
+
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -14,7 +14,8 @@ class UserAdmin(admin.ModelAdmin):
 
 @admin.register(Title)
 class TitlesAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'category', 'year', 'description')
+    list_display = ('id', 'name', 'category', 'year', 'rating',
+                    'description')
     actions_on_bottom = True
     list_editable = ('category',)
     search_fields = ('name',)
@@ -0,0 +1,234 @@
+import csv
+import threading
+from itertools import islice
+
+from django.core.management.color import no_style
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitlesGenres, User)
+
+# Раскладка CSV файлов: модель и поля (attname) в порядке колонок файла.
+TABLES = {
+    'category.csv': (Category, ('id', 'name', 'slug')),
+    'titles.csv': (Title, ('id', 'name', 'year', 'category_id')),
+    'genre.csv': (Genre, ('id', 'name', 'slug')),
+    'genre_title.csv': (TitlesGenres, ('id', 'title_id', 'genre_id')),
+    'users.csv': (User, ('id', 'username', 'email', 'role', 'bio',
+                         'first_name', 'last_name')),
+    'review.csv': (Review, ('id', 'title_id', 'text', 'author_id', 'score',
+                            'pub_date')),
+    'comments.csv': (Comments, ('id', 'review_id', 'text', 'author_id',
+                                'pub_date')),
+}
+
+
+def read_rows(path):
+    """Лениво читает строки CSV файла без заголовка.
+
+    Args:
+        path (str): путь к файлу.
+
+    Yields:
+        list: значения колонок строки.
+    """
+
+    with open(path, encoding='utf-8', newline='') as file:
+        reader = csv.reader(file, delimiter=',')
+        next(reader, None)
+        yield from reader
+
+
+def chunks(iterable, size):
+    """Разбивает итерируемый объект на списки длиной не более size.
+
+    Args:
+        iterable (Iterable): исходные элементы.
+        size (int): размер пачки.
+
+    Yields:
+        list: очередная пачка элементов.
+    """
+
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def get_converters(model, columns):
+    """Подбирает функции приведения значений для колонок CSV.
+
+    Пустые значения nullable полей приводятся к None.
+
+    Args:
+        model (Model): модель таблицы.
+        columns (tuple): поля модели в порядке колонок файла.
+
+    Returns:
+        list: функции приведения для каждой колонки.
+    """
+
+    def converter(field):
+        def convert(value):
+            if value == '' and field.null:
+                return None
+            return field.to_python(value)
+        return convert
+
+    return [converter(model._meta.get_field(column)) for column in columns]
+
+
+class ForeignKeyChecker:
+    """Проверяет внешние ключи строк по множествам id связанных таблиц.
+
+    Множество id каждой таблицы загружается одним запросом при первом
+    обращении.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.lock = threading.Lock()
+
+    def get_ids(self, model):
+        """Возвращает множество id таблицы.
+
+        Args:
+            model (Model): модель таблицы.
+
+        Returns:
+            set: id всех записей таблицы.
+        """
+
+        with self.lock:
+            if model not in self.ids:
+                self.ids[model] = set(
+                    model._base_manager.values_list('pk', flat=True))
+            return self.ids[model]
+
+    def get_checks(self, model, columns):
+        """Подбирает проверки для колонок с внешними ключами.
+
+        Args:
+            model (Model): модель таблицы.
+            columns (tuple): поля модели в порядке колонок файла.
+
+        Returns:
+            list: пары из номера колонки и связанной модели.
+        """
+
+        checks = []
+        for index, column in enumerate(columns):
+            field = model._meta.get_field(column)
+            if field.is_relation:
+                checks.append((index, field.related_model))
+        return checks
+
+    def is_valid(self, checks, values):
+        """Проверяет, что все внешние ключи строки существуют.
+
+        Args:
+            checks (list): проверки из get_checks.
+            values (list): приведенные значения строки.
+
+        Returns:
+            bool: True если все связанные записи существуют.
+        """
+
+        return all(
+            values[index] is None or values[index] in self.get_ids(related)
+            for index, related in checks
+        )
+
+
+def copy_file(connection, model, columns, path):
+    """Загружает CSV файл в таблицу командой COPY ... FROM STDIN.
+
+    Если в файле нет NOT NULL колонок таблицы (например, пароля
+    пользователя или даты изменения), строки сначала копируются во временную
+    таблицу, а затем переносятся в основную со значениями, которые поля
+    получили бы при сохранении нового объекта.
+
+    Args:
+        connection (DatabaseWrapper): подключение к PostgreSQL.
+        model (Model): модель таблицы.
+        columns (tuple): поля модели в порядке колонок файла.
+        path (str): путь к файлу.
+
+    Returns:
+        int: количество загруженных строк.
+    """
+
+    quote = connection.ops.quote_name
+    fields = [model._meta.get_field(column) for column in columns]
+    names = ', '.join(quote(field.column) for field in fields)
+    options = 'FORMAT csv, HEADER true'
+    not_null = [quote(field.column) for field in fields if not field.null]
+    if not_null:
+        options += f', FORCE_NOT_NULL ({", ".join(not_null)})'
+    missing = [
+        field for field in model._meta.concrete_fields
+        if field not in fields and not field.null
+    ]
+    table = quote(model._meta.db_table)
+    with connection.cursor() as cursor, open(path, encoding='utf-8') as file:
+        if not missing:
+            cursor.copy_expert(
+                f'COPY {table} ({names}) FROM STDIN WITH ({options})', file)
+            return cursor.rowcount
+        staging = quote(f'import_{model._meta.db_table}')
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS '
+            f'SELECT {names} FROM {table} WITH NO DATA'
+        )
+        cursor.copy_expert(
+            f'COPY {staging} ({names}) FROM STDIN WITH ({options})', file)
+        defaults = ', '.join(quote(field.column) for field in missing)
+        instance = model()
+        cursor.execute(
+            f'INSERT INTO {table} ({names}, {defaults}) '
+            f'SELECT {names}, {", ".join(["%s"] * len(missing))} '
+            f'FROM {staging}',
+            [
+                field.get_db_prep_save(
+                    field.pre_save(instance, True), connection)
+                for field in missing
+            ]
+        )
+        return cursor.rowcount
+
+
+def reset_sequences(connection, models):
+    """Сдвигает последовательности id после загрузки строк с явными id.
+
+    Args:
+        connection (DatabaseWrapper): подключение к базе данных.
+        models (list): модели загруженных таблиц.
+    """
+
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def get_dependencies(models):
+    """Строит граф зависимостей таблиц по внешним ключам моделей.
+
+    Учитываются только связи между загружаемыми моделями.
+
+    Args:
+        models (Iterable): модели загружаемых таблиц.
+
+    Returns:
+        dict: модель и множество моделей, которые нужно загрузить раньше.
+    """
+
+    models = set(models)
+    return {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
@@ -0,0 +1,324 @@
+import csv
+import os
+import random
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import User
+
+from ._tools import TABLES
+
+WORDS = (
+    'фильм', 'книга', 'песня', 'сюжет', 'герой', 'финал', 'автор', 'режиссер',
+    'актер', 'роль', 'музыка', 'история', 'сцена', 'диалог', 'жанр', 'драма',
+    'комедия', 'детектив', 'роман', 'премьера', 'отличный', 'скучный',
+    'сильный', 'слабый', 'неожиданный', 'затянутый', 'яркий', 'мрачный',
+    'смешной', 'грустный', 'великолепный', 'посредственный', 'story', 'plot',
+    'movie', 'great', 'boring', 'classic',
+)
+# Относительная частота оценок от 1 до 10: высоких оценок больше.
+SCORE_WEIGHTS = (2, 1, 2, 3, 4, 6, 10, 14, 12, 8)
+# Показатель распределения Парето для популярности произведений и
+# отзывов: чем меньше, тем сильнее перекос.
+DEFAULT_SKEW = 1.2
+# Степень, в которую возводится случайное число при выборе автора
+# комментария: чем больше, тем чаще пишут пользователи с малыми id.
+ACTIVITY_SKEW = 3
+MODERATOR_SHARE = 0.001
+START_DATE = datetime(2010, 1, 1)
+PERIOD = 12 * 365 * 24 * 3600
+COMMENT_DELAY = 30 * 24 * 3600
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+
+def allocate(total, count, rng, skew, cap=None):
+    """Распределяет total единиц по count корзинам с весами Парето.
+
+    Веса генерируются дважды из одного состояния генератора: первый проход
+    считает их сумму, второй раздает доли с переносом дробных остатков,
+    поэтому в памяти ничего не хранится, а сумма равна total. Если задан
+    cap, излишек переносится на следующие корзины, и при недостатке места
+    в конце сумма может оказаться меньше total.
+
+    Args:
+        total (int): сколько единиц распределить.
+        count (int): количество корзин.
+        rng (Random): генератор случайных чисел.
+        skew (float): показатель распределения Парето.
+        cap (int, optional): наибольшее количество в одной корзине.
+
+    Yields:
+        int: количество единиц в очередной корзине.
+    """
+
+    state = rng.getstate()
+    weights = sum(rng.paretovariate(skew) for _ in range(count))
+    rng.setstate(state)
+    allocated, carry = 0, 0.0
+    for index in range(count):
+        carry += total * rng.paretovariate(skew) / weights
+        amount = total - allocated if index == count - 1 else int(carry)
+        if cap is not None:
+            amount = min(amount, cap)
+        carry -= amount
+        allocated += amount
+        yield amount
+
+
+def get_text(rng, words):
+    """Составляет текст из случайных слов.
+
+    Args:
+        rng (Random): генератор случайных чисел.
+        words (int): наибольшее количество слов.
+
+    Returns:
+        str: текст.
+    """
+
+    return ' '.join(rng.choices(WORDS, k=rng.randint(1, words))).capitalize()
+
+
+def get_date(seconds):
+    """Переводит смещение от START_DATE в строку даты для CSV.
+
+    Args:
+        seconds (float): секунды от START_DATE.
+
+    Returns:
+        str: дата в формате ISO 8601 в UTC.
+    """
+
+    return (START_DATE + timedelta(seconds=seconds)).strftime(DATE_FORMAT)
+
+
+class Command(BaseCommand):
+    help = ('Генерирует воспроизводимый набор CSV файлов заданного размера '
+            'для importcsv')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            required=True,
+            help='Каталог, в который записываются CSV файлы'
+        )
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Начальное значение генератора')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--max-genres',
+            type=int,
+            default=3,
+            help='Наибольшее количество жанров у произведения'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=DEFAULT_SKEW,
+            help=('Показатель Парето для количества отзывов на произведение '
+                  'и комментариев на отзыв')
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'categories', 'genres', 'titles'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} должен быть не меньше 1')
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError(
+                'Отзывов больше, чем пар произведение - пользователь')
+        if options['comments'] and not options['reviews']:
+            raise CommandError('Для комментариев нужны отзывы')
+        os.makedirs(options['path'], exist_ok=True)
+        self.options = options
+        self.write('category.csv', self.generate_groups(
+            'Категория', 'category', options['categories']))
+        self.write('genre.csv', self.generate_groups(
+            'Жанр', 'genre', options['genres']))
+        self.write('users.csv', self.generate_users())
+        self.write('titles.csv', self.generate_titles())
+        self.write('genre_title.csv', self.generate_genre_titles())
+        self.write_reviews_and_comments()
+
+    def get_random(self, stream):
+        """Возвращает генератор случайных чисел для одного файла.
+
+        У каждого файла свой генератор, поэтому изменение размера одной
+        таблицы не меняет содержимое остальных.
+
+        Args:
+            stream (str): имя потока.
+
+        Returns:
+            Random: генератор.
+        """
+
+        return random.Random(f'{self.options["seed"]}:{stream}')
+
+    def open_csv(self, name):
+        """Открывает CSV файл на запись и пишет заголовок из TABLES.
+
+        Args:
+            name (str): имя файла.
+
+        Returns:
+            tuple: открытый файл и csv.writer.
+        """
+
+        file = open(os.path.join(self.options['path'], name), 'w',
+                    encoding='utf-8', newline='')
+        writer = csv.writer(file)
+        writer.writerow(TABLES[name][1])
+        return file, writer
+
+    def write(self, name, rows):
+        """Записывает строки в CSV файл по одной.
+
+        Args:
+            name (str): имя файла.
+            rows (Iterable): строки файла.
+        """
+
+        file, writer = self.open_csv(name)
+        with file:
+            count = 0
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        self.report(name, count)
+
+    def report(self, name, count):
+        """Выводит количество записанных строк.
+
+        Args:
+            name (str): имя файла.
+            count (int): количество строк.
+        """
+
+        self.stdout.write(self.style.SUCCESS(f'{name}: {count} строк'))
+
+    def generate_groups(self, label, slug, count):
+        """Генерирует категории или жанры.
+
+        Args:
+            label (str): начало названия.
+            slug (str): начало slug.
+            count (int): количество записей.
+
+        Yields:
+            tuple: строка файла.
+        """
+
+        for pk in range(1, count + 1):
+            yield pk, f'{label} {pk}', f'{slug}-{pk}'
+
+    def generate_users(self):
+        """Генерирует пользователей, среди них редкие модераторы.
+
+        Yields:
+            tuple: строка файла.
+        """
+
+        rng = self.get_random('users')
+        for pk in range(1, self.options['users'] + 1):
+            role = User.USER
+            if pk == 1:
+                role = User.ADMIN
+            elif rng.random() < MODERATOR_SHARE:
+                role = User.MODERATOR
+            yield pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '', '', ''
+
+    def generate_titles(self):
+        """Генерирует произведения.
+
+        Yields:
+            tuple: строка файла.
+        """
+
+        rng = self.get_random('titles')
+        for pk in range(1, self.options['titles'] + 1):
+            yield (
+                pk,
+                f'{get_text(rng, 3)} {pk}',
+                rng.randint(1900, 2022),
+                rng.randint(1, self.options['categories'])
+            )
+
+    def generate_genre_titles(self):
+        """Генерирует связи произведений с разными жанрами.
+
+        Yields:
+            tuple: строка файла.
+        """
+
+        rng = self.get_random('genre_title')
+        genres = range(1, self.options['genres'] + 1)
+        most = min(self.options['max_genres'], len(genres))
+        pk = 0
+        for title in range(1, self.options['titles'] + 1):
+            for genre in rng.sample(genres, rng.randint(1, most)):
+                pk += 1
+                yield pk, title, genre
+
+    def write_reviews_and_comments(self):
+        """Записывает отзывы и комментарии за один проход.
+
+        Количество отзывов на произведение и комментариев на отзыв
+        распределено по Парето. Авторы отзывов одного произведения разные,
+        комментарии чаще пишут активные пользователи с малыми id, и
+        комментарий всегда новее своего отзыва.
+
+        Отзывов на произведение не больше, чем пользователей, поэтому
+        отзывов может получиться меньше запрошенного. Комментарии
+        распределяются по фактическому количеству отзывов: его заранее
+        считает отдельный проход по тому же распределению.
+        """
+
+        options = self.options
+        users = options['users']
+        reviews_rng = self.get_random('review')
+        comments_rng = self.get_random('comments')
+
+        def reviews_per_title():
+            return allocate(
+                options['reviews'], options['titles'],
+                self.get_random('reviews_per_title'), options['skew'],
+                cap=users)
+
+        comments_per_review = allocate(
+            options['comments'], sum(reviews_per_title()),
+            self.get_random('comments_per_review'), options['skew'])
+        reviews_file, reviews = self.open_csv('review.csv')
+        comments_file, comments = self.open_csv('comments.csv')
+        review_pk = comment_pk = 0
+        with reviews_file, comments_file:
+            for title, count in enumerate(reviews_per_title(), 1):
+                for author in reviews_rng.sample(range(1, users + 1), count):
+                    review_pk += 1
+                    created = reviews_rng.random() * PERIOD
+                    reviews.writerow((
+                        review_pk,
+                        title,
+                        get_text(reviews_rng, 30),
+                        author,
+                        reviews_rng.choices(
+                            range(1, 11), weights=SCORE_WEIGHTS)[0],
+                        get_date(created),
+                    ))
+                    for _ in range(next(comments_per_review)):
+                        comment_pk += 1
+                        comments.writerow((
+                            comment_pk,
+                            review_pk,
+                            get_text(comments_rng, 15),
+                            int(users * comments_rng.random()
+                                ** ACTIVITY_SKEW) + 1,
+                            get_date(created
+                                     + comments_rng.random() * COMMENT_DELAY),
+                        ))
+        self.report('review.csv', review_pk)
+        self.report('comments.csv', comment_pk)
@@ -1,11 +1,18 @@
-import csv
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-from django.core.management.base import BaseCommand
-from reviews.models import (Category, Comments, Genre, Review, Title,
-                            TitlesGenres, User)
+from core.cache import GLOBAL_GROUP, bump_versions
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.models import Title
 
 from api_yamdb.settings import BASE_DIR
 
+from ._tools import (TABLES, ForeignKeyChecker, chunks, copy_file,
+                     get_converters, get_dependencies, read_rows,
+                     reset_sequences)
+
 FILES = [
     BASE_DIR + '/static/data/category.csv',
     BASE_DIR + '/static/data/titles.csv',
@@ -16,98 +23,241 @@ FILES = [
     BASE_DIR + '/static/data/comments.csv',
 ]
 
+BATCH_SIZE = 5000
+
+ORM = 'orm'
+COPY = 'copy'
+
 
 class Command(BaseCommand):
     help = 'Import CSV files'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            help=('Каталог с CSV файлами, например созданными командой '
+                  'generatecsv; по умолчанию static/data')
+        )
+        parser.add_argument(
+            '--engine',
+            choices=(ORM, COPY),
+            default=ORM,
+            help=('Способ загрузки: bulk_create через ORM или COPY FROM STDIN '
+                  '(только PostgreSQL)')
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одном INSERT'
+        )
+        parser.add_argument(
+            '--check-fk',
+            action='store_true',
+            help='Пропускать строки со ссылками на несуществующие записи'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help=('Количество таблиц, загружаемых одновременно, каждая '
+                  'в своем подключении к базе данных')
+        )
+
     def handle(self, *args, **options):
-        for file in FILES:
-            if 'category.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                Category.objects.bulk_create(
-                    Category(
-                        id=int(row[0]),
-                        name=row[1],
-                        slug=row[2]
-                    ) for row in list(table)[1:]
-                )
-            elif 'titles.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                Title.objects.bulk_create(
-                    Title(
-                        id=int(row[0]),
-                        name=row[1],
-                        year=row[2],
-                        category=Category.objects.get(id=int(row[3]))
-                    ) for row in list(table)[1:]
-                )
-            elif 'genre.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                Genre.objects.bulk_create(
-                    Genre(
-                        id=int(row[0]),
-                        name=row[1],
-                        slug=row[2]
-                    ) for row in list(table)[1:]
-                )
-            elif 'genre_title.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                TitlesGenres.objects.bulk_create(
-                    TitlesGenres(
-                        id=int(row[0]),
-                        title=Title.objects.get(id=int(row[1])),
-                        genre=Genre.objects.get(id=int(row[2])),
-                    ) for row in list(table)[1:]
-                )
-            elif 'users.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                User.objects.bulk_create(
-                    User(
-                        id=int(row[0]),
-                        username=row[1],
-                        email=row[2],
-                        role=row[3],
-                        bio=row[4],
-                        first_name=row[5],
-                        last_name=row[6]
-                    ) for row in list(table)[1:]
-                )
-            elif 'review.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                Review.objects.bulk_create(
-                    Review(
-                        id=int(row[0]),
-                        title=Title.objects.get(id=int(row[1])),
-                        text=row[2],
-                        author=User.objects.get(id=int(row[3])),
-                        score=int(row[4]),
-                        pub_date=row[5]
-                    ) for row in list(table)[1:]
-                )
-            elif 'comments.csv' in file:
-                table = csv.reader(
-                    open(file, encoding='utf-8'), delimiter=','
-                )
-                Comments.objects.bulk_create(
-                    Comments(
-                        id=int(row[0]),
-                        review=Review.objects.get(id=int(row[1])),
-                        text=row[2],
-                        author=User.objects.get(id=int(row[3])),
-                        pub_date=row[4]
-                    ) for row in list(table)[1:]
-                )
-            else:
+        if options['engine'] == COPY:
+            if connection.vendor != 'postgresql':
+                raise CommandError(
+                    '--engine=copy работает только с PostgreSQL')
+            if options['check_fk']:
+                raise CommandError('--check-fk доступен только с --engine=orm')
+        if options['jobs'] < 1:
+            raise CommandError('--jobs должен быть не меньше 1')
+        files = FILES
+        if options['path']:
+            files = [
+                os.path.join(options['path'], os.path.basename(file))
+                for file in FILES
+            ]
+        tables = {}
+        for file in files:
+            table = TABLES.get(os.path.basename(file))
+            if table is None:
                 print('Такой таблицы нет в базе данных')
+                continue
+            tables[file] = table
+        checker = ForeignKeyChecker() if options['check_fk'] else None
+        start = time.monotonic()
+        if options['jobs'] == 1:
+            imported = self.run_serial(tables, options, checker)
+        else:
+            imported = self.run_parallel(tables, options, checker)
+        reset_sequences(
+            connection, [model for model, columns in tables.values()])
+        Title.objects.recalculate_rating()
+        bump_versions(GLOBAL_GROUP)
+        self.report('Всего', imported, 0, time.monotonic() - start)
+
+    def get_ready(self, pending, loaded, dependencies):
+        """Выбирает файлы, все зависимости которых уже загружены.
+
+        Args:
+            pending (dict): ожидающие загрузки файлы и их таблицы.
+            loaded (set): уже загруженные модели.
+            dependencies (dict): граф зависимостей моделей.
+
+        Returns:
+            list: готовые к загрузке файлы в порядке FILES.
+        """
+
+        return [
+            file for file, (model, columns) in pending.items()
+            if dependencies[model] <= loaded
+        ]
+
+    def run_serial(self, tables, options, checker):
+        """Загружает таблицы по очереди в порядке зависимостей.
+
+        Args:
+            tables (dict): файлы и их таблицы.
+            options (dict): параметры команды.
+            checker (ForeignKeyChecker): проверка внешних ключей или None.
+
+        Returns:
+            int: количество загруженных строк.
+        """
+
+        dependencies = get_dependencies(
+            model for model, columns in tables.values())
+        pending, loaded, imported = dict(tables), set(), 0
+        while pending:
+            ready = self.get_ready(pending, loaded, dependencies)
+            if not ready:
+                raise CommandError('Циклическая зависимость между таблицами')
+            file = ready[0]
+            model, columns = pending.pop(file)
+            imported += self.load(file, model, columns, options, checker)
+            loaded.add(model)
+        return imported
+
+    def run_parallel(self, tables, options, checker):
+        """Загружает независимые таблицы одновременно в пуле потоков.
+
+        Таблица отправляется в пул, как только загружены все таблицы, на
+        которые она ссылается.
+
+        Args:
+            tables (dict): файлы и их таблицы.
+            options (dict): параметры команды.
+            checker (ForeignKeyChecker): проверка внешних ключей или None.
+
+        Returns:
+            int: количество загруженных строк.
+        """
+
+        dependencies = get_dependencies(
+            model for model, columns in tables.values())
+        pending, loaded, running, imported = dict(tables), set(), {}, 0
+        with ThreadPoolExecutor(max_workers=options['jobs']) as executor:
+            while pending or running:
+                for file in self.get_ready(pending, loaded, dependencies):
+                    model, columns = pending.pop(file)
+                    future = executor.submit(
+                        self.load_in_thread,
+                        file, model, columns, options, checker
+                    )
+                    running[future] = model
+                if not running:
+                    raise CommandError(
+                        'Циклическая зависимость между таблицами')
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    loaded.add(running.pop(future))
+                    imported += future.result()
+        return imported
+
+    def load_in_thread(self, *args):
+        """Загружает таблицу в рабочем потоке и закрывает его подключение.
+
+        Returns:
+            int: количество загруженных строк.
+        """
+
+        try:
+            return self.load(*args)
+        finally:
+            connection.close()
+
+    def load(self, file, model, columns, options, checker):
+        """Загружает один файл в отдельной транзакции.
+
+        Args:
+            file (str): путь к файлу.
+            model (Model): модель таблицы.
+            columns (tuple): поля модели в порядке колонок файла.
+            options (dict): параметры команды.
+            checker (ForeignKeyChecker): проверка внешних ключей или None.
+
+        Returns:
+            int: количество загруженных строк.
+        """
+
+        start = time.monotonic()
+        with transaction.atomic():
+            if options['engine'] == COPY:
+                imported = copy_file(connection, model, columns, file)
+                skipped = 0
+            else:
+                imported, skipped = self.import_file(
+                    file, model, columns, options['batch_size'], checker)
+        self.report(os.path.basename(file), imported, skipped,
+                    time.monotonic() - start)
+        return imported
+
+    def import_file(self, file, model, columns, batch_size, checker=None):
+        """Загружает CSV файл в таблицу пачками через bulk_create.
+
+        Args:
+            file (str): путь к файлу.
+            model (Model): модель таблицы.
+            columns (tuple): поля модели в порядке колонок файла.
+            batch_size (int): количество строк в одном INSERT.
+            checker (ForeignKeyChecker, optional): проверка внешних ключей.
+
+        Returns:
+            tuple: количество загруженных и пропущенных строк.
+        """
+
+        converters = get_converters(model, columns)
+        checks = checker.get_checks(model, columns) if checker else ()
+        imported = skipped = 0
+        for rows in chunks(read_rows(file), batch_size):
+            objs = []
+            for row in rows:
+                values = [
+                    convert(value) for convert, value in zip(converters, row)
+                ]
+                if checks and not checker.is_valid(checks, values):
+                    skipped += 1
+                    continue
+                objs.append(model(**dict(zip(columns, values))))
+            model.objects.bulk_create(objs, batch_size=batch_size)
+            imported += len(objs)
+        return imported, skipped
+
+    def report(self, name, imported, skipped, elapsed):
+        """Выводит статистику загрузки.
+
+        Args:
+            name (str): имя файла или итоговой строки.
+            imported (int): количество загруженных строк.
+            skipped (int): количество пропущенных строк.
+            elapsed (float): время загрузки в секундах.
+        """
+
+        rate = imported / elapsed if elapsed else imported
+        message = (f'{name}: {imported} строк за '
+                   f'{elapsed:.2f} с ({rate:.0f} строк/с)')
+        if skipped:
+            message += f', пропущено строк: {skipped}'
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,37 @@
+from core.cache import GLOBAL_GROUP, bump_versions
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.models import Title
+
+DRIFT_PREVIEW = 20
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает хранимый рейтинг произведений и ищет расхождения'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, ничего не изменяя'
+        )
+
+    def handle(self, *args, **options):
+        drift = Title.objects.rating_drift()
+        if options['check']:
+            ids = list(drift.values_list('id', flat=True))
+            if ids:
+                raise CommandError(
+                    f'Рейтинг расходится с отзывами у {len(ids)} '
+                    f'произведений: {ids[:DRIFT_PREVIEW]}'
+                )
+            self.stdout.write(self.style.SUCCESS('Расхождений не найдено'))
+            return
+        with transaction.atomic():
+            drifted = drift.count()
+            updated = Title.objects.recalculate_rating()
+        bump_versions(GLOBAL_GROUP)
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений, '
+            f'исправлено расхождений: {drifted}'
+        ))
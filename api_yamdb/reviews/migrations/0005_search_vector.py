@@ -0,0 +1,78 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:40
+
+import django.contrib.postgres.search
+from core.operations import PostgreSQLOnlyRunSQL
+from django.db import migrations
+
+CONFIGS = ('russian', 'english')
+
+# Таблица и ее текстовые колонки с весами для ранжирования.
+TABLES = (
+    ('reviews_title', (('name', 'A'), ('description', 'B'))),
+    ('reviews_review', (('text', 'A'),)),
+    ('reviews_comments', (('text', 'A'),)),
+)
+
+
+def vector(columns, prefix=''):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', "
+        f"coalesce({prefix}{column}, '')), '{weight}')"
+        for column, weight in columns
+        for config in CONFIGS
+    )
+
+
+def search_vector_sql(table, columns):
+    names = ', '.join(column for column, weight in columns)
+    return PostgreSQLOnlyRunSQL(
+        sql=[
+            f'''
+            CREATE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector(columns, 'NEW.')};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            ''',
+            f'''
+            CREATE TRIGGER {table}_search_vector_update
+            BEFORE INSERT OR UPDATE OF {names} ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_search_vector()
+            ''',
+            f'UPDATE {table} SET search_vector = {vector(columns)}',
+            f'CREATE INDEX {table}_search_idx ON {table} '
+            f'USING GIN (search_vector)',
+        ],
+        reverse_sql=[
+            f'DROP INDEX {table}_search_idx',
+            f'DROP TRIGGER {table}_search_vector_update ON {table}',
+            f'DROP FUNCTION {table}_search_vector()',
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comments',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        *(search_vector_sql(table, columns) for table, columns in TABLES),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 2.2.28 on 2026-10-18 19:00
+
+from django.db import migrations
+
+TABLES = ('reviews_title', 'reviews_category', 'reviews_genre')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Создает индексы pg_trgm для поиска подстроки и похожих названий.
+
+    Индекс по UPPER(name::text) обслуживает icontains, который Django
+    компилирует в UPPER("name"::text) LIKE UPPER('%...%'), индекс по name -
+    оператор похожести %. Если расширение pg_trgm недоступно на сервере,
+    индексы не создаются: icontains работает без них, а запросы с
+    ?name__similar= отклоняются с ответом 400.
+    """
+
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_name_trgm_idx '
+            f'ON {table} USING GIN (name gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_name_upper_trgm_idx '
+            f'ON {table} USING GIN (UPPER(name::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_name_trgm_idx')
+        schema_editor.execute(
+            f'DROP INDEX IF EXISTS {table}_name_upper_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
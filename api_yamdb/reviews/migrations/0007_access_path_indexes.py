@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 19:20
+
+from core.operations import PostgreSQLOnlyRunSQL
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comments',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.Review', verbose_name='Отзыв'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.Title', verbose_name='Произведение'),
+        ),
+        migrations.AlterField(
+            model_name='titlesgenres',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Genre'),
+        ),
+        migrations.AlterField(
+            model_name='titlesgenres',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Title'),
+        ),
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['review', '-pub_date', 'id'], name='comments_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', 'id'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlesgenres',
+            index=models.Index(fields=['genre', 'title'], name='titles_genres_genre_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlesgenres',
+            index=models.Index(fields=['title', 'genre'], name='titles_genres_title_genre_idx'),
+        ),
+        # Покрывающий индекс для пересчета рейтинга: сумма и количество
+        # оценок произведения читаются из индекса без обращения к таблице.
+        PostgreSQLOnlyRunSQL(
+            sql='CREATE INDEX review_title_score_idx ON reviews_review '
+                '(title_id) INCLUDE (score)',
+            reverse_sql='DROP INDEX review_title_score_idx',
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
 
 from .validators import year_validator
 
@@ -20,6 +24,12 @@ class User(AbstractUser):
         confirmation_code (str): код подтверждения, для получения токена.
     """
 
+    ADMIN = 'admin'
+    MODERATOR = 'moderator'
+    USER = 'user'
+    # Поля, попадающие в утверждения токена или влияющие на его валидность.
+    TOKEN_STATE_FIELDS = ('username', 'role', 'is_staff', 'is_active')
+
     username = models.CharField(
         'Username',
         max_length=150,
@@ -49,6 +59,27 @@ class User(AbstractUser):
 
         return self.role == User.ADMIN or self.is_staff
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из БД данные, попадающие в токен, и имя
+        пользователя, которое выводится в его отзывах и комментариях."""
+
+        instance = super().from_db(db, field_names, values)
+        if set(cls.TOKEN_STATE_FIELDS) <= set(field_names):
+            instance._token_state = instance.get_token_state()
+        if 'username' in field_names:
+            instance._username_state = instance.username
+        return instance
+
+    def get_token_state(self):
+        """Возвращает данные пользователя, попадающие в токен.
+
+        Returns:
+            tuple: значения полей TOKEN_STATE_FIELDS.
+        """
+
+        return tuple(getattr(self, field) for field in self.TOKEN_STATE_FIELDS)
+
 
 class CategoryGenreModel(models.Model):
     """Родительская модель для категории/жанра.
@@ -98,8 +129,137 @@ class TitlesGenres(models.Model):
         genre (int): id жанра.
     """
 
-    title = models.ForeignKey('Title', on_delete=models.CASCADE)
-    genre = models.ForeignKey('Genre', on_delete=models.CASCADE)
+    # Отдельные индексы не нужны: обе колонки ведут составные индексы.
+    title = models.ForeignKey(
+        'Title', on_delete=models.CASCADE, db_index=False)
+    genre = models.ForeignKey(
+        'Genre', on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='titles_genres_genre_title_idx'
+            ),
+            models.Index(
+                fields=['title', 'genre'],
+                name='titles_genres_title_genre_idx'
+            ),
+        ]
+
+
+def average_rating(total, count):
+    """Строит выражение для среднего рейтинга по сумме и количеству оценок.
+
+    Args:
+        total (Expression): выражение суммы оценок.
+        count (Expression): выражение количества оценок.
+
+    Returns:
+        ExpressionWrapper: выражение среднего рейтинга, NULL если оценок нет.
+    """
+
+    return models.ExpressionWrapper(
+        Cast(total, models.FloatField()) / NullIf(count, 0),
+        output_field=models.FloatField()
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с поддержкой хранимого рейтинга."""
+
+    def change_rating(self, title_id, score_delta, count_delta):
+        """Инкрементально изменяет хранимый рейтинг произведения.
+
+        Изменение выполняется одним UPDATE относительно текущих значений,
+        поэтому конкурентные изменения отзывов не теряются.
+
+        Args:
+            title_id (int): id произведения.
+            score_delta (int): изменение суммы оценок.
+            count_delta (int): изменение количества оценок.
+
+        Returns:
+            int: количество обновленных произведений.
+        """
+
+        total = F('rating_sum') + score_delta
+        count = F('rating_count') + count_delta
+        return self.filter(pk=title_id).update(
+            rating_sum=total,
+            rating_count=count,
+            rating=average_rating(total, count),
+            modified=timezone.now()
+        )
+
+    def with_actual_rating(self):
+        """Добавляет к произведениям сумму и количество оценок, посчитанные
+        по таблице отзывов.
+
+        Returns:
+            QuerySet: произведения с аннотациями actual_sum и actual_count.
+        """
+
+        total, count = _actual_rating()
+        return self.annotate(actual_sum=total, actual_count=count)
+
+    def rating_drift(self):
+        """Возвращает произведения, у которых хранимый рейтинг расходится с
+        отзывами.
+
+        Returns:
+            QuerySet: произведения с расхождением рейтинга.
+        """
+
+        return self.with_actual_rating().exclude(
+            rating_sum=F('actual_sum'),
+            rating_count=F('actual_count')
+        )
+
+    def recalculate_rating(self):
+        """Пересчитывает хранимый рейтинг произведений с нуля.
+
+        Returns:
+            int: количество обновленных произведений.
+        """
+
+        total, count = _actual_rating()
+        self.update(rating_sum=total, rating_count=count)
+        return self.update(
+            rating=average_rating(F('rating_sum'), F('rating_count')),
+            modified=timezone.now()
+        )
+
+    def touch(self):
+        """Обновляет дату изменения произведений, например после
+        переименования их категории или жанра.
+
+        Returns:
+            int: количество обновленных произведений.
+        """
+
+        return self.update(modified=timezone.now())
+
+
+def _actual_rating():
+    """Строит подзапросы суммы и количества оценок произведения.
+
+    Returns:
+        tuple: выражения суммы и количества оценок.
+    """
+
+    scores = Review.objects.filter(
+        title=OuterRef('pk'),
+        score__isnull=False
+    ).order_by().values('title')
+    return (
+        Coalesce(
+            Subquery(scores.annotate(total=Sum('score')).values('total')), 0
+        ),
+        Coalesce(
+            Subquery(scores.annotate(count=Count('score')).values('count')), 0
+        ),
+    )
 
 
 class Title(models.Model):
@@ -111,6 +271,13 @@ class Title(models.Model):
         category (int): категория.
         description (str): описание.
         genre (int): жанр.
+        rating_sum (int): сумма оценок.
+        rating_count (int): количество оценок.
+        rating (float): средняя оценка.
+        modified (datetime): дата изменения произведения, его рейтинга,
+            категории или жанров.
+        search_vector (str): tsvector названия и описания, в PostgreSQL
+            заполняется триггером.
     """
 
     name = models.TextField(verbose_name='Название произведения')
@@ -135,17 +302,71 @@ class Title(models.Model):
         verbose_name='Жанр',
         through='TitlesGenres'
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        blank=True,
+        null=True,
+        editable=False
+    )
+    modified = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True
+    )
+    search_vector = SearchVectorField(
+        verbose_name='Поисковый вектор',
+        null=True,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         default_related_name = 'titles'
 
+    # Столбцы, которые меняет только change_rating() и recalculate_rating().
+    RATING_FIELDS = ('rating_sum', 'rating_count', 'rating')
+
     def __str__(self):
         """Возвращает строковое представление модели"""
 
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Сохраняет произведение, не записывая рейтинг из памяти.
+
+        Загруженный объект мог устареть: рейтинг, обновленный отзывом после
+        загрузки, затерся бы прежними значениями. Поэтому при обновлении
+        без update_fields сохраняются все поля, кроме RATING_FIELDS и
+        отложенных.
+        """
+
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.RATING_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class ReviewCommentModel(models.Model):
     """Родительская модель для отзыва/комментария.
@@ -154,6 +375,9 @@ class ReviewCommentModel(models.Model):
         text (str): текст.
         author (int): id автора.
         pub_date (datetime): дата создания.
+        modified (datetime): дата изменения.
+        search_vector (str): tsvector текста, в PostgreSQL заполняется
+            триггером.
     """
 
     text = models.TextField(verbose_name='Текст')
@@ -167,6 +391,12 @@ class ReviewCommentModel(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    modified = models.DateTimeField('Дата изменения', auto_now=True)
+    search_vector = SearchVectorField(
+        'Поисковый вектор',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         abstract = True
@@ -190,6 +420,7 @@ class Review(ReviewCommentModel):
         Title,
         on_delete=models.CASCADE,
         verbose_name='Произведение',
+        db_index=False
     )
     score = models.IntegerField(
         blank=True,
@@ -208,10 +439,32 @@ class Review(ReviewCommentModel):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         default_related_name = 'reviews'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из БД произведение и оценку, чтобы при
+        сохранении изменить рейтинг на разницу."""
+
+        instance = super().from_db(db, field_names, values)
+        if 'title_id' in field_names and 'score' in field_names:
+            instance._rating_state = (instance.title_id, instance.score)
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв в одной транзакции с изменением рейтинга."""
+
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class Comments(ReviewCommentModel):
     """Модель для комментария.
@@ -224,9 +477,16 @@ class Comments(ReviewCommentModel):
         Review,
         on_delete=models.CASCADE,
         verbose_name='Отзыв',
+        db_index=False
     )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comments_review_pub_date_idx'
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
@@ -0,0 +1,242 @@
+import threading
+
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (Category, Comments, Genre, Review, Title, TitlesGenres,
+                     User)
+
+_deleting = threading.local()
+
+
+def _deleting_pks(model, using):
+    """Возвращает id объектов модели, удаляемых в текущей транзакции.
+
+    Удаление сначала отправляет pre_delete всем собранным объектам, поэтому
+    обработчики post_delete вложенных объектов знают, что родитель тоже
+    удаляется, и не обновляют его построчно. Отметки привязаны к списку
+    обработчиков on_commit соединения: Django заменяет его при фиксации и
+    откате, и отметки прерванного удаления дальше не действуют.
+
+    Args:
+        model (Model): модель родительских объектов.
+        using (str): псевдоним базы данных.
+
+    Returns:
+        set: id удаляемых объектов.
+    """
+
+    hooks = connections[using].run_on_commit
+    state = getattr(_deleting, using, None)
+    if state is None or state[0] is not hooks:
+        state = (hooks, {})
+        setattr(_deleting, using, state)
+    return state[1].setdefault(model, set())
+
+
+@receiver(pre_delete, sender=Title)
+@receiver(pre_delete, sender=Review)
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=User)
+def mark_deleting(sender, instance, using, **kwargs):
+    """Отмечает удаляемый объект, чьи вложенные объекты удаляются вместе
+    с ним."""
+
+    _deleting_pks(sender, using).add(instance.pk)
+
+
+def _score(score):
+    """Возвращает вклад оценки в сумму и количество оценок.
+
+    Args:
+        score (int): оценка, может отсутствовать.
+
+    Returns:
+        tuple: вклад в сумму оценок и в количество оценок.
+    """
+
+    if score is None:
+        return 0, 0
+    return score, 1
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Изменяет хранимый рейтинг произведения после сохранения отзыва.
+
+    Если прежняя оценка отзыва неизвестна (например, объект был загружен
+    без поля score), рейтинг произведения пересчитывается целиком.
+    """
+
+    if raw:
+        return
+    new_state = (instance.title_id, instance.score)
+    old_state = (None, None) if created else getattr(
+        instance, '_rating_state', None)
+    if old_state is None:
+        Title.objects.filter(pk=instance.title_id).recalculate_rating()
+    elif old_state == new_state:
+        Title.objects.filter(pk=instance.title_id).touch()
+    else:
+        old_title_id, old_score = old_state
+        old_sum, old_count = _score(old_score)
+        new_sum, new_count = _score(instance.score)
+        if old_title_id == instance.title_id:
+            Title.objects.change_rating(
+                instance.title_id, new_sum - old_sum, new_count - old_count)
+        else:
+            if old_title_id is not None:
+                Title.objects.change_rating(
+                    old_title_id, -old_sum, -old_count)
+            Title.objects.change_rating(instance.title_id, new_sum, new_count)
+    instance._rating_state = new_state
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, using, **kwargs):
+    """Изменяет хранимый рейтинг произведения после удаления отзыва.
+
+    Рейтинг удаляемого произведения не меняется, а рейтинги произведений
+    удаляемого автора пересчитывает update_on_user_delete().
+    """
+
+    title_id, score = getattr(
+        instance, '_rating_state', (instance.title_id, instance.score))
+    if (title_id in _deleting_pks(Title, using)
+            or instance.author_id in _deleting_pks(User, using)):
+        return
+    score_sum, score_count = _score(score)
+    if score_count:
+        Title.objects.change_rating(title_id, -score_sum, -score_count)
+    else:
+        Title.objects.filter(pk=title_id).touch()
+
+
+@receiver(post_delete, sender=Comments)
+def touch_review_on_comment_delete(sender, instance, using, **kwargs):
+    """Обновляет дату изменения отзыва после удаления комментария, чтобы
+    дата изменения списка комментариев не уменьшилась.
+
+    Удаляемый отзыв не обновляется, а отзывы с комментариями удаляемого
+    автора обновляет update_on_user_delete().
+    """
+
+    if (instance.review_id in _deleting_pks(Review, using)
+            or instance.author_id in _deleting_pks(User, using)):
+        return
+    Review.objects.filter(pk=instance.review_id).update(
+        modified=timezone.now())
+
+
+@receiver(pre_delete, sender=User)
+def collect_on_user_delete(sender, instance, **kwargs):
+    """Запоминает произведения с отзывами и отзывы с комментариями
+    удаляемого пользователя, пока они еще существуют."""
+
+    instance._deleted_review_titles = list(
+        Review.objects.filter(author=instance).values_list(
+            'title_id', flat=True))
+    instance._deleted_comment_reviews = list(
+        Comments.objects.filter(author=instance).values_list(
+            'review_id', flat=True).distinct())
+
+
+@receiver(post_delete, sender=User)
+def update_on_user_delete(sender, instance, **kwargs):
+    """Пересчитывает рейтинг произведений и обновляет дату изменения
+    отзывов, у которых удалились отзывы и комментарии пользователя.
+
+    Вместо UPDATE на каждый удаленный отзыв и комментарий выполняется
+    по одному запросу на все затронутые строки.
+    """
+
+    title_ids = getattr(instance, '_deleted_review_titles', None)
+    if title_ids:
+        Title.objects.filter(pk__in=title_ids).recalculate_rating()
+    review_ids = getattr(instance, '_deleted_comment_reviews', None)
+    if review_ids:
+        Review.objects.filter(pk__in=review_ids).update(
+            modified=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_titles_on_rename(sender, instance, created, raw=False, **kwargs):
+    """Обновляет дату изменения произведений переименованной категории
+    или жанра."""
+
+    if created or raw:
+        return
+    if sender is Category:
+        Title.objects.filter(category=instance).touch()
+    else:
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_on_delete(sender, instance, **kwargs):
+    """Обновляет дату изменения произведений удаляемой категории или
+    жанра, пока связь с ними еще существует."""
+
+    if sender is Category:
+        Title.objects.filter(category=instance).touch()
+    else:
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(post_save, sender=TitlesGenres)
+def touch_title_on_genre_link(sender, instance, raw=False, **kwargs):
+    """Обновляет дату изменения произведения при изменении его жанров."""
+
+    if not raw:
+        Title.objects.filter(pk=instance.title_id).touch()
+
+
+@receiver(post_delete, sender=TitlesGenres)
+def touch_title_on_genre_unlink(sender, instance, using, **kwargs):
+    """Обновляет дату изменения произведения после удаления связи с
+    жанром.
+
+    Связи удаляемого произведения не обновляют его, а произведения
+    удаляемого жанра уже обновил touch_titles_on_delete().
+    """
+
+    if (instance.title_id in _deleting_pks(Title, using)
+            or instance.genre_id in _deleting_pks(Genre, using)):
+        return
+    Title.objects.filter(pk=instance.title_id).touch()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_titles_on_genres_change(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    """Обновляет дату изменения произведений при изменении жанров через
+    менеджер связи (add, remove, set, clear)."""
+
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            Title.objects.filter(pk=instance.pk).touch()
+    elif action in ('post_add', 'post_remove'):
+        Title.objects.filter(pk__in=pk_set).touch()
+    elif action == 'pre_clear':
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(post_save, sender=User)
+def touch_reviews_on_rename(sender, instance, created, raw=False, **kwargs):
+    """Обновляет дату изменения отзывов и комментариев пользователя после
+    смены его имени, которое выводится в них как автор."""
+
+    if raw:
+        return
+    old_username = getattr(instance, '_username_state', None)
+    instance._username_state = instance.username
+    if created or old_username == instance.username:
+        return
+    now = timezone.now()
+    Review.objects.filter(author=instance).update(modified=now)
+    Comments.objects.filter(author=instance).update(modified=now)
@@ -0,0 +1,88 @@
+"""Нагрузочный тест API YaMDb.
+
+Запуск из корня репозитория против уже работающего сервера:
+
+    python -m loadtest --host http://127.0.0.1:8000 --users 20 --duration 60
+
+или с запуском gunicorn и отправки почты на встроенную SMTP заглушку
+(нужны те же переменные окружения, что и для manage.py):
+
+    python -m loadtest --start-server --users 20 --duration 60
+
+Коды подтверждения приходят на SMTP заглушку, поэтому регистрация
+работает, только если сервер отправляет почту на ее порт (--smtp-port).
+"""
+import argparse
+import os
+import sys
+
+from .runner import run, start_server, stop_server, wait_until_ready
+from .smtp import SMTPSink
+from .stats import Stats, compare, format_summary, load_baseline, save_baseline
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        'baseline.json')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m loadtest', description='Нагрузочный тест API YaMDb')
+    parser.add_argument('--host', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=10,
+                        help='Количество одновременных пользователей')
+    parser.add_argument('--duration', type=float, default=30,
+                        help='Длительность теста в секундах')
+    parser.add_argument('--think-time', type=float, default=0,
+                        help='Наибольшая пауза между запросами в секундах')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--smtp-port', type=int, default=1025,
+                        help='Порт SMTP заглушки, 0 - любой свободный')
+    parser.add_argument('--start-server', action='store_true',
+                        help='Запустить gunicorn и sendmail на время теста')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Количество процессов gunicorn')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='JSON файл с эталонными показателями')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Сохранить результаты как новый эталон')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Допустимый рост p95 относительно эталона')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sink = SMTPSink(port=args.smtp_port).start()
+    processes = []
+    try:
+        if args.start_server:
+            processes = start_server(
+                args.host.split('//')[-1], args.workers, sink.port)
+        wait_until_ready(args.host)
+        stats = Stats()
+        catalog, duration = run(
+            args.host, stats, sink, args.users, args.duration,
+            seed=args.seed, think_time=args.think_time
+        )
+    finally:
+        stop_server(processes)
+        sink.shutdown()
+    summary = stats.summary(duration)
+    print(f'Произведений: {len(catalog.titles)}, '
+          f'пользователей: {args.users}, {duration:.1f} с')
+    print(format_summary(summary))
+    if args.save_baseline:
+        save_baseline(args.baseline, summary)
+        print(f'Эталон сохранен в {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    regressions = compare(summary, load_baseline(args.baseline),
+                          args.tolerance)
+    for regression in regressions:
+        print(f'Регрессия: {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
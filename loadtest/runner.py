@@ -0,0 +1,148 @@
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from .stats import Stats
+from .tasks import TASKS, Catalog, Session
+
+API_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb')
+STARTUP_TIMEOUT = 30
+
+
+def run_user(host, stats, catalog, sink, seed, deadline, think_time):
+    """Цикл одного виртуального пользователя до наступления deadline.
+
+    Args:
+        host (str): адрес сервера.
+        stats (Stats): сбор показателей.
+        catalog (Catalog): идентификаторы объектов.
+        sink (SMTPSink): SMTP заглушка для кодов подтверждения.
+        seed (int): начальное значение генератора пользователя.
+        deadline (float): время окончания по time.monotonic().
+        think_time (float): наибольшая пауза между запросами в секундах.
+    """
+
+    rng = random.Random(seed)
+    session = Session(host, stats)
+    tasks, weights = zip(*TASKS)
+    while time.monotonic() < deadline:
+        rng.choices(tasks, weights)[0](session, catalog, rng, sink)
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+
+def run(host, stats, sink, users, duration, seed=0, think_time=0):
+    """Запускает виртуальных пользователей в потоках и ждет их окончания.
+
+    Args:
+        host (str): адрес сервера.
+        stats (Stats): сбор показателей.
+        sink (SMTPSink): SMTP заглушка.
+        users (int): количество одновременных пользователей.
+        duration (float): длительность теста в секундах.
+        seed (int): начальное значение генераторов.
+        think_time (float): наибольшая пауза между запросами в секундах.
+
+    Returns:
+        tuple: каталог и фактическая длительность в секундах.
+    """
+
+    catalog = Catalog().discover(Session(host, Stats()))
+    start = time.monotonic()
+    threads = [
+        threading.Thread(
+            target=run_user,
+            args=(host, stats, catalog, sink, seed + number,
+                  start + duration, think_time),
+            daemon=True
+        )
+        for number in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return catalog, time.monotonic() - start
+
+
+def wait_until_ready(host, timeout=STARTUP_TIMEOUT):
+    """Ждет, пока сервер начнет отвечать.
+
+    Args:
+        host (str): адрес сервера.
+        timeout (float): сколько секунд ждать.
+
+    Raises:
+        RuntimeError: сервер не ответил за timeout секунд.
+    """
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(f'{host}/api/v1/', timeout=1):
+                return
+        except URLError as error:
+            if getattr(error, 'code', None):
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'Сервер {host} не ответил за {timeout} с')
+
+
+def start_server(bind, workers, smtp_port):
+    """Запускает gunicorn и отправку почты на SMTP заглушку.
+
+    Оба процесса получают окружение текущего процесса (SECRET_KEY,
+    параметры базы данных) и почтовые настройки заглушки.
+
+    Args:
+        bind (str): адрес gunicorn, например 127.0.0.1:8000.
+        workers (int): количество процессов gunicorn.
+        smtp_port (int): порт SMTP заглушки.
+
+    Returns:
+        list: запущенные процессы.
+    """
+
+    env = dict(
+        os.environ,
+        EMAIL_HOST='127.0.0.1',
+        EMAIL_PORT=str(smtp_port),
+        EMAIL_USE_TLS='False',
+        EMAIL_HOST_USER='loadtest@yamdb.fake',
+        EMAIL_HOST_PASSWORD='',
+    )
+    return [
+        subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'api_yamdb.wsgi:application',
+             '--bind', bind, '--workers', str(workers)],
+            cwd=API_DIR, env=env
+        ),
+        subprocess.Popen(
+            [sys.executable, 'manage.py', 'sendmail', '--interval', '0.1'],
+            cwd=API_DIR, env=env
+        ),
+    ]
+
+
+def stop_server(processes):
+    """Останавливает процессы, запущенные start_server().
+
+    Args:
+        processes (list): процессы.
+    """
+
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
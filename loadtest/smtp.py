@@ -0,0 +1,146 @@
+import email
+import re
+import socketserver
+import threading
+import time
+
+CODE_RE = re.compile(r'confirmation code: (\d+)')
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP сервер: принимает любые письма и сохраняет их.
+
+    Поддерживает команды, которые использует smtplib при отправке из
+    django.core.mail без TLS. AUTH PLAIN принимается с любыми данными.
+    """
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def read_data(self):
+        """Читает тело письма до строки из одной точки.
+
+        Returns:
+            bytes: тело письма.
+        """
+
+        lines = []
+        for line in self.rfile:
+            if line.rstrip(b'\r\n') == b'.':
+                break
+            if line.startswith(b'..'):
+                line = line[1:]
+            lines.append(line)
+        return b''.join(lines)
+
+    def handle(self):
+        self.reply('220 loadtest SMTP sink')
+        sender, recipients = None, []
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').strip()
+            command = line[:4].upper()
+            if command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            if command in ('EHLO', 'HELO'):
+                self.reply('250-loadtest')
+                self.reply('250 AUTH PLAIN')
+            elif command == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif command == 'MAIL':
+                sender, recipients = line.partition(':')[2].strip(), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipients.append(line.partition(':')[2].strip(' <>'))
+                self.reply('250 OK')
+            elif command == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                self.server.store(
+                    sender, recipients,
+                    email.message_from_bytes(self.read_data())
+                )
+                self.reply('250 OK')
+            elif command == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Локальная замена почтового сервера для нагрузочного теста.
+
+    Письма хранятся в памяти по адресам получателей, wait_for_code() ждет
+    письмо с кодом подтверждения.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """Открывает порт сервера.
+
+        Args:
+            host (str): адрес.
+            port (int): порт, 0 - любой свободный.
+        """
+
+        super().__init__((host, port), SMTPHandler)
+        self.messages = {}
+        self.received = threading.Condition()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        """Запускает сервер в фоновом потоке.
+
+        Returns:
+            SMTPSink: тот же сервер.
+        """
+
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def store(self, sender, recipients, message):
+        """Сохраняет принятое письмо.
+
+        Args:
+            sender (str): отправитель.
+            recipients (list): адреса получателей.
+            message (Message): письмо.
+        """
+
+        with self.received:
+            for recipient in recipients:
+                self.messages.setdefault(recipient, []).append(message)
+            self.received.notify_all()
+
+    def wait_for_code(self, recipient, timeout):
+        """Ждет письмо с кодом подтверждения и возвращает код.
+
+        Письмо удаляется из хранилища.
+
+        Args:
+            recipient (str): адрес получателя.
+            timeout (float): сколько секунд ждать.
+
+        Returns:
+            str: код подтверждения или None, если письмо не пришло.
+        """
+
+        deadline = time.monotonic() + timeout
+        with self.received:
+            while True:
+                for message in self.messages.pop(recipient, ()):
+                    body = message.get_payload(decode=True)
+                    match = CODE_RE.search(body.decode('utf-8', 'replace'))
+                    if match:
+                        return match.group(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.received.wait(remaining)
@@ -0,0 +1,165 @@
+import json
+import threading
+from collections import defaultdict
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, rank):
+    """Возвращает перцентиль методом ближайшего ранга.
+
+    Args:
+        values (list): отсортированные значения.
+        rank (float): перцентиль от 0 до 100.
+
+    Returns:
+        float: значение перцентиля или None для пустого списка.
+    """
+
+    if not values:
+        return None
+    index = max(0, -(-len(values) * rank // 100) - 1)
+    return values[int(index)]
+
+
+class Stats:
+    """Потокобезопасный сбор времени ответов по эндпоинтам."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, name, elapsed, ok=True):
+        """Сохраняет результат одного запроса.
+
+        Args:
+            name (str): название эндпоинта.
+            elapsed (float): время ответа в миллисекундах.
+            ok (bool): ответ с ожидаемым статусом.
+        """
+
+        with self.lock:
+            self.timings[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, duration):
+        """Считает пропускную способность и перцентили.
+
+        Args:
+            duration (float): длительность теста в секундах.
+
+        Returns:
+            dict: показатели каждого эндпоинта.
+        """
+
+        with self.lock:
+            timings = {name: sorted(values)
+                       for name, values in self.timings.items()}
+            errors = dict(self.errors)
+        result = {}
+        for name, values in sorted(timings.items()):
+            row = {
+                'requests': len(values),
+                'errors': errors.get(name, 0),
+                'rps': round(len(values) / duration, 2) if duration else 0,
+            }
+            for rank in PERCENTILES:
+                row[f'p{rank}'] = round(percentile(values, rank), 2)
+            row['max'] = round(values[-1], 2)
+            result[name] = row
+        return result
+
+
+def format_summary(summary):
+    """Форматирует показатели в таблицу для вывода в консоль.
+
+    Args:
+        summary (dict): результат Stats.summary().
+
+    Returns:
+        str: таблица.
+    """
+
+    columns = ('requests', 'errors', 'rps',
+               *(f'p{rank}' for rank in PERCENTILES), 'max')
+    width = max([len(name) for name in summary] + [8])
+    lines = [
+        'endpoint'.ljust(width)
+        + ''.join(column.rjust(10) for column in columns)
+    ]
+    for name, row in summary.items():
+        lines.append(name.ljust(width) + ''.join(
+            str(row[column]).rjust(10) for column in columns))
+    return '\n'.join(lines)
+
+
+def save_baseline(path, summary):
+    """Сохраняет показатели как эталон для следующих запусков.
+
+    Args:
+        path (str): путь к JSON файлу.
+        summary (dict): результат Stats.summary().
+    """
+
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    """Читает сохраненный эталон.
+
+    Args:
+        path (str): путь к JSON файлу.
+
+    Returns:
+        dict: показатели эндпоинтов.
+    """
+
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def error_rate(row):
+    """Возвращает долю ошибок эндпоинта.
+
+    Args:
+        row (dict): показатели эндпоинта.
+
+    Returns:
+        float: доля запросов с неожиданным статусом.
+    """
+
+    return row.get('errors', 0) / row['requests'] if row['requests'] else 0
+
+
+def compare(summary, baseline, tolerance, metric='p95'):
+    """Сравнивает показатели с эталоном.
+
+    Args:
+        summary (dict): текущие показатели.
+        baseline (dict): эталонные показатели.
+        tolerance (float): допустимый рост metric в долях, 0.2 - на 20%.
+        metric (str): сравниваемый перцентиль.
+
+    Returns:
+        list: описания регрессий.
+    """
+
+    regressions = []
+    for name, row in summary.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get(metric):
+            continue
+        if row[metric] > reference[metric] * (1 + tolerance):
+            regressions.append(
+                f'{name}: {metric} {row[metric]} мс, эталон '
+                f'{reference[metric]} мс'
+            )
+        if error_rate(row) > error_rate(reference):
+            regressions.append(
+                f'{name}: ошибок {error_rate(row):.1%}, эталон '
+                f'{error_rate(reference):.1%}'
+            )
+    return regressions
@@ -0,0 +1,239 @@
+import json
+import time
+import uuid
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+API = '/api/v1'
+TIMEOUT = 30
+MAIL_TIMEOUT = 15
+DISCOVERY_LIMIT = 200
+REVIEWED_TITLES = 30
+
+
+class Session:
+    """HTTP клиент одного виртуального пользователя.
+
+    Каждый запрос записывается в Stats под названием эндпоинта, а не
+    полного URL, чтобы запросы к разным объектам попадали в одну строку
+    отчета.
+    """
+
+    def __init__(self, host, stats):
+        """Создает клиент без токена.
+
+        Args:
+            host (str): адрес сервера, например http://127.0.0.1:8000.
+            stats (Stats): сбор показателей.
+        """
+
+        self.host = host.rstrip('/')
+        self.stats = stats
+        self.token = None
+
+    def request(self, method, path, name, data=None, expected=(200,)):
+        """Выполняет запрос к API и записывает время ответа.
+
+        Args:
+            method (str): HTTP метод.
+            path (str): путь от /api/v1 со строкой запроса.
+            name (str): название эндпоинта в отчете.
+            data (dict, optional): тело запроса в JSON.
+            expected (tuple): статусы успешного ответа.
+
+        Returns:
+            tuple: статус и разобранное тело ответа (None, если тело не
+            JSON или сервер недоступен).
+        """
+
+        headers = {'Accept': 'application/json'}
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        request = Request(f'{self.host}{API}{path}', body, headers,
+                          method=method)
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=TIMEOUT) as response:
+                status, content = response.status, response.read()
+        except HTTPError as error:
+            status, content = error.code, error.read()
+        except (URLError, OSError):
+            status, content = None, b''
+        self.stats.record(
+            f'{method} {name}',
+            (time.perf_counter() - start) * 1000,
+            status in expected
+        )
+        try:
+            return status, json.loads(content)
+        except ValueError:
+            return status, None
+
+
+class Catalog:
+    """Идентификаторы объектов, по которым ходят виртуальные пользователи.
+
+    Заполняется один раз перед тестом запросами к самому API.
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.categories = []
+        self.genres = []
+        self.years = []
+        self.names = []
+        self.reviews = {}
+
+    def discover(self, session):
+        """Загружает произведения, категории, жанры и отзывы.
+
+        Args:
+            session (Session): клиент для запросов.
+
+        Returns:
+            Catalog: тот же каталог.
+        """
+
+        limit = f'?limit={DISCOVERY_LIMIT}'
+        status, data = session.request(
+            'GET', f'/titles/{limit}', 'discover')
+        for title in (data or {}).get('results', ()):
+            self.titles.append(title['id'])
+            self.years.append(title['year'])
+            self.names.append(title['name'].split()[0])
+        for attr in ('categories', 'genres'):
+            status, data = session.request(
+                'GET', f'/{attr}/{limit}', 'discover')
+            setattr(self, attr, [
+                item['slug'] for item in (data or {}).get('results', ())
+            ])
+        for title in self.titles[:REVIEWED_TITLES]:
+            status, data = session.request(
+                'GET', f'/titles/{title}/reviews/{limit}', 'discover')
+            reviews = [item['id'] for item in (data or {}).get('results', ())]
+            if reviews:
+                self.reviews[title] = reviews
+        return self
+
+
+def browse_titles(session, catalog, rng, sink):
+    """Анонимный просмотр списка произведений со случайным фильтром."""
+
+    params = {'limit': 10, 'offset': rng.randrange(0, 50, 10)}
+    choice = rng.randrange(5)
+    if choice == 1 and catalog.genres:
+        params['genre'] = rng.choice(catalog.genres)
+    elif choice == 2 and catalog.categories:
+        params['category'] = rng.choice(catalog.categories)
+    elif choice == 3 and catalog.years:
+        params['year'] = rng.choice(catalog.years)
+    elif choice == 4 and catalog.names:
+        params['name'] = rng.choice(catalog.names)
+    session.request('GET', f'/titles/?{urlencode(params)}', '/titles/')
+
+
+def read_title(session, catalog, rng, sink):
+    """Анонимный просмотр произведения."""
+
+    if catalog.titles:
+        session.request('GET', f'/titles/{rng.choice(catalog.titles)}/',
+                        '/titles/{id}/')
+
+
+def read_reviews(session, catalog, rng, sink):
+    """Анонимный просмотр отзывов на произведение."""
+
+    if catalog.titles:
+        session.request(
+            'GET', f'/titles/{rng.choice(catalog.titles)}/reviews/',
+            '/titles/{id}/reviews/'
+        )
+
+
+def read_comments(session, catalog, rng, sink):
+    """Анонимный просмотр комментариев к отзыву."""
+
+    if catalog.reviews:
+        title = rng.choice(list(catalog.reviews))
+        review = rng.choice(catalog.reviews[title])
+        session.request(
+            'GET', f'/titles/{title}/reviews/{review}/comments/',
+            '/titles/{id}/reviews/{id}/comments/'
+        )
+
+
+def sign_up(session, catalog, rng, sink):
+    """Регистрация и получение токена по коду из письма.
+
+    Код подтверждения отправляет команда sendmail; время от регистрации до
+    получения письма SMTP заглушкой записывается отдельной строкой отчета.
+
+    Returns:
+        bool: True если токен получен.
+    """
+
+    username = f'load_{uuid.uuid4().hex[:12]}'
+    email = f'{username}@loadtest.fake'
+    status, data = session.request(
+        'POST', '/auth/signup/', '/auth/signup/',
+        {'username': username, 'email': email}
+    )
+    if status != 200:
+        return False
+    start = time.perf_counter()
+    code = sink.wait_for_code(email, MAIL_TIMEOUT)
+    session.stats.record('MAIL confirmation code',
+                         (time.perf_counter() - start) * 1000,
+                         code is not None)
+    if code is None:
+        return False
+    status, data = session.request(
+        'POST', '/auth/token/', '/auth/token/',
+        {'username': username, 'confirmation_code': code}
+    )
+    if status != 200:
+        return False
+    session.token = data['token']
+    return True
+
+
+def post_review(session, catalog, rng, sink):
+    """Отзыв от зарегистрированного пользователя.
+
+    Повторный отзыв на то же произведение (400) тоже считается ожидаемым
+    ответом.
+    """
+
+    if not catalog.titles:
+        return
+    if session.token is None and not sign_up(session, catalog, rng, sink):
+        return
+    session.request(
+        'POST', f'/titles/{rng.choice(catalog.titles)}/reviews/',
+        '/titles/{id}/reviews/',
+        {'text': 'Отзыв нагрузочного теста', 'score': rng.randint(1, 10)},
+        expected=(201, 400)
+    )
+
+
+def new_user(session, catalog, rng, sink):
+    """Новый пользователь проходит регистрацию и дальше пишет от него."""
+
+    session.token = None
+    sign_up(session, catalog, rng, sink)
+
+
+# Смесь запросов: задача и ее относительная частота.
+TASKS = (
+    (browse_titles, 40),
+    (read_title, 20),
+    (read_reviews, 20),
+    (read_comments, 10),
+    (post_review, 7),
+    (new_user, 3),
+)
@@ -1,9 +1,27 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+from django.core.cache import cache
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
 ]
+
+
+@pytest.fixture(autouse=True)
+def revocation_cache(settings, tmp_path):
+    settings.CACHES = {**settings.CACHES, 'jwt_revocation': {
+        **settings.CACHES['jwt_revocation'],
+        'LOCATION': str(tmp_path / 'jwt_revocation'),
+    }}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
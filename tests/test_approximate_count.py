@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+from reviews.models import Category, Title, User
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    return Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000 + i % 3, category=category)
+        for i in range(12)
+    )
+
+
+@pytest.mark.django_db
+class TestApproximateCount:
+
+    def test_count_can_be_skipped(
+            self, client, titles, django_assert_num_queries):
+        # page of limit + 1 titles and their genres, no count
+        with django_assert_num_queries(2):
+            data = client.get('/api/v1/titles/?count=false&limit=5').json()
+
+        assert data['count'] is None
+        assert len(data['results']) == 5
+        assert 'offset=5' in data['next']
+
+    def test_last_page_without_count_has_no_next(self, client, titles):
+        data = client.get(
+            '/api/v1/titles/?count=false&limit=5&offset=10').json()
+
+        assert len(data['results']) == 2
+        assert data['next'] is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_filtered_count_is_cached_until_titles_change(
+            self, titles, django_assert_num_queries):
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create(username='reader', email='r@yamdb.fake'))
+        url = '/api/v1/titles/?year=2000'
+        assert client.get(url).json()['count'] == 4
+
+        # page of titles and their genres, count from the cache
+        with django_assert_num_queries(2):
+            assert client.get(url).json()['count'] == 4
+
+        Title.objects.create(name='Новое', year=2000)
+        assert client.get(url).json()['count'] == 5
+
+    @pytest.mark.skipif(
+        connection.vendor != 'postgresql', reason='reltuples есть только в PG')
+    def test_unfiltered_count_uses_estimate(self, client, titles, settings):
+        settings.APPROXIMATE_COUNT_THRESHOLD = 1
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE reviews_title')
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = 'reviews_title'::regclass"
+            )
+            estimate = cursor.fetchone()[0]
+        Title.objects.create(name='После ANALYZE', year=2001)
+
+        data = client.get('/api/v1/titles/').json()
+
+        assert data['count'] == estimate == len(titles)
+
+    def test_small_table_gets_exact_count(self, client, titles):
+        assert client.get('/api/v1/titles/').json()['count'] == 12
@@ -0,0 +1,108 @@
+import pytest
+from api.serializers import WriteTitleSerializer
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='film')
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(3)
+    )
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.set(genres[:1])
+    return category, genres, title
+
+
+@pytest.mark.django_db
+class TestCatalog:
+
+    def test_lists_are_served_from_memory(self, client, catalog,
+                                          django_assert_num_queries):
+        with django_assert_num_queries(1):
+            first = client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            second = client.get('/api/v1/genres/?limit=2&offset=1')
+
+        assert [genre['slug'] for genre in first.json()['results']] == [
+            'genre-0', 'genre-1', 'genre-2']
+        assert second.json()['count'] == 3
+        assert second.json()['results'] == [
+            {'name': 'Жанр 1', 'slug': 'genre-1'},
+            {'name': 'Жанр 2', 'slug': 'genre-2'},
+        ]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_changes_reload_catalog(self, client, catalog):
+        client.get('/api/v1/categories/')
+        Category.objects.create(name='Книга', slug='book')
+        catalog[0].delete()
+
+        response = client.get('/api/v1/categories/')
+
+        assert response.json()['results'] == [
+            {'name': 'Книга', 'slug': 'book'}]
+
+    def test_search_uses_database(self, client, catalog):
+        response = client.get('/api/v1/genres/?search=2')
+
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'genre-2']
+
+    def test_title_filters(self, client, catalog):
+        def get_titles(query):
+            response = client.get(f'/api/v1/titles/?{query}')
+            return [title['id'] for title in response.json()['results']]
+
+        title_id = catalog[2].id
+        assert get_titles('category=film') == [title_id]
+        assert get_titles('genre=genre-0') == [title_id]
+        assert get_titles('genre=genre-1') == []
+        assert get_titles('category=unknown') == []
+        assert get_titles('genre=unknown') == []
+
+    def test_unknown_slug_is_answered_from_catalog(
+            self, client, catalog, django_assert_num_queries):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/categories/')
+
+        # Неизвестный slug не ищется в базе, а пустая выдача не считается.
+        with django_assert_num_queries(0):
+            genre_response = client.get('/api/v1/titles/?genre=random-slug')
+        with django_assert_num_queries(0):
+            category_response = client.get(
+                '/api/v1/titles/?category=random-slug')
+
+        assert genre_response.json()['results'] == []
+        assert category_response.json()['results'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_new_slug_is_found_after_reload(self, client, catalog):
+        client.get('/api/v1/genres/')
+        genre = Genre.objects.create(name='Новый', slug='new-genre')
+        Title.objects.get().genre.add(genre)
+
+        response = client.get('/api/v1/titles/?genre=new-genre')
+
+        assert [title['id'] for title in response.json()['results']] == [
+            catalog[2].id]
+
+    def test_genres_are_resolved_in_one_query(self, catalog,
+                                              django_assert_num_queries):
+        serializer = WriteTitleSerializer(data={
+            'name': 'Новое', 'year': 2001, 'category': 'film',
+            'genre': ['genre-2', 'genre-0', 'genre-1'],
+        })
+
+        with django_assert_num_queries(2):
+            assert serializer.is_valid(), serializer.errors
+        assert [genre.slug for genre in serializer.validated_data['genre']] == [
+            'genre-2', 'genre-0', 'genre-1']
+
+        serializer = WriteTitleSerializer(data={
+            'name': 'Новое', 'year': 2001, 'category': 'film',
+            'genre': ['genre-0', 'missing'],
+        })
+        assert not serializer.is_valid()
+        assert serializer.errors['genre'] == [
+            'Объект с slug=missing не существует.']
@@ -0,0 +1,229 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+
+@pytest.fixture
+def review():
+    category = Category.objects.create(name='Фильм', slug='film')
+    title = Title.objects.create(name='Чапаев', year=1934, category=category)
+    title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+    author = User.objects.create(username='critic', email='critic@yamdb.fake')
+    return Review.objects.create(
+        title=title, author=author, text='Отлично', score=9)
+
+
+@pytest.fixture
+def reader():
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create(username='reader', email='reader@yamdb.fake'))
+    return client
+
+
+def backdate(queryset, seconds):
+    queryset.update(modified=timezone.now() - timedelta(seconds=seconds))
+
+
+def reviews_url(review):
+    return f'/api/v1/titles/{review.title_id}/reviews/'
+
+
+def comments_url(review):
+    return f'{reviews_url(review)}{review.id}/comments/'
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_unchanged_reviews_get_not_modified(
+            self, reader, review, django_assert_num_queries):
+        response = reader.get(reviews_url(review))
+        assert response.status_code == 200
+        assert response.has_header('Last-Modified')
+
+        # title with review count and dates, no page or count queries
+        with django_assert_num_queries(1):
+            second = reader.get(
+                reviews_url(review), HTTP_IF_NONE_MATCH=response['ETag'])
+
+        assert second.status_code == 304
+        assert second['ETag'] == response['ETag']
+
+    def test_if_modified_since(self, reader, review):
+        response = reader.get(reviews_url(review))
+
+        second = reader.get(
+            reviews_url(review),
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        assert second.status_code == 304
+
+    def test_empty_list_is_dated_by_parent(self, reader, review):
+        response = reader.get(comments_url(review))
+
+        assert response.has_header('ETag')
+        assert response['Last-Modified'] == http_date(
+            review.modified.timestamp())
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deleting_newest_review_is_modified(self, reader, review):
+        newest = Review.objects.create(
+            title_id=review.title_id,
+            author=User.objects.create(username='late', email='l@yamdb.fake'),
+            text='Позже',
+            score=1
+        )
+        backdate(Title.objects.filter(pk=review.title_id), 20)
+        backdate(Review.objects.filter(pk=review.pk), 20)
+        backdate(Review.objects.filter(pk=newest.pk), 10)
+        last_modified = reader.get(reviews_url(review))['Last-Modified']
+
+        Review.objects.get(pk=newest.pk).delete()
+        response = reader.get(
+            reviews_url(review), HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_deleting_newest_comment_is_modified(self, reader, review):
+        older = Comments.objects.create(
+            review=review, author=review.author, text='1')
+        newest = Comments.objects.create(
+            review=review, author=review.author, text='2')
+        backdate(Review.objects.filter(pk=review.pk), 20)
+        backdate(Comments.objects.filter(pk=older.pk), 20)
+        backdate(Comments.objects.filter(pk=newest.pk), 10)
+        last_modified = reader.get(comments_url(review))['Last-Modified']
+
+        Comments.objects.get(pk=newest.pk).delete()
+        response = reader.get(
+            comments_url(review), HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_cascade_delete_does_not_touch_deleted_parents(self, review):
+        Comments.objects.bulk_create(
+            Comments(review=review, author=review.author, text=str(i))
+            for i in range(5)
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            Title.objects.get(pk=review.title_id).delete()
+
+        assert not [query for query in context.captured_queries
+                    if query['sql'].startswith('UPDATE')]
+
+    def test_deleting_user_touches_their_commented_reviews(self, review):
+        commenter = User.objects.create(
+            username='commenter', email='commenter@yamdb.fake')
+        Comments.objects.bulk_create(
+            Comments(review=review, author=commenter, text=str(i))
+            for i in range(3)
+        )
+        backdate(Review.objects.filter(pk=review.pk), 20)
+        modified = Review.objects.get(pk=review.pk).modified
+
+        with CaptureQueriesContext(connection) as context:
+            commenter.delete()
+
+        assert Review.objects.get(pk=review.pk).modified > modified
+        assert len([query for query in context.captured_queries
+                    if query['sql'].startswith('UPDATE')]) == 1
+
+    def test_failed_delete_does_not_skip_later_touches(self, review):
+        comment = Comments.objects.create(
+            review=review, author=review.author, text='1')
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                pre_delete.send(
+                    sender=Review, instance=review, using=connection.alias)
+                raise RuntimeError
+        backdate(Review.objects.filter(pk=review.pk), 20)
+        modified = Review.objects.get(pk=review.pk).modified
+
+        comment.delete()
+
+        assert Review.objects.get(pk=review.pk).modified > modified
+
+    def test_etag_depends_on_query_string(self, reader, review):
+        first = reader.get(reviews_url(review))
+        second = reader.get(f'{reviews_url(review)}?limit=1')
+
+        assert first['ETag'] != second['ETag']
+
+    def test_review_edit_changes_etag(self, reader, review):
+        etag = reader.get(reviews_url(review))['ETag']
+        review.text = 'Хорошо'
+        review.save()
+
+        response = reader.get(reviews_url(review), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json()['results'][0]['text'] == 'Хорошо'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_new_comment_changes_etag(self, reader, review):
+        etag = reader.get(comments_url(review))['ETag']
+        Comments.objects.create(review=review, author=review.author, text='+')
+
+        response = reader.get(comments_url(review), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+
+    def test_author_rename_changes_etag(self, reader, review):
+        etag = reader.get(reviews_url(review))['ETag']
+        author = User.objects.get(pk=review.author_id)
+        author.username = 'critic2'
+        author.save()
+
+        response = reader.get(reviews_url(review), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+
+    def test_title_detail_follows_rating_and_category(self, reader, review):
+        url = f'/api/v1/titles/{review.title_id}/'
+        etag = reader.get(url)['ETag']
+        assert reader.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        review.score = 3
+        review.save()
+        response = reader.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['rating'] == 3
+
+        etag = response['ETag']
+        category = Category.objects.get(slug='film')
+        category.name = 'Кино'
+        category.save()
+        assert reader.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_genre_link_changes_title_etag(self, reader, review):
+        url = f'/api/v1/titles/{review.title_id}/'
+        etag = reader.get(url)['ETag']
+
+        Title.objects.get(pk=review.title_id).genre.add(
+            Genre.objects.create(name='Война', slug='war'))
+
+        assert reader.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_cached_anonymous_response_answers_not_modified(
+            self, client, review, django_assert_num_queries):
+        etag = client.get(reviews_url(review))['ETag']
+
+        with django_assert_num_queries(0):
+            response = client.get(
+                reviews_url(review), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
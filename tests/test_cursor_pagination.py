@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from reviews.models import Review, Title, User
+
+REVIEWS_COUNT = 12
+
+
+@pytest.fixture
+def title():
+    title = Title.objects.create(name='Произведение', year=2000)
+    now = timezone.now()
+    for i in range(REVIEWS_COUNT):
+        author = User.objects.create(
+            username=f'user{i}', email=f'user{i}@yamdb.fake')
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {i}', score=5)
+        # пары отзывов с одинаковой датой проверяют порядок по id
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=now - timedelta(minutes=i // 2))
+    return title
+
+
+def collect(client, url):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/?pagination=cursor&limit=5'
+
+    def test_walks_all_reviews_in_order(self, client, title):
+        pages = collect(client, self.url(title))
+
+        ids = [review['id'] for page in pages for review in page['results']]
+        expected = list(
+            Review.objects.order_by('-pub_date', 'id')
+            .values_list('id', flat=True)
+        )
+        assert ids == expected
+        assert len(pages) == 3
+        assert 'count' not in pages[0]
+        assert pages[0]['previous'] is None
+
+    def test_previous_link_returns_same_page(self, client, title):
+        first = client.get(self.url(title)).json()
+        second = client.get(first['next']).json()
+
+        back = client.get(second['previous']).json()
+
+        assert back['results'] == first['results']
+        assert back['previous'] is None
+
+    def test_pages_are_stable_during_inserts(self, client, title):
+        first = client.get(self.url(title)).json()
+        author = User.objects.create(username='late', email='late@yamdb.fake')
+        Review.objects.create(title=title, author=author, text='Новый', score=1)
+
+        second = client.get(first['next']).json()
+
+        first_ids = {review['id'] for review in first['results']}
+        assert not first_ids & {review['id'] for review in second['results']}
+        assert len(second['results']) == 5
+
+    def test_page_query_has_no_offset_or_count(self, client, title):
+        url = client.get(self.url(title)).json()['next']
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+
+        page_query = next(
+            query['sql'] for query in context.captured_queries
+            if 'LIMIT 6' in query['sql']
+        )
+        assert 'OFFSET' not in page_query
+        assert not any(
+            'COUNT(*)' in query['sql'] for query in context.captured_queries)
+
+    def test_offset_is_default(self, client, title):
+        data = client.get(f'/api/v1/titles/{title.id}/reviews/').json()
+
+        assert data['count'] == REVIEWS_COUNT
+
+    def test_titles_are_ordered_by_name(self, client):
+        for name in ('Б', 'А', 'В', 'А'):
+            Title.objects.create(name=name, year=2000)
+
+        pages = collect(client, '/api/v1/titles/?pagination=cursor&limit=3')
+
+        names = [title['name'] for page in pages for title in page['results']]
+        assert names == ['А', 'А', 'Б', 'В']
+
+    def test_broken_cursor_is_not_found(self, client, title):
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken')
+
+        assert response.status_code == 404
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+from core.db.backends.postgresql_pool.base import (POOL_CONNECTIONS,
+                                                   DatabaseWrapper,
+                                                   close_pools)
+from django.core.signals import request_finished, request_started
+from django.db import OperationalError, connection
+
+
+@pytest.fixture
+def pooled():
+    wrappers = []
+
+    def make(size=1):
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'core.db.backends.postgresql_pool',
+            'CONN_HEALTH_CHECKS': True,
+            'POOL': {'MIN_SIZE': size, 'MAX_SIZE': size, 'TIMEOUT': 0.1},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='default')
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make
+    for wrapper in wrappers:
+        wrapper.close()
+    close_pools()
+
+
+def get_used():
+    return POOL_CONNECTIONS.labels('default', 'used')._value.get()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPersistentConnections:
+
+    def test_broken_connection_is_closed_on_request_start(self):
+        connection.ensure_connection()
+        connection.last_used_at = time.monotonic() - 3600
+        connection.connection.close()
+
+        request_started.send(sender=None)
+
+        assert connection.connection is None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_usable_connection_is_kept(self):
+        connection.ensure_connection()
+        connection.last_used_at = None
+        raw = connection.connection
+
+        request_started.send(sender=None)
+
+        assert connection.connection is raw
+
+    def test_recently_used_connection_is_not_checked(self, monkeypatch):
+        connection.ensure_connection()
+        request_finished.send(sender=None)
+        monkeypatch.setattr(connection, 'is_usable', lambda: pytest.fail(
+            'соединение проверено сразу после запроса'))
+
+        request_started.send(sender=None)
+
+        assert connection.connection is not None
+
+
+@pytest.mark.django_db
+class TestConnectionPool:
+
+    def test_closed_connection_returns_to_pool(self, pooled):
+        first = pooled()
+        first.ensure_connection()
+        raw = first.connection
+        assert get_used() == 1
+
+        first.close()
+        assert get_used() == 0
+        second = pooled()
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        assert second.connection is raw
+        assert not raw.closed
+
+    def test_pool_ignores_conn_max_age(self, pooled):
+        assert connection.settings_dict['CONN_MAX_AGE'] != 0
+        assert pooled().settings_dict['CONN_MAX_AGE'] == 0
+
+    def test_waits_for_free_connection(self, pooled):
+        pooled().ensure_connection()
+
+        with pytest.raises(OperationalError):
+            pooled().ensure_connection()
+
+    def test_broken_connection_is_replaced(self, pooled):
+        first = pooled()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        raw.close()
+
+        second = pooled()
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        assert second.connection is not raw
+
+    def test_all_dead_idle_connections_are_replaced(self, pooled):
+        wrappers = [pooled(size=2), pooled(size=2)]
+        for wrapper in wrappers:
+            wrapper.ensure_connection()
+        dead = [wrapper.connection for wrapper in wrappers]
+        for wrapper in wrappers:
+            wrapper.close()
+        with connection.cursor() as cursor:
+            for raw in dead:
+                cursor.execute(
+                    'SELECT pg_terminate_backend(%s)', [raw.get_backend_pid()])
+
+        third = pooled(size=2)
+        with third.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        assert third.connection not in dead
+        assert all(raw.closed for raw in dead)
@@ -0,0 +1,151 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from api.serializers import (CommentsSerializer, ReadTitleSerializer,
+                             ReviewsSerializer)
+from core.renderers import FastJSONRenderer
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitlesGenres, User)
+
+
+@pytest.fixture
+def catalog():
+    category = Category.objects.create(name='Фильм', slug='film')
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(3)
+    )
+    titles = Title.objects.bulk_create([
+        Title(name='Первое "кино"', year=2000, category=category,
+              description='Строка\u2028с разделителем'),
+        Title(name='Второе', year=2001),
+    ])
+    TitlesGenres.objects.bulk_create(
+        TitlesGenres(title=titles[0], genre=genre)
+        for genre in reversed(genres)
+    )
+    author = User.objects.create(username='автор', email='a@yamdb.fake')
+    review = Review.objects.create(
+        title=titles[0], author=author, text='Отзыв 😀', score=7)
+    Comments.objects.create(review=review, author=author, text='Ок')
+    Title.objects.recalculate_rating()
+    return titles[0], review
+
+
+def render(serializer_class, queryset):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+class TestFastJSONRenderer:
+
+    def test_output_matches_json_renderer(self):
+        data = {
+            'text': 'кавычки " \\ и \u2028 \u2029 \x00\x1f😀',
+            'date': datetime.datetime(
+                2022, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'day': datetime.date(2022, 1, 2),
+            'decimal': Decimal('1.50'),
+            'lazy': gettext_lazy('Жанр'),
+            'error': ErrorDetail('Ошибка', code='invalid'),
+            'values': (1, 2.5, None, True),
+            'nested': [{'a': []}],
+        }
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_falls_back_to_json_renderer(self):
+        data = {1: 'ключ не строка', 'big': 2 ** 70}
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+        assert FastJSONRenderer().render(
+            {'a': 1}, 'application/json; indent=4'
+        ) == JSONRenderer().render({'a': 1}, 'application/json; indent=4')
+        assert FastJSONRenderer().render(None) == b''
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+
+    def test_lists_match_model_serializers(self, client, catalog):
+        title, review = catalog
+        titles = ReadTitleSerializer.setup_eager_loading(
+            Title.objects.order_by('name'))
+        reviews = Review.objects.filter(title=title)
+        comments = Comments.objects.filter(review=review)
+        cases = [
+            ('/api/v1/titles/?ordering=name', ReadTitleSerializer, titles),
+            (f'/api/v1/titles/{title.id}/reviews/', ReviewsSerializer,
+             reviews),
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+             CommentsSerializer, comments),
+        ]
+
+        for url, serializer_class, queryset in cases:
+            content = client.get(url).content
+            assert content.endswith(
+                b'"results":' + render(serializer_class, queryset) + b'}'
+            ), url
+
+    def test_genres_are_ordered_by_id(self, client, catalog):
+        response = client.get('/api/v1/titles/?genre=genre-0')
+
+        assert [genre['slug'] for genre in
+                response.json()['results'][0]['genre']] == [
+            'genre-0', 'genre-1', 'genre-2']
+
+    def test_cursor_pages_from_values(self, client, catalog):
+        first = client.get('/api/v1/titles/?pagination=cursor&limit=1')
+        second = client.get(first.json()['next'])
+
+        assert [first.json()['results'][0]['name'],
+                second.json()['results'][0]['name']] == [
+            'Второе', 'Первое "кино"']
+
+    def test_benchmark_command(self, catalog):
+        out = StringIO()
+
+        call_command('benchserializers', sizes='1,2', repeat=1, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 7
+        assert lines[1].split()[:2] == ['titles', '1']
+        assert lines[-1].split()[:2] == ['comments', '2']
+
+
+@pytest.mark.django_db
+class TestAuthorEagerLoading:
+
+    def test_detail_joins_author_columns(self, catalog):
+        title, review = catalog
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/'
+
+        with CaptureQueriesContext(connection) as context:
+            response = APIClient().get(url)
+
+        assert response.json()['author'] == 'автор'
+        sql = context.captured_queries[-1]['sql']
+        assert len(context.captured_queries) == 2
+        assert '"reviews_user"."username"' in sql
+        assert '"reviews_user"."email"' not in sql
+        assert 'search_vector' not in sql
+
+    def test_update_keeps_modified_and_rating(self, catalog):
+        title, review = catalog
+        client = APIClient()
+        client.force_authenticate(review.author)
+
+        response = client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/', {'score': 3})
+
+        assert response.json()['author'] == 'автор'
+        updated = Review.objects.get(pk=review.pk)
+        assert updated.modified > review.modified
+        assert Title.objects.get(pk=title.pk).rating == 3
@@ -0,0 +1,119 @@
+import pytest
+from api.search import FullTextSearchFilter, InvertedIndex
+from django.db import connection
+from reviews.models import Comments, Review, Title, User
+
+postgresql_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='tsvector есть только в PG')
+
+
+@pytest.fixture
+def titles():
+    return [
+        Title.objects.create(name='Война и мир', year=1869,
+                             description='Роман-эпопея'),
+        Title.objects.create(name='Star Wars', year=1977,
+                             description='Space opera'),
+        Title.objects.create(name='Тихий Дон', year=1928,
+                             description='Роман о войне и революции'),
+    ]
+
+
+@pytest.fixture
+def review(titles):
+    author = User.objects.create(username='critic', email='critic@yamdb.fake')
+    return Review.objects.create(
+        title=titles[0], author=author, text='Лучшие батальные сцены',
+        score=10)
+
+
+def names(response):
+    return [title['name'] for title in response.json()['results']]
+
+
+class TestInvertedIndex:
+
+    def test_all_terms_must_match_by_prefix(self):
+        index = InvertedIndex(
+            [
+                {'pk': 1, 'text': 'Война и мир'},
+                {'pk': 2, 'text': 'Мир без войны'},
+                {'pk': 3, 'text': 'Мирный атом'},
+            ],
+            ('text',)
+        )
+
+        assert set(index.search('войн мир')) == {1, 2}
+        assert set(index.search('мир')) == {1, 2, 3}
+        assert index.search('космос') == {}
+
+    def test_first_field_weighs_more(self):
+        index = InvertedIndex(
+            [
+                {'pk': 1, 'name': 'Дон', 'description': 'роман'},
+                {'pk': 2, 'name': 'Роман', 'description': 'о войне'},
+            ],
+            ('name', 'description')
+        )
+
+        ranks = index.search('роман')
+
+        assert ranks[2] > ranks[1]
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+
+    @postgresql_only
+    def test_russian_forms_are_matched(self, client, titles):
+        response = client.get('/api/v1/titles/?search=войне')
+
+        assert names(response) == ['Война и мир', 'Тихий Дон']
+
+    @postgresql_only
+    def test_english_forms_are_matched(self, client, titles):
+        assert names(client.get('/api/v1/titles/?search=war')) == [
+            'Star Wars']
+
+    @postgresql_only
+    def test_vector_follows_updates(self, client, titles):
+        title = titles[1]
+        title.name = 'Звездные войны'
+        title.save()
+
+        assert names(client.get('/api/v1/titles/?search=звездный')) == [
+            'Звездные войны']
+
+    @postgresql_only
+    def test_rating_update_keeps_vector(self, titles, review):
+        vectors = Title.objects.filter(pk=titles[0].pk).values_list(
+            'search_vector', flat=True)
+        vector = vectors.get()
+
+        Title.objects.change_rating(titles[0].pk, 1, 1)
+
+        assert vector and vectors.get() == vector
+
+    def test_reviews_are_searched_by_text(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+
+        found = client.get(f'{url}?search=сцены').json()
+        missing = client.get(f'{url}?search=космос').json()
+
+        assert [item['id'] for item in found['results']] == [review.id]
+        assert missing['results'] == []
+
+    def test_comments_are_searched_by_text(self, client, review):
+        Comments.objects.create(
+            review=review, author=review.author, text='Согласен полностью')
+        url = (f'/api/v1/titles/{review.title_id}/reviews/{review.id}'
+               '/comments/?search=согласен')
+
+        assert len(client.get(url).json()['results']) == 1
+
+    def test_fallback_ranks_name_above_description(self, titles):
+        queryset = FullTextSearchFilter().filter_fallback(
+            Title.objects.all(), 'роман', ('name', 'description'))
+
+        assert set(queryset) == {titles[0], titles[2]}
+        assert all(title.search_rank > 0 for title in queryset)
@@ -0,0 +1,108 @@
+import csv
+import os
+import random
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from reviews.management.commands._tools import TABLES
+from reviews.management.commands.generatecsv import allocate
+from reviews.models import Comments, Review, Title, TitlesGenres, User
+
+SIZES = {
+    'users': 50,
+    'categories': 3,
+    'genres': 8,
+    'titles': 40,
+    'reviews': 400,
+    'comments': 900,
+}
+
+
+def generate(path, seed=1, **sizes):
+    options = {**SIZES, **sizes}
+    call_command(
+        'generatecsv', f'--path={path}', f'--seed={seed}',
+        *(f'--{name}={value}' for name, value in options.items())
+    )
+
+
+def read(path, name):
+    with open(os.path.join(path, name), encoding='utf-8', newline='') as file:
+        reader = csv.reader(file)
+        assert next(reader) == list(TABLES[name][1])
+        return list(reader)
+
+
+def contents(path):
+    return {name: read(path, name) for name in TABLES}
+
+
+class TestGenerateCSV:
+
+    def test_allocate_is_exact_and_skewed(self):
+        counts = list(allocate(10000, 1000, random.Random(0), 1.2))
+
+        assert sum(counts) == 10000
+        assert max(counts) > 10 * (10000 // 1000)
+
+    def test_same_seed_gives_same_files(self, tmp_path):
+        generate(tmp_path / 'first')
+        generate(tmp_path / 'second')
+        generate(tmp_path / 'other', seed=2)
+
+        assert contents(tmp_path / 'first') == contents(tmp_path / 'second')
+        assert contents(tmp_path / 'first') != contents(tmp_path / 'other')
+
+    def test_counts_and_constraints(self, tmp_path):
+        generate(tmp_path)
+
+        reviews = read(tmp_path, 'review.csv')
+        comments = read(tmp_path, 'comments.csv')
+        assert len(read(tmp_path, 'users.csv')) == SIZES['users']
+        assert len(read(tmp_path, 'titles.csv')) == SIZES['titles']
+        assert len(reviews) == SIZES['reviews']
+        assert len(comments) == SIZES['comments']
+        pairs = [(title, author) for pk, title, text, author, score, date
+                 in reviews]
+        assert len(set(pairs)) == len(pairs)
+        dates = {pk: date for pk, title, text, author, score, date in reviews}
+        assert all(date > dates[review]
+                   for pk, review, text, author, date in comments)
+        per_title = Counter(title for title, author in pairs)
+        assert per_title.most_common(1)[0][1] > 3 * (
+            SIZES['reviews'] // SIZES['titles'])
+
+    def test_capped_reviews_keep_comment_count(self, tmp_path):
+        # Не больше 10 отзывов на произведение: излишек популярных
+        # произведений не помещается в остальные, и отзывов меньше 400.
+        generate(tmp_path, users=10)
+
+        reviews = read(tmp_path, 'review.csv')
+        comments = read(tmp_path, 'comments.csv')
+        assert len(reviews) < SIZES['reviews']
+        assert len(comments) == SIZES['comments']
+        assert {review for pk, review, text, author, date in comments} <= {
+            pk for pk, *row in reviews}
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('options', (
+        [],
+        pytest.param(['--engine=copy'], marks=pytest.mark.skipif(
+            connection.vendor != 'postgresql',
+            reason='COPY есть только в PostgreSQL'
+        )),
+    ))
+    def test_import_generated(self, tmp_path, options):
+        generate(tmp_path)
+
+        call_command('importcsv', f'--path={tmp_path}', *options)
+
+        assert User.objects.count() == SIZES['users']
+        assert Title.objects.count() == SIZES['titles']
+        assert TitlesGenres.objects.count() == len(
+            read(tmp_path, 'genre_title.csv'))
+        assert Review.objects.count() == SIZES['reviews']
+        assert Comments.objects.count() == SIZES['comments']
+        call_command('rebuildrating', '--check')
@@ -0,0 +1,72 @@
+import csv
+import os
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from reviews.management.commands import importcsv
+from reviews.management.commands._tools import TABLES, get_dependencies
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitlesGenres, User)
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'api', 'static', 'data')
+
+
+@pytest.fixture
+def data_files(monkeypatch):
+    monkeypatch.setattr(importcsv, 'FILES', [
+        os.path.join(DATA_DIR, os.path.basename(file))
+        for file in importcsv.FILES
+    ])
+
+
+def rows_in(name):
+    with open(os.path.join(DATA_DIR, name), encoding='utf-8') as file:
+        return sum(1 for _ in csv.reader(file)) - 1
+
+
+def assert_imported():
+    assert Title.objects.count() == rows_in('titles.csv')
+    assert TitlesGenres.objects.count() == rows_in('genre_title.csv')
+    assert User.objects.count() == rows_in('users.csv')
+    assert Review.objects.count() == rows_in('review.csv')
+    assert Comments.objects.count() == rows_in('comments.csv')
+    call_command('rebuildrating', '--check')
+
+
+class TestImportCSV:
+
+    def test_dependencies(self):
+        dependencies = get_dependencies(
+            model for model, columns in TABLES.values())
+
+        assert dependencies[Category] == set()
+        assert dependencies[Genre] == set()
+        assert dependencies[User] == set()
+        assert dependencies[Title] == {Category}
+        assert dependencies[TitlesGenres] == {Title, Genre}
+        assert dependencies[Review] == {Title, User}
+        assert dependencies[Comments] == {Review, User}
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('options', (
+        [],
+        ['--check-fk', '--batch-size=7'],
+        pytest.param(['--engine=copy'], marks=pytest.mark.skipif(
+            connection.vendor != 'postgresql',
+            reason='COPY есть только в PostgreSQL'
+        )),
+    ))
+    def test_import(self, data_files, options):
+        call_command('importcsv', *options)
+
+        assert_imported()
+        assert Title.objects.create(name='Новое', year=2000).id > max(
+            Title.objects.exclude(name='Новое').values_list('id', flat=True))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_parallel_import(self, data_files):
+        call_command('importcsv', '--jobs=4', '--check-fk')
+
+        assert_imported()
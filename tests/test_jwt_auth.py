@@ -0,0 +1,164 @@
+import pytest
+from api import authentication
+from api.authentication import ClaimsAccessToken, check_revocation_cache
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from reviews.models import Review, Title, User
+
+
+@pytest.fixture
+def admin():
+    return User.objects.create(
+        username='boss', email='boss@yamdb.fake', role=User.ADMIN)
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db
+class TestStatelessJWT:
+
+    def test_get_token_puts_claims(self, client, admin):
+        admin.confirmation_code = '1234'
+        admin.save()
+        response = client.post(
+            '/api/v1/auth/token/',
+            {'username': 'boss', 'confirmation_code': '1234'}
+        )
+
+        assert response.status_code == 200
+        token = ClaimsAccessToken(response.json()['token'])
+        assert token['username'] == 'boss'
+        assert token['role'] == User.ADMIN
+        assert token['is_staff'] is False
+
+    def test_token_right_after_signup_is_valid(self, client):
+        client.post('/api/v1/auth/signup/',
+                    {'username': 'newbie', 'email': 'newbie@yamdb.fake'})
+        code = User.objects.get(username='newbie').confirmation_code
+        token = client.post(
+            '/api/v1/auth/token/',
+            {'username': 'newbie', 'confirmation_code': code}
+        ).json()['token']
+
+        assert client_for(token).get('/api/v1/users/me/').status_code == 200
+
+    def test_admin_endpoint_without_user_query(
+            self, admin, django_assert_num_queries):
+        client = client_for(ClaimsAccessToken.for_user(admin))
+        # count and page of users, no query for the requesting user
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/users/')
+
+        assert response.status_code == 200
+
+    def test_claims_are_checked_by_permissions(self):
+        user = User.objects.create(username='plain', email='plain@yamdb.fake')
+        client = client_for(ClaimsAccessToken.for_user(user))
+
+        assert client.get('/api/v1/users/').status_code == 403
+
+    def test_author_can_edit_own_review(self):
+        author = User.objects.create(username='au', email='au@yamdb.fake')
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5)
+        client = client_for(ClaimsAccessToken.for_user(author))
+
+        response = client.patch(
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            {'text': 'Новый текст'}
+        )
+
+        assert response.status_code == 200
+        assert response.json()['author'] == 'au'
+
+    def test_me_reads_full_profile(self, admin):
+        client = client_for(ClaimsAccessToken.for_user(admin))
+
+        response = client.get('/api/v1/users/me/')
+
+        assert response.status_code == 200
+        assert response.json()['email'] == 'boss@yamdb.fake'
+
+    def test_token_without_claims_falls_back_to_database(self, admin):
+        client = client_for(RefreshToken.for_user(admin).access_token)
+
+        assert client.get('/api/v1/users/').status_code == 200
+
+    def test_role_change_revokes_tokens(self, admin):
+        client = client_for(ClaimsAccessToken.for_user(admin))
+        admin = User.objects.get(pk=admin.pk)
+        admin.bio = 'Не влияет на токен'
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 200
+
+        admin.role = User.USER
+        admin.save()
+
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_revocation_survives_default_cache_eviction(self, admin):
+        client = client_for(ClaimsAccessToken.for_user(admin))
+        admin = User.objects.get(pk=admin.pk)
+        admin.role = User.USER
+        admin.save()
+
+        for index in range(400):
+            cache.set(f'filler-{index}', index)
+
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_process_local_revocation_cache_is_refused(self, settings):
+        check_revocation_cache()
+
+        settings.CACHES = {**settings.CACHES, 'jwt_revocation': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with pytest.raises(ImproperlyConfigured):
+            check_revocation_cache()
+
+    def test_token_issued_right_after_revocation_is_valid(self, admin):
+        old = client_for(ClaimsAccessToken.for_user(admin))
+        admin = User.objects.get(pk=admin.pk)
+        admin.role = User.MODERATOR
+        admin.save()
+        new = client_for(ClaimsAccessToken.for_user(admin))
+
+        assert old.get('/api/v1/users/me/').status_code == 401
+        assert new.get('/api/v1/users/me/').status_code == 200
+
+    def test_token_without_issued_at_compares_whole_seconds(
+            self, admin, monkeypatch):
+        token = RefreshToken.for_user(admin).access_token
+        client = client_for(token)
+
+        monkeypatch.setattr(
+            authentication.time, 'time', lambda: token['iat'] + 0.5)
+        authentication.revoke_tokens(admin.pk)
+        assert client.get('/api/v1/users/').status_code == 200
+
+        monkeypatch.setattr(
+            authentication.time, 'time', lambda: token['iat'] + 1.5)
+        authentication.revoke_tokens(admin.pk)
+        assert client.get('/api/v1/users/').status_code == 401
+
+    def test_review_created_with_claims_user(self, admin):
+        title = Title.objects.create(name='Произведение', year=2000)
+        client = client_for(ClaimsAccessToken.for_user(admin))
+
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': 9}
+        )
+
+        assert response.status_code == 201, response.json()
+        assert response.json()['author'] == 'boss'
+        assert Review.objects.get().author == admin
+        admin.refresh_from_db()
+        assert admin.email == 'boss@yamdb.fake'
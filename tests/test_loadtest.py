@@ -0,0 +1,58 @@
+import pytest
+from django.core.mail import get_connection, send_mail
+from loadtest.smtp import SMTPSink
+from loadtest.stats import Stats, compare, percentile
+
+
+@pytest.fixture
+def sink():
+    sink = SMTPSink().start()
+    yield sink
+    sink.shutdown()
+    sink.server_close()
+
+
+class TestLoadTest:
+
+    def test_sink_receives_confirmation_code(self, sink):
+        connection = get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host='127.0.0.1', port=sink.port, use_tls=False,
+            username='loadtest', password='secret'
+        )
+
+        send_mail('Confirmation code', 'Your confirmation code: 4321',
+                  'yamdb@yamdb.fake', ['newbie@yamdb.fake'],
+                  connection=connection)
+
+        assert sink.wait_for_code('newbie@yamdb.fake', 1) == '4321'
+        assert sink.wait_for_code('newbie@yamdb.fake', 0.1) is None
+
+    def test_percentiles(self):
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+        assert percentile([7], 99) == 7
+        assert percentile([], 50) is None
+
+    def test_summary_and_baseline_comparison(self):
+        stats = Stats()
+        for elapsed in range(1, 101):
+            stats.record('GET /titles/', elapsed)
+        stats.record('POST /auth/signup/', 10, ok=False)
+
+        summary = stats.summary(duration=10)
+
+        assert summary['GET /titles/']['rps'] == 10
+        assert summary['GET /titles/']['p95'] == 95
+        assert summary['POST /auth/signup/']['errors'] == 1
+        baseline = {
+            'GET /titles/': {'requests': 100, 'errors': 0, 'p95': 90},
+            'POST /auth/signup/': {'requests': 10, 'errors': 0, 'p95': 10},
+        }
+        assert compare(summary, baseline, tolerance=0.1) == [
+            'POST /auth/signup/: ошибок 100.0%, эталон 0.0%'
+        ]
+        assert len(compare(summary, baseline, tolerance=0)) == 2
@@ -0,0 +1,66 @@
+import pytest
+from core.models import OutgoingMail
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from reviews.models import User
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+@pytest.fixture
+def locmem_mail(settings):
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@pytest.mark.django_db
+class TestMailOutbox:
+
+    def test_signup_queues_mail(self, client, locmem_mail):
+        response = client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        )
+
+        assert response.status_code == 200
+        assert mail.outbox == []
+        queued = OutgoingMail.objects.get()
+        assert queued.recipient == 'newbie@yamdb.fake'
+        assert queued.sent is None
+        code = User.objects.get(username='newbie').confirmation_code
+        assert code in queued.message
+
+    def test_worker_sends_queued_mail(self, client, locmem_mail):
+        for name in ('first', 'second'):
+            client.post(
+                '/api/v1/auth/signup/',
+                {'username': name, 'email': f'{name}@yamdb.fake'}
+            )
+
+        call_command('sendmail', '--once')
+
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            'first@yamdb.fake', 'second@yamdb.fake']
+        assert not OutgoingMail.objects.filter(sent__isnull=True).exists()
+
+        call_command('sendmail', '--once')
+        assert len(mail.outbox) == 2
+
+    def test_failed_mail_is_retried_later(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_mail_outbox.FailingBackend'
+        client.post(
+            '/api/v1/auth/signup/',
+            {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+        )
+
+        call_command('sendmail', '--once')
+
+        queued = OutgoingMail.objects.get()
+        assert queued.sent is None
+        assert queued.attempts == 1
+        assert 'SMTP недоступен' in queued.error
+        assert queued.send_after > queued.created
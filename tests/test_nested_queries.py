@@ -0,0 +1,72 @@
+import pytest
+from rest_framework.test import APIClient
+from reviews.models import Comments, Review, Title, User
+
+
+@pytest.fixture
+def author():
+    return User.objects.create(username='author', email='author@yamdb.fake')
+
+
+@pytest.fixture
+def review(author):
+    title = Title.objects.create(name='Произведение', year=2000)
+    return Review.objects.create(
+        title=title, author=author, text='Отзыв', score=7)
+
+
+@pytest.fixture
+def reader():
+    return User.objects.create(username='reader', email='reader@yamdb.fake')
+
+
+@pytest.fixture
+def commenter_client(reader):
+    client = APIClient()
+    client.force_authenticate(reader)
+    return client
+
+
+@pytest.mark.django_db
+class TestNestedParents:
+
+    def test_comment_post_resolves_parents_once(
+            self, commenter_client, reader, review,
+            django_assert_num_queries):
+        Review.objects.create(
+            title_id=review.title_id, author=reader, text='Свой', score=5)
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        # review lookup checked against title_id, commenter's own review
+        # check, then insert
+        with django_assert_num_queries(3):
+            response = commenter_client.post(url, {'text': 'Комментарий'})
+
+        assert response.status_code == 201, response.json()
+        assert Comments.objects.filter(review=review).count() == 1
+
+    def test_comment_requires_own_review(self, commenter_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        response = commenter_client.post(url, {'text': 'Комментарий'})
+
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': ['Отзыв не найден']}
+        assert not Comments.objects.exists()
+
+    def test_review_of_other_title_is_not_found(
+            self, commenter_client, review):
+        other = Title.objects.create(name='Другое', year=2001)
+        url = f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+
+        assert commenter_client.get(url).status_code == 404
+        assert commenter_client.post(
+            url, {'text': 'Комментарий'}).status_code == 404
+
+    def test_second_review_is_rejected(self, review):
+        client = APIClient()
+        client.force_authenticate(review.author)
+        response = client.post(
+            f'/api/v1/titles/{review.title_id}/reviews/',
+            {'text': 'Еще отзыв', 'score': 5}
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,286 @@
+import json
+import os
+import time
+
+import pytest
+from api.authentication import ClaimsAccessToken
+from api.urls import router_v1
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitlesGenres, User)
+
+TITLES = 3000
+CATEGORIES = 30
+GENRES = 60
+GENRES_PER_TITLE = 3
+USERS = 300
+REVIEWED_TITLES = 100
+REVIEWS_PER_TITLE = 30
+COMMENTED_REVIEWS = 100
+COMMENTS_PER_REVIEW = 30
+# Страница больше PAGE_SIZE, чтобы N+1 давал заметный перерасход запросов.
+LIMIT = 20
+REPEATS = 3
+
+# Наибольшее число SQL запросов на запрос администратора для каждого
+# маршрута router_v1 и метода. Числа не должны зависеть от LIMIT. Маршрут
+# без бюджета считается ошибкой: новый эндпоинт должен получить свой бюджет.
+# Сигналы удаления не обновляют родителя построчно, поэтому бюджеты DELETE
+# не зависят от количества отзывов и комментариев; в titles-detail кроме
+# этого Django удаляет 900 комментариев пачками по 100 id.
+QUERY_BUDGETS = {
+    ('users-list', 'get'): 2,
+    ('users-list', 'post'): 3,
+    ('users-detail', 'get'): 1,
+    ('users-detail', 'put'): 4,
+    ('users-detail', 'patch'): 2,
+    ('users-detail', 'delete'): 15,
+    ('users-get-and-edit-self-profile', 'get'): 1,
+    ('users-get-and-edit-self-profile', 'patch'): 2,
+    ('titles-list', 'get'): 3,
+    ('titles-list', 'post'): 8,
+    ('titles-detail', 'get'): 2,
+    ('titles-detail', 'put'): 15,
+    ('titles-detail', 'patch'): 4,
+    ('titles-detail', 'delete'): 16,
+    ('categories-list', 'get'): 1,
+    ('categories-list', 'post'): 2,
+    ('categories-detail', 'delete'): 5,
+    ('genres-list', 'get'): 1,
+    ('genres-list', 'post'): 2,
+    ('genres-detail', 'delete'): 6,
+    ('reviews-list', 'get'): 3,
+    ('reviews-list', 'post'): 6,
+    ('reviews-detail', 'get'): 2,
+    ('reviews-detail', 'put'): 6,
+    ('reviews-detail', 'patch'): 6,
+    ('reviews-detail', 'delete'): 6,
+    ('comments-list', 'get'): 3,
+    ('comments-list', 'post'): 3,
+    ('comments-detail', 'get'): 2,
+    ('comments-detail', 'put'): 3,
+    ('comments-detail', 'patch'): 3,
+    ('comments-detail', 'delete'): 4,
+}
+# Тела изменяющих запросов по маршруту и методу.
+PAYLOADS = {
+    ('users-list', 'post'): {
+        'username': 'newbie', 'email': 'newbie@yamdb.fake'},
+    ('users-detail', 'put'): {
+        'username': 'user0', 'email': 'user0@yamdb.fake',
+        'role': User.MODERATOR},
+    ('users-detail', 'patch'): {'bio': 'О себе'},
+    ('users-get-and-edit-self-profile', 'patch'): {'bio': 'О себе'},
+    ('titles-list', 'post'): {
+        'name': 'Новое произведение', 'year': 2000,
+        'category': 'category-1', 'genre': ['genre-1', 'genre-2']},
+    ('titles-detail', 'put'): {
+        'name': 'Новое название', 'year': 2001,
+        'category': 'category-2', 'genre': ['genre-3']},
+    ('titles-detail', 'patch'): {'name': 'Новое название'},
+    ('categories-list', 'post'): {'name': 'Новая', 'slug': 'new'},
+    ('genres-list', 'post'): {'name': 'Новый', 'slug': 'new'},
+    ('reviews-list', 'post'): {'text': 'Новый отзыв', 'score': 5},
+    ('reviews-detail', 'put'): {'text': 'Новый текст', 'score': 4},
+    ('reviews-detail', 'patch'): {'score': 4},
+    ('comments-list', 'post'): {'text': 'Новый комментарий'},
+    ('comments-detail', 'put'): {'text': 'Новый текст'},
+    ('comments-detail', 'patch'): {'text': 'Новый текст'},
+}
+# Ключи dataset, заменяющие параметры пути для отдельных запросов.
+PARAM_OVERRIDES = {
+    # У администратора уже есть отзыв на title_id, он нужен для комментария.
+    ('reviews-list', 'post'): {'title_id': 'free_title_id'},
+}
+STATUSES = {'post': 201, 'delete': 204}
+# Бюджет времени одного запроса в миллисекундах, лучший из REPEATS.
+# Проверяется только если задан: время на общих CI машинах нестабильно.
+TIME_BUDGET_MS = os.getenv('PERF_TIME_BUDGET_MS')
+# Путь JSON отчета; без него отчет не пишется.
+REPORT_PATH = os.getenv('PERF_REPORT_PATH')
+
+report = {}
+
+
+@pytest.fixture(scope='module')
+def dataset(django_db_setup, django_db_blocker):
+    """Заполняет базу на все тесты модуля и очищает ее после них."""
+
+    with django_db_blocker.unblock():
+        categories = Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(CATEGORIES)
+        )
+        genres = Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(GENRES)
+        )
+        titles = Title.objects.bulk_create(
+            Title(
+                name=f'Произведение {i}',
+                year=1900 + i % 120,
+                description=f'Описание произведения {i}',
+                category=categories[i % CATEGORIES]
+            )
+            for i in range(TITLES)
+        )
+        TitlesGenres.objects.bulk_create(
+            TitlesGenres(title=title, genre=genres[(i + shift) % GENRES])
+            for i, title in enumerate(titles)
+            for shift in range(GENRES_PER_TITLE)
+        )
+        users = User.objects.bulk_create(
+            User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+            for i in range(USERS)
+        )
+        admin = User.objects.create(
+            username='admin', email='admin@yamdb.fake', role=User.ADMIN)
+        reviews = Review.objects.bulk_create(
+            Review(
+                title=title,
+                author=users[(i + j) % USERS],
+                text=f'Отзыв {j}',
+                score=1 + (i + j) % 10
+            )
+            for i, title in enumerate(titles[:REVIEWED_TITLES])
+            for j in range(REVIEWS_PER_TITLE)
+        )
+        Review.objects.create(
+            title=titles[0], author=admin, text='Отзыв администратора',
+            score=8)
+        comments = Comments.objects.bulk_create(
+            Comments(
+                review=review,
+                author=users[(i + j) % USERS],
+                text=f'Комментарий {j}'
+            )
+            for i, review in enumerate(reviews[:COMMENTED_REVIEWS])
+            for j in range(COMMENTS_PER_REVIEW)
+        )
+        Title.objects.recalculate_rating()
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        yield {
+            'admin': admin,
+            'title_id': titles[0].id,
+            'free_title_id': titles[1].id,
+            'review_id': reviews[0].id,
+            # Значения lookup_field детальных маршрутов по basename.
+            'users': users[0].username,
+            'titles': titles[0].id,
+            'categories': categories[0].slug,
+            'genres': genres[0].slug,
+            'reviews': reviews[0].id,
+            'comments': comments[0].id,
+        }
+        call_command('flush', interactive=False, verbosity=0)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def write_report():
+    """Сохраняет измерения всех маршрутов в JSON файл REPORT_PATH."""
+
+    yield
+    if report and REPORT_PATH:
+        with open(REPORT_PATH, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    'vendor': connection.vendor,
+                    'limit': LIMIT,
+                    'time_budget_ms': TIME_BUDGET_MS and float(
+                        TIME_BUDGET_MS),
+                    'routes': report,
+                },
+                file,
+                ensure_ascii=False,
+                indent=2,
+                sort_keys=True
+            )
+
+
+def get_routes():
+    """Возвращает маршруты router_v1 с их методами.
+
+    Returns:
+        list: имя маршрута, метод, basename и параметры пути для каждого
+        метода каждого маршрута.
+    """
+
+    routes = []
+    for prefix, viewset, basename in router_v1.registry:
+        lookup = getattr(viewset, 'lookup_field', 'pk')
+        for route in router_v1.get_routes(viewset):
+            params = [
+                name for name in ('title_id', 'review_id') if name in prefix
+            ]
+            if '{lookup}' in route.url:
+                params.append(lookup)
+            name = route.name.format(basename=basename)
+            for method in router_v1.get_method_map(viewset, route.mapping):
+                routes.append(pytest.param(
+                    name, method, basename, tuple(params),
+                    id=f'{method.upper()} {name}'
+                ))
+    return routes
+
+
+@pytest.mark.django_db
+class TestPerformanceBudget:
+
+    @pytest.mark.parametrize('name, method, basename, params', get_routes())
+    def test_route_fits_budget(self, dataset, name, method, basename,
+                               params):
+        budget = QUERY_BUDGETS.get((name, method))
+        assert budget is not None, (
+            f'Нет бюджета запросов для {method.upper()} {name}')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION='Bearer '
+            f'{ClaimsAccessToken.for_user(dataset["admin"])}'
+        )
+        overrides = PARAM_OVERRIDES.get((name, method), {})
+        kwargs = {
+            param: dataset.get(overrides.get(param, param), dataset[basename])
+            for param in params
+        }
+        url = reverse(name, kwargs=kwargs)
+        if method == 'get' and name.endswith('-list'):
+            url = f'{url}?limit={LIMIT}'
+
+        # Изменяющий запрос выполняется один раз: изменения откатываются
+        # только в конце теста.
+        timings = []
+        for attempt in range(REPEATS if method == 'get' else 1):
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = getattr(client, method)(
+                    url, PAYLOADS.get((name, method)), format='json')
+                timings.append((time.perf_counter() - start) * 1000)
+            if attempt == 0:
+                queries = len(context.captured_queries)
+        report[f'{method.upper()} {name}'] = {
+            'url': url,
+            'status': response.status_code,
+            'queries': queries,
+            'query_budget': budget,
+            'ms': round(min(timings), 2),
+        }
+
+        assert response.status_code == STATUSES.get(method, 200), (
+            url, getattr(response, 'data', None))
+        assert queries <= budget, (
+            f'{method.upper()} {url}: {queries} запросов при бюджете '
+            f'{budget}\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries)
+        )
+        if TIME_BUDGET_MS:
+            assert min(timings) <= float(TIME_BUDGET_MS), (
+                f'{url}: {min(timings):.1f} мс при бюджете '
+                f'{TIME_BUDGET_MS} мс'
+            )
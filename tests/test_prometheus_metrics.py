@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from core.mail import MAX_ATTEMPTS
+from core.models import OutgoingMail
+from core.prometheus import render_metrics
+from django.conf import settings
+from prometheus_client import REGISTRY
+from reviews.models import Category, Title
+
+# Пишет метрики так же, как рабочий процесс gunicorn.
+WORKER_SCRIPT = textwrap.dedent('''
+    from prometheus_client import Counter
+
+    Counter('yamdb_http_requests_total', '', ('route', 'method', 'status'))\\
+        .labels('titles-list', 'GET', '200').inc(3)
+''')
+
+
+def get_sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    return Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(3)
+    )
+
+
+@pytest.mark.django_db
+class TestPrometheusMetrics:
+
+    def test_requests_are_counted_by_route(self, client, titles):
+        labels = {'route': 'titles-list', 'method': 'GET'}
+        requests = get_sample(
+            'yamdb_http_requests_total', status='200', **labels)
+        latency = get_sample(
+            'yamdb_http_request_duration_seconds_count', **labels)
+        queries = get_sample('yamdb_db_queries_total', route='titles-list')
+        misses = get_sample(
+            'yamdb_cache_requests_total', cache='response', result='miss')
+
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{titles[0].id}/')
+
+        assert get_sample(
+            'yamdb_http_requests_total', status='200', **labels
+        ) == requests + 1
+        assert get_sample(
+            'yamdb_http_request_duration_seconds_count', **labels
+        ) == latency + 1
+        assert get_sample(
+            'yamdb_db_queries_total', route='titles-list') == queries + 3
+        assert get_sample(
+            'yamdb_cache_requests_total', cache='response', result='miss'
+        ) >= misses + 1
+
+    def test_endpoint_renders_outbox(self, client):
+        OutgoingMail.objects.bulk_create([
+            OutgoingMail(subject='Код', message='1', recipient='a@yamdb.fake'),
+            OutgoingMail(subject='Код', message='2', recipient='b@yamdb.fake',
+                         attempts=MAX_ATTEMPTS),
+        ])
+
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert 'yamdb_mail_outbox{state="pending"} 1.0' in body
+        assert 'yamdb_mail_outbox{state="failed"} 1.0' in body
+        assert 'yamdb_worker_start_time_seconds{pid=' in body
+
+    def test_metrics_are_summed_across_processes(self, tmp_path,
+                                                 monkeypatch):
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', WORKER_SCRIPT],
+                           env=env, cwd=settings.BASE_DIR, check=True)
+        monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+
+        body = render_metrics().decode()
+
+        assert (
+            'yamdb_http_requests_total{method="GET",route="titles-list",'
+            'status="200"} 6.0'
+        ) in body
+        assert 'yamdb_mail_outbox{state="pending"} 0.0' in body
@@ -0,0 +1,134 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import (Category, Comments, Genre, Review, Title,
+                            TitlesGenres, User)
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='EXPLAIN проверяется в PG')
+
+TITLES = 2000
+CATEGORIES = GENRES = YEARS = 100
+USERS = 500
+POPULAR_TITLES = 40
+POPULAR_REVIEWS = 40
+COMMENTS_PER_REVIEW = 500
+# Таблицы, которые в фикстуре достаточно велики, чтобы полный просмотр
+# означал отсутствие подходящего индекса.
+LARGE_TABLES = {
+    'reviews_title', 'reviews_titlesgenres', 'reviews_review',
+    'reviews_comments',
+}
+
+
+@pytest.fixture
+def dataset():
+    categories = Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(CATEGORIES)
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(GENRES)
+    )
+    titles = Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}',
+            year=1900 + i % YEARS,
+            category=categories[i % CATEGORIES]
+        )
+        for i in range(TITLES)
+    )
+    TitlesGenres.objects.bulk_create(
+        TitlesGenres(title=title, genre=genres[(i + shift) % GENRES])
+        for i, title in enumerate(titles)
+        for shift in (0, 7)
+    )
+    users = User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(USERS)
+    )
+    reviews = Review.objects.bulk_create(
+        Review(title=title, author=user, text='Отзыв', score=5)
+        for title in titles[:POPULAR_TITLES]
+        for user in users
+    )
+    Comments.objects.bulk_create(
+        Comments(review=review, author=users[i], text='Комментарий')
+        for review in reviews[:POPULAR_REVIEWS]
+        for i in range(COMMENTS_PER_REVIEW)
+    )
+    Title.objects.recalculate_rating()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return titles[0], reviews[0]
+
+
+def seq_scans(plan):
+    """Возвращает большие таблицы, которые план читает целиком."""
+
+    found = set()
+    if (plan['Node Type'] == 'Seq Scan'
+            and plan['Relation Name'] in LARGE_TABLES):
+        found.add(plan['Relation Name'])
+    for child in plan.get('Plans', ()):
+        found |= seq_scans(child)
+    return found
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_endpoint_queries_use_indexes(self, dataset):
+        title, review = dataset
+        reviews = f'/api/v1/titles/{title.id}/reviews/'
+        comments = f'{reviews}{review.id}/comments/'
+        # Список произведений без фильтров не проверяется: он читает
+        # таблицу по порядку до LIMIT, а count для него оценивается.
+        urls = [
+            f'/api/v1/titles/{title.id}/',
+            '/api/v1/titles/?year=1950',
+            '/api/v1/titles/?category=category-3',
+            '/api/v1/titles/?genre=genre-5',
+            '/api/v1/titles/?pagination=cursor',
+            reviews,
+            f'{reviews}?offset=300',
+            f'{reviews}?pagination=cursor',
+            f'{reviews}{review.id}/',
+            comments,
+            f'{comments}?pagination=cursor',
+        ]
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username='user0'))
+        offenders = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                assert client.get(url).status_code == 200, url
+            for query in context.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN (FORMAT JSON) {query["sql"]}')
+                    plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                tables = seq_scans(plan[0]['Plan'])
+                if tables:
+                    offenders[query['sql']] = (url, tables)
+
+        assert not offenders, '\n\n'.join(
+            f'{url}: Seq Scan {sorted(tables)}\n{sql}'
+            for sql, (url, tables) in offenders.items()
+        )
+
+    def test_rating_aggregation_has_covering_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes "
+                "WHERE indexname = 'review_title_score_idx'"
+            )
+            indexdef = cursor.fetchone()[0]
+
+        assert '(title_id) INCLUDE (score)' in indexdef
@@ -0,0 +1,77 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.models import Review, Title, User
+
+
+@pytest.fixture
+def title():
+    return Title.objects.create(name='Произведение', year=2000)
+
+
+@pytest.fixture
+def authors():
+    return [
+        User.objects.create(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(3)
+    ]
+
+
+def stored_rating(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db
+class TestStoredRating:
+
+    def test_rating_follows_reviews(self, title, authors):
+        assert stored_rating(title) == (0, 0, None)
+
+        first = Review.objects.create(
+            title=title, author=authors[0], text='a', score=10)
+        Review.objects.create(title=title, author=authors[1], text='b', score=5)
+        assert stored_rating(title) == (15, 2, 7.5)
+
+        first = Review.objects.get(pk=first.pk)
+        first.score = 1
+        first.save()
+        assert stored_rating(title) == (6, 2, 3.0)
+
+        first.delete()
+        assert stored_rating(title) == (5, 1, 5.0)
+
+        authors[1].delete()
+        assert stored_rating(title) == (0, 0, None)
+
+    def test_saving_stale_title_keeps_rating(self, title, authors):
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(
+            title=title, author=authors[0], text='a', score=8)
+
+        stale.name = 'Новое название'
+        stale.save()
+
+        assert stored_rating(title) == (8, 1, 8.0)
+        assert title.name == 'Новое название'
+
+    def test_moving_review_to_other_title(self, title, authors):
+        other = Title.objects.create(name='Другое', year=2001)
+        review = Review.objects.create(
+            title=title, author=authors[0], text='a', score=8)
+        review.title = other
+        review.save()
+        assert stored_rating(title) == (0, 0, None)
+        assert stored_rating(other) == (8, 1, 8.0)
+
+    def test_rebuild_fixes_drift(self, title, authors):
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='a', score=score)
+            for author, score in zip(authors, (3, 4, 9))
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuildrating', '--check')
+
+        call_command('rebuildrating')
+        assert stored_rating(title) == (16, 3, 16 / 3)
+        call_command('rebuildrating', '--check')
@@ -0,0 +1,126 @@
+import pytest
+from core.middleware import ReplicaRoutingMiddleware
+from core.routers import ReplicaRouter, primary_reads
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import router
+from django.test import RequestFactory
+from reviews.models import Review, Title, User
+
+REPLICAS = ['replica_0', 'replica_1']
+
+
+@pytest.fixture
+def replicas(settings, tmp_path):
+    settings.REPLICA_DATABASES = REPLICAS
+    settings.CACHES = {**settings.CACHES, 'pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    settings.REPLICA_PIN_CACHE = 'pins'
+
+
+@pytest.fixture
+def users():
+    return (User(pk=1, username='first'), User(pk=2, username='second'))
+
+
+def route(method, user, write=False):
+    request = getattr(RequestFactory(), method)('/api/v1/titles/')
+    request.user = user
+
+    def get_response(request):
+        reads = [router.db_for_read(Title) for _ in range(5)]
+        if write:
+            router.db_for_write(Review)
+            reads.append(router.db_for_read(Title))
+        return reads
+
+    return ReplicaRoutingMiddleware(get_response)(request)
+
+
+class TestReplicaRouter:
+
+    def test_safe_request_reads_from_one_replica(self, replicas, users):
+        reads = route('get', users[0])
+
+        assert reads[0] in REPLICAS
+        assert set(reads) == {reads[0]}
+        assert router.db_for_read(Title) == 'default'
+
+    def test_without_replicas_reads_from_primary(self, users):
+        assert set(route('get', users[0])) == {'default'}
+
+    def test_unsafe_request_reads_from_primary(self, replicas, users):
+        assert set(route('post', users[0])) == {'default'}
+
+    def test_write_pins_user_to_primary(self, replicas, users):
+        reads = route('get', users[0], write=True)
+        assert reads[-1] == 'default'
+
+        assert set(route('get', users[0])) == {'default'}
+        assert route('get', users[1])[0] in REPLICAS
+        assert route('get', AnonymousUser())[0] in REPLICAS
+
+    def test_anonymous_write_is_not_pinned(self, replicas):
+        route('post', AnonymousUser(), write=True)
+
+        assert route('get', AnonymousUser())[0] in REPLICAS
+
+    def test_primary_reads_block(self, replicas, users):
+        request = RequestFactory().get('/api/v1/titles/')
+        request.user = users[0]
+
+        def get_response(request):
+            with primary_reads():
+                inside = router.db_for_read(Title)
+            return inside, router.db_for_read(Title)
+
+        inside, after = ReplicaRoutingMiddleware(get_response)(request)
+
+        assert inside == 'default'
+        assert after in REPLICAS
+
+    @pytest.mark.django_db
+    def test_cached_responses_are_built_from_primary(self, replicas, client):
+        # Псевдонимов реплик нет в DATABASES: чтение из реплики упало бы.
+        Title.objects.create(name='Произведение', year=2000)
+
+        for url in ('/api/v1/titles/', '/api/v1/titles/?year=2000'):
+            response = client.get(url)
+            assert response.status_code == 200, url
+            assert response.json()['count'] == 1
+
+    def test_process_local_pin_cache_is_refused(self, replicas, settings):
+        settings.REPLICA_PIN_CACHE = 'default'
+
+        with pytest.raises(ImproperlyConfigured):
+            ReplicaRoutingMiddleware(lambda request: None)
+
+    def test_pin_is_stored_in_pin_cache(self, replicas, users):
+        route('get', users[0], write=True)
+
+        assert caches['pins'].get('primary-pin:1') is True
+        assert caches['default'].get('primary-pin:1') is None
+
+    def test_migrations_skip_replicas(self, replicas):
+        assert ReplicaRouter().allow_migrate('replica_0', 'reviews') is False
+        assert ReplicaRouter().allow_migrate('default', 'reviews') is None
+
+
+@pytest.mark.django_db
+class TestReplicaLag:
+
+    def test_without_replicas(self, capsys):
+        call_command('replicalag')
+
+        assert capsys.readouterr().out == 'Реплики не настроены\n'
+
+    def test_primary_is_not_a_replica(self, settings, capsys):
+        settings.REPLICA_DATABASES = ['default']
+
+        call_command('replicalag', '--max-lag', '1')
+
+        assert capsys.readouterr().out == 'default: не является репликой\n'
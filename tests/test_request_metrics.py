@@ -0,0 +1,97 @@
+import logging
+import re
+
+import pytest
+from api.authentication import ClaimsAccessToken
+from core.metrics import SLOTS, RollingHistogram, histogram
+from rest_framework.test import APIClient
+from reviews.models import Category, Title, User
+
+TIMING_RE = re.compile(
+    r'db;dur=([\d.]+);desc="(\d+) queries", serialize;dur=([\d.]+), '
+    r'total;dur=([\d.]+)'
+)
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    return Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category)
+        for i in range(3)
+    )
+
+
+@pytest.fixture
+def clear_histogram():
+    histogram.slots.clear()
+    yield
+    histogram.slots.clear()
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}')
+    return client
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+
+    def test_server_timing_header(self, client, titles,
+                                  django_assert_num_queries):
+        with django_assert_num_queries(3) as context:
+            response = client.get('/api/v1/titles/')
+
+        db, queries, serialize, total = TIMING_RE.fullmatch(
+            response['Server-Timing']).groups()
+        assert int(queries) == len(context.captured_queries)
+        assert 0 < float(db) <= float(total)
+        assert 0 < float(serialize) <= float(total)
+
+    def test_log_line_has_view_and_action(self, client, titles, caplog):
+        with caplog.at_level(logging.INFO, logger='yamdb.requests'):
+            client.get(f'/api/v1/titles/{titles[0].id}/')
+            client.post('/api/v1/auth/signup/', {})
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert messages[0].startswith(
+            'view=TitlesViewSet.retrieve method=GET '
+            f'path=/api/v1/titles/{titles[0].id}/ status=200 queries=2 ')
+        assert messages[1].startswith('view=registration method=POST ')
+
+    def test_timings_endpoint_is_admin_only(self, client, titles,
+                                            clear_histogram):
+        admin = User.objects.create(
+            username='boss', email='boss@yamdb.fake', role=User.ADMIN)
+        user = User.objects.create(username='fan', email='fan@yamdb.fake')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+
+        assert client.get('/api/v1/timings/').status_code == 401
+        assert client_for(user).get('/api/v1/timings/').status_code == 403
+        response = client_for(admin).get('/api/v1/timings/')
+        assert response.status_code == 200
+        titles_list = response.json()['TitlesViewSet.list']
+        assert titles_list['count'] == 2
+        assert titles_list['p50_ms'] is not None
+        assert sum(titles_list['buckets'].values()) == 2
+
+
+class TestRollingHistogram:
+
+    def test_old_slots_leave_the_window(self):
+        rolling = RollingHistogram(window=100)
+        rolling.record('view', 3, 1, 1.0, 0.5, now=0)
+        rolling.record('view', 300, 5, 200.0, 50.0, now=50)
+
+        snapshot = rolling.snapshot(now=50)['view']
+        assert snapshot['count'] == 2
+        assert snapshot['avg_queries'] == 3
+        assert snapshot['p50_ms'] == 5
+        assert snapshot['p99_ms'] == 500
+
+        assert rolling.snapshot(now=120)['view']['count'] == 1
+        rolling.record('other', 1, 0, 0, 0, now=100 + 100 / SLOTS * 4)
+        assert list(rolling.slots) == [5, 14]
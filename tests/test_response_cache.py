@@ -0,0 +1,134 @@
+import pytest
+from core.cache import get_versions
+from django.db import transaction
+from rest_framework.test import APIClient
+from reviews.models import Category, Comments, Genre, Review, Title, User
+
+
+@pytest.fixture
+def title():
+    category = Category.objects.create(name='Фильм', slug='film')
+    title = Title.objects.create(name='Чапаев', year=1934, category=category)
+    title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+    return title
+
+
+@pytest.fixture
+def review(title):
+    author = User.objects.create(username='critic', email='critic@yamdb.fake')
+    return Review.objects.create(
+        title=title, author=author, text='Отлично', score=9)
+
+
+# Версии кэша меняются после фиксации транзакции, поэтому тесты
+# инвалидации должны фиксировать свои изменения.
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+    ))
+    def test_repeated_anonymous_list_is_served_from_cache(
+            self, client, title, url, django_assert_num_queries):
+        first = client.get(url)
+
+        with django_assert_num_queries(0):
+            second = client.get(url)
+
+        assert second.status_code == 200
+        assert second.json() == first.json()
+
+    def test_query_parameters_are_part_of_key(self, client, title):
+        assert client.get('/api/v1/titles/?limit=1&offset=0').status_code == 200
+
+        response = client.get('/api/v1/titles/?limit=1&offset=1')
+
+        assert response.json()['results'] == []
+
+    def test_review_invalidates_title_rating(self, client, title):
+        assert client.get(f'/api/v1/titles/{title.id}/').json()['rating'] is None
+        author = User.objects.create(username='fan', email='fan@yamdb.fake')
+
+        Review.objects.create(title=title, author=author, text='Да', score=7)
+
+        assert client.get(f'/api/v1/titles/{title.id}/').json()['rating'] == 7
+
+    def test_category_rename_invalidates_titles(self, client, title):
+        client.get('/api/v1/titles/')
+        Category.objects.filter(pk=title.category_id).update(name='-')
+        category = Category.objects.get(pk=title.category_id)
+        category.name = 'Кино'
+
+        category.save()
+
+        results = client.get('/api/v1/titles/').json()['results']
+        assert results[0]['category']['name'] == 'Кино'
+
+    def test_genre_change_invalidates_titles(self, client, title):
+        client.get('/api/v1/titles/')
+
+        title.genre.add(Genre.objects.create(name='Война', slug='war'))
+
+        results = client.get('/api/v1/titles/').json()['results']
+        assert len(results[0]['genre']) == 2
+
+    def test_comment_invalidates_only_its_review(
+            self, client, review, django_assert_num_queries):
+        comments_url = (f'/api/v1/titles/{review.title_id}/reviews/'
+                        f'{review.id}/comments/')
+        reviews_url = f'/api/v1/titles/{review.title_id}/reviews/'
+        client.get(reviews_url)
+        client.get(comments_url)
+
+        Comments.objects.create(review=review, author=review.author, text='+')
+
+        assert client.get(comments_url).json()['count'] == 1
+        with django_assert_num_queries(0):
+            client.get(reviews_url)
+
+    def test_username_change_invalidates_reviews(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        client.get(url)
+        author = User.objects.get(pk=review.author_id)
+        author.username = 'critic2'
+
+        author.save()
+
+        assert client.get(url).json()['results'][0]['author'] == 'critic2'
+
+    def test_deleted_title_is_not_served_from_cache(self, client, title):
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        assert client.get(url).status_code == 200
+
+        title.delete()
+
+        assert client.get(url).status_code == 404
+
+    def test_versions_change_after_commit(self, client, title):
+        before = get_versions(['titles', f'reviews:{title.id}'])
+
+        with transaction.atomic():
+            title.name = 'Броненосец'
+            title.save()
+            assert get_versions(['titles', f'reviews:{title.id}']) == before
+            # Ответ, закэшированный до фиксации, остается под старой версией.
+            client.get('/api/v1/titles/')
+
+        assert get_versions(['titles', f'reviews:{title.id}']) != before
+        assert client.get(
+            '/api/v1/titles/').json()['results'][0]['name'] == 'Броненосец'
+
+    def test_authenticated_requests_are_not_cached(
+            self, title, django_assert_num_queries):
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create(username='reader', email='r@yamdb.fake'))
+        client.get('/api/v1/titles/')
+
+        # page of titles and their genres, count comes from the count cache
+        with django_assert_num_queries(2):
+            response = client.get('/api/v1/titles/')
+
+        assert response.status_code == 200
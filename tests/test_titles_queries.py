@@ -0,0 +1,53 @@
+import pytest
+from reviews.models import Category, Genre, Title, TitlesGenres
+
+TITLES_COUNT = 20
+
+
+@pytest.fixture
+def titles():
+    categories = Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}') for i in range(3)
+    )
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(4)
+    )
+    titles = [
+        Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000,
+            category=categories[i % len(categories)]
+        )
+        for i in range(TITLES_COUNT)
+    ]
+    TitlesGenres.objects.bulk_create(
+        TitlesGenres(title=title, genre=genres[(i + shift) % len(genres)])
+        for i, title in enumerate(titles)
+        for shift in range(2)
+    )
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitlesQueries:
+
+    @pytest.mark.parametrize('limit', (1, 5, TITLES_COUNT))
+    def test_list_query_count_does_not_depend_on_page_size(
+            self, client, titles, limit, django_assert_num_queries):
+        # count, page of titles joined with categories, genres of the page
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(len(title['genre']) == 2 for title in results)
+        assert all(title['category'] is not None for title in results)
+
+    def test_detail_query_count(
+            self, client, titles, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0].id}/')
+
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
@@ -0,0 +1,91 @@
+import pytest
+from api import filters
+from api.filters import (TrigramSimilarityFilter, has_trigram_extension,
+                         similarity, trigrams)
+from django.db import connection
+from reviews.models import Category, Genre, Title
+
+
+class TestTrigrams:
+
+    def test_trigrams_are_padded_per_word(self):
+        assert trigrams('Cat') == {'  c', ' ca', 'cat', 'at '}
+
+    def test_similarity_matches_pg_trgm(self):
+        # SELECT similarity('word', 'two words') из документации pg_trgm
+        assert similarity('word', 'two words') == pytest.approx(0.363636, 1e-5)
+        assert similarity('', '') == 0
+
+
+@pytest.fixture
+def similar_search(monkeypatch):
+    """Без pg_trgm в тестовой PostgreSQL похожесть считается в Python, как
+    в базах других типов."""
+
+    if not has_trigram_extension(connection):
+        monkeypatch.setattr(
+            TrigramSimilarityFilter, 'allows_python_fallback',
+            lambda self, connection: True)
+
+
+@pytest.mark.django_db
+class TestTrigramSimilarityFilter:
+
+    def test_postgresql_without_extension_rejects_parameter(
+            self, client, monkeypatch, django_assert_max_num_queries):
+        monkeypatch.setattr(
+            filters, 'has_trigram_extension', lambda connection: False)
+        Title.objects.create(name='Властелин колец', year=2000)
+
+        with django_assert_max_num_queries(0):
+            response = client.get('/api/v1/titles/?name__similar=Властилин')
+
+        assert response.status_code == 400
+        assert 'name__similar' in response.json()
+
+    @pytest.mark.usefixtures('similar_search')
+    def test_titles_with_typo(self, client):
+        for name in ('Властелин колец', 'Гарри Поттер', 'Властелин мира'):
+            Title.objects.create(name=name, year=2000)
+
+        response = client.get('/api/v1/titles/?name__similar=Властилин колец')
+
+        names = [title['name'] for title in response.json()['results']]
+        assert names[0] == 'Властелин колец'
+        assert 'Гарри Поттер' not in names
+
+    @pytest.mark.usefixtures('similar_search')
+    def test_categories_and_genres(self, client):
+        Category.objects.create(name='Фантастика', slug='sci-fi')
+        Category.objects.create(name='Документальное', slug='doc')
+        Genre.objects.create(name='Фэнтези', slug='fantasy')
+
+        categories = client.get('/api/v1/categories/?name__similar=фонтастика')
+        genres = client.get('/api/v1/genres/?name__similar=фэнтази')
+
+        assert [item['slug'] for item in categories.json()['results']] == [
+            'sci-fi']
+        assert [item['slug'] for item in genres.json()['results']] == [
+            'fantasy']
+
+    def test_icontains_name_filter_still_works(self, client):
+        Title.objects.create(name='Властелин колец', year=2000)
+
+        response = client.get('/api/v1/titles/?name=КОЛЕЦ')
+
+        assert response.json()['count'] == 1
+
+    @pytest.mark.skipif(connection.vendor != 'postgresql',
+                        reason='pg_trgm есть только в PG')
+    def test_indexes_exist_when_extension_is_available(self):
+        if not has_trigram_extension(connection):
+            pytest.skip('расширение pg_trgm не установлено')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE indexname LIKE '%%_trgm_idx'"
+            )
+            indexes = {row[0] for row in cursor.fetchall()}
+
+        assert 'reviews_title_name_upper_trgm_idx' in indexes
+        assert 'reviews_title_name_trgm_idx' in indexes